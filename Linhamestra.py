@@ -1229,8 +1229,8 @@ class BundleConductorRMGCalculator:
             Rmg_val_cond = float(self.rmg_val_entry.get()) if self.rmg_val_entry.get() else None
             
             # Validações básicas antes de passar para a função de cálculo
-            if n_val not in [2, 3, 4]:
-                raise ValueError("O número de subcondutores (n) deve ser 2, 3 ou 4.")
+            if n_val is None or n_val < 1:
+                raise ValueError("O número de subcondutores (n) deve ser um inteiro maior ou igual a 1.")
             if d_val is None or d_val <= 0:
                 raise ValueError("A distância 'd' deve ser um valor numérico positivo.")
             if R_val is None and Rmg_val_cond is None:
@@ -1,9 +1,12 @@
 import math
 import numpy as np
 
+from longitudinais.geometria import obter_geometria # Cache de distâncias da torre
+from longitudinais.componentes_simetricas import fase_para_sequencia # Transformação de Fortescue
+
 import unittest
 
-def metodo_capacitancia_sequencia_tran(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho):
+def metodo_capacitancia_sequencia_tran(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, geometria=None):
     """
     Calcula a matriz de capacitância de sequência de uma linha de transmissão trifásica
     com configuração horizontal, usando o Método de Carson.
@@ -13,6 +16,8 @@ def metodo_capacitancia_sequencia_tran(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho):
     xa, xb, xc (float): Coordenadas horizontais (x) dos condutores A, B e C em metros.
     ha, hb, hc (float): Alturas dos condutores A, B e C acima do solo em metros.
     rho (float): Resistividade do solo em Ohm-metros.
+    geometria (TowerGeometry, opcional): Geometria já calculada dos condutores. Se fornecida,
+                                         as coordenadas e alturas são ignoradas (podem ser None).
 
     Retorna:
     numpy.ndarray: Matriz de capacitância de sequência 3x3 da linha (F/m),
@@ -27,35 +32,16 @@ def metodo_capacitancia_sequencia_tran(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho):
     # Validação de entradas
     if rho <= 0:
         raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
-    if ha <= 0 or hb <= 0 or hc <= 0:
+    if np.any(np.asarray([ha, hb, hc] if geometria is None else geometria.h) <= 0):
         raise ValueError("ERRO! As alturas dos condutores (ha, hb, hc) devem ser maiores que zero.")
 
-    # Converte entradas para arrays para operações de matriz
-    r_vec = np.array([ra, rb, rc])
-    x_vec = np.array([xa, xb, xc])
-    h_vec = np.array([ha, hb, hc])
-
-    # Cálculo das distâncias diretas entre condutores (D)
-    diff_x = x_vec[:, np.newaxis] - x_vec
-    diff_h = h_vec[:, np.newaxis] - h_vec
-    D = np.sqrt(diff_x**2 + diff_h**2)
-
-    # Cálculo das distâncias entre condutores e suas imagens (D_prime)
-    sum_h = h_vec[:, np.newaxis] + h_vec
-    D_prime = np.sqrt(diff_x**2 + sum_h**2)
+    # Geometria dos condutores (distâncias D e D_prime, reaproveitadas do cache)
+    if geometria is None:
+        geometria = obter_geometria([xa, xb, xc], [ha, hb, hc])
 
     # --- Constrói a matriz de potencial (P) em F/m ---
-    P = np.zeros((3, 3), dtype=complex)
-
-    # Preencher elementos diagonais (auto-potenciais)
-    for i in range(3):
-        P[i, i] = (1 / (2 * np.pi * E)) * np.log((2 * h_vec[i]) / r_vec[i])
-
-    # Preencher elementos fora da diagonal (potenciais mútuos)
-    for i in range(3):
-        for j in range(i + 1, 3):
-            P[i, j] = (1 / (2 * np.pi * E)) * np.log(D_prime[i, j] / D[i, j])
-            P[j, i] = P[i, j] # Matriz P é simétrica
+    # Diagonal: log(2*h_i/r_i); fora da diagonal: log(D_prime_ij/D_ij). A matriz P é simétrica.
+    P = (1 / (2 * np.pi * E)) * geometria.coeficientes_maxwell([ra, rb, rc])
 
     # A matriz P_ph_ph não precisa mais ser multiplicada por 1000
     # se quisermos a saída em F/m.
@@ -64,17 +50,9 @@ def metodo_capacitancia_sequencia_tran(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho):
     # Calcula a matriz de capacitância de fase (C_abc) em F/m
     C_abc = np.linalg.inv(P_ph_ph)
 
-    # Matriz de transformação de sequência (Fortescue)
-    alpha = np.exp(1j * 2 * np.pi / 3)
-    A = (1/3) * np.array([[1, 1, 1],
-                          [1, alpha, alpha**2],
-                          [1, alpha**2, alpha]], dtype=complex)
-    A_inv = np.array([[1, 1, 1],
-                      [1, alpha**2, alpha],
-                      [1, alpha, alpha**2]], dtype=complex)
-
-    # Calcula a matriz de capacitância de sequência (C_012)
-    C_seq = A @ C_abc @ A_inv
+    # Calcula a matriz de capacitância de sequência (C_012) com as matrizes de Fortescue
+    # pré-calculadas: C_012 = A^-1 @ C_abc @ A
+    C_seq = fase_para_sequencia(C_abc)
 
     # Retorna C_seq com componentes imaginários e em F/m
     return C_seq
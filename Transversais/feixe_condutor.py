@@ -1,12 +1,18 @@
 import math
 import numpy as np
 
+from longitudinais.geometria import obter_geometria # Cache de distâncias da torre
+from longitudinais.feixes_de_condutores import rmg_feixes # Raio equivalente de feixes com n qualquer
+from longitudinais.reducao_feixes import expandir_feixes, capacitancia_feixes # Subcondutores explícitos
+
 def metodo_feixe_condutor_tran(
         ra_sub, rb_sub, rc_sub,  # Raios dos subcondutores das fases A, B, C
         na, nb, nc,  # Número de subcondutores por feixe para as fases A, B, C
         sa, sb, sc,  # Espaçamento entre subcondutores para as fases A, B, C
         xa, ha, xb, hb, xc, hc,  # Coordenadas X e H das Fases A, B, C
-        rho, comprimento_total  # Resistividade do solo e comprimento total da linha
+        rho, comprimento_total,  # Resistividade do solo e comprimento total da linha
+        subcondutores_explicitos=False,  # Modela cada subcondutor como um condutor próprio
+        geometria=None  # TowerGeometry já calculada dos centros dos feixes
 ):
     """
     Calcula a matriz de capacitância de fase para uma linha de transmissão trifásica
@@ -15,7 +21,7 @@ def metodo_feixe_condutor_tran(
     Parâmetros:
     ra_sub, rb_sub, rc_sub (float): Raios físicos dos subcondutores das fases A, B e C (em metros).
     na, nb, nc (int): Número de subcondutores por feixe para as fases A, B e C.
-                      Valores suportados: 1, 2, 3, 4.
+                      Qualquer inteiro n >= 1 (feixe em polígono regular).
     sa, sb, sc (float): Espaçamento entre os subcondutores do feixe para as fases A, B e C (em metros).
                         Ignorado se n=1.
     xa, ha (float): Coordenadas X e H da Fase A.
@@ -23,6 +29,12 @@ def metodo_feixe_condutor_tran(
     xc, hc (float): Coordenadas X e H da Fase C.
     rho (float): Resistividade do solo (em Ohm.m).
     comprimento_total (float): Comprimento total da linha (em metros).
+    subcondutores_explicitos (bool, opcional): Se True, cada subcondutor é um nó da matriz de
+                                               potenciais (3*n subcondutores) e os feixes são
+                                               reduzidos às fases por `capacitancia_feixes`, em vez
+                                               de usar o raio equivalente do feixe. Padrão: False.
+    geometria (TowerGeometry, opcional): Geometria já calculada dos centros dos feixes. Se fornecida,
+                                         as coordenadas e alturas são ignoradas (podem ser None).
 
     Retorna:
     numpy.ndarray: Matriz de capacitância de fase (3x3) da linha NÃO transposta (em Farads).
@@ -34,33 +46,17 @@ def metodo_feixe_condutor_tran(
     # --- Constantes Físicas ---
     E = 8.854 * 10 ** (-12)  # Permissividade do vácuo (F/m)
 
-    # --- Funções Auxiliares para RMG do Feixe ---
-    def calcular_rmg_feixe(n, r_sub, s):
-        """Calcula o Raio Médio Geométrico (RMG) equivalente para um condutor em feixe."""
-        if n == 1:
-            return r_sub
-        elif n == 2:
-            return math.sqrt(r_sub * s)
-        elif n == 3:
-            return math.pow(r_sub * s ** 2, 1 / 3)  # Raio do feixe triplo
-        elif n == 4:
-            # RMG de um feixe quádruplo:
-            return math.pow(r_sub * s ** 3 * math.sqrt(2), 1 / 4)
-        else:
-            raise ValueError(
-                f"Número de subcondutores ({n}) não suportado para o cálculo do RMG. Suportado: 1, 2, 3, 4.")
-
     # --- Validações de Entrada ---
     if rho <= 0:
         raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
-    if ha <= 0 or hb <= 0 or hc <= 0:
+    if np.any(np.asarray([ha, hb, hc] if geometria is None else geometria.h) <= 0):
         raise ValueError("ERRO! As alturas dos condutores (ha, hb, hc) devem ser maiores que zero.")
     if comprimento_total <= 0:
         raise ValueError("ERRO! O comprimento total da linha deve ser um valor positivo.")
 
     for n_val in [na, nb, nc]:
-        if n_val not in [1, 2, 3, 4]:
-            raise ValueError(f"ERRO! Número de subcondutores ({n_val}) inválido. Suportado: 1, 2, 3, 4.")
+        if n_val < 1 or int(n_val) != n_val:
+            raise ValueError(f"ERRO! Número de subcondutores ({n_val}) inválido. Deve ser um inteiro maior ou igual a 1.")
 
     for r_sub_val in [ra_sub, rb_sub, rc_sub]:
         if r_sub_val <= 0:
@@ -70,31 +66,27 @@ def metodo_feixe_condutor_tran(
         if s_val < 0:
             raise ValueError("ERRO! O espaçamento entre subcondutores (sa, sb, sc) não pode ser negativo.")
 
-    # --- Calcula o RMG equivalente para cada fase ---
-    RMG_a = calcular_rmg_feixe(na, ra_sub, sa)
-    RMG_b = calcular_rmg_feixe(nb, rb_sub, sb)
-    RMG_c = calcular_rmg_feixe(nc, rc_sub, sc)
+    if subcondutores_explicitos:
+        # --- Matriz de potenciais de todos os subcondutores e redução dos feixes às fases ---
+        x_centros, h_centros = ([xa, xb, xc], [ha, hb, hc]) if geometria is None else (geometria.x, geometria.h)
+        xs, hs, rs, fases = expandir_feixes(x_centros, h_centros, [na, nb, nc], [sa, sb, sc],
+                                            [ra_sub, rb_sub, rc_sub])
+        if np.any(hs <= 0):
+            raise ValueError("ERRO! Todos os subcondutores devem estar acima do solo.")
+        geometria = obter_geometria(xs, hs)
+        P_sub = 1 / (2 * math.pi * E) * geometria.coeficientes_maxwell(rs)
+        return capacitancia_feixes(P_sub, fases) * comprimento_total
 
-    # --- Coordenadas e RMGs dos condutores de fase ---
-    cond_x = [xa, xb, xc]
-    cond_h = [ha, hb, hc]
-    cond_r = [RMG_a, RMG_b, RMG_c]
+    # --- Calcula o raio equivalente de cada fase: (n * r * A^(n-1))^(1/n), A = raio do feixe ---
+    RMG_a, RMG_b, RMG_c = rmg_feixes([na, nb, nc], [sa, sb, sc], [ra_sub, rb_sub, rc_sub])
 
-    n_phases = 3  # Número de fases
+    # --- Geometria dos condutores de fase (distâncias reaproveitadas do cache) ---
+    if geometria is None:
+        geometria = obter_geometria([xa, xb, xc], [ha, hb, hc])
 
     # --- Construção da Matriz de Potencial (P_ff) ---
-    P_ff = np.zeros((n_phases, n_phases))
-    for i in range(n_phases):
-        for j in range(n_phases):
-            xi, hi, ri = cond_x[i], cond_h[i], cond_r[i]
-            xj, hj, rj = cond_x[j], cond_h[j], cond_r[j]
-
-            if i == j:  # Elemento P_ii (auto-potencial)
-                P_ff[i, j] = 1 / (2 * math.pi * E) * math.log((2 * hi) / ri)
-            else:  # Elemento P_ij (potencial mútuo)
-                d = np.sqrt(((xi - xj) ** 2) + ((hi - hj) ** 2))
-                d_prime = np.sqrt(((xi - xj) ** 2) + ((hi + hj) ** 2))
-                P_ff[i, j] = 1 / (2 * math.pi * E) * math.log(d_prime / d)
+    # P_ii = 1/(2*pi*E) * ln(2*h_i/RMG_i) e P_ij = 1/(2*pi*E) * ln(d_ij'/d_ij).
+    P_ff = 1 / (2 * math.pi * E) * geometria.coeficientes_maxwell([RMG_a, RMG_b, RMG_c])
 
     # Cálculo da Matriz de Capacitância (por unidade de comprimento)
     C_matrix_per_m = np.linalg.inv(P_ff)
@@ -0,0 +1,291 @@
+import math
+import numpy as np
+import unittest
+
+from longitudinais.feixes_de_condutores import raio_circunscrito
+from longitudinais.geometria import PERMISSIVIDADE_VACUO, TowerGeometry
+from longitudinais.reducao_feixes import expandir_feixes, cargas_subcondutores
+
+E = PERMISSIVIDADE_VACUO  # Permissividade do vácuo (F/m)
+
+# Número de pontos da superfície de cada subcondutor em que o campo é avaliado (passo de 5 graus).
+N_PONTOS = 72
+
+# Número máximo de termos (projetos x cargas) processados de uma vez no cálculo do campo.
+TERMOS_POR_BLOCO = 1_000_000
+
+# Tolerância relativa do truncamento da série de Fourier do campo na superfície de cada subcondutor.
+TOLERANCIA_SERIE = 1e-10
+
+def gradiente_markt_mengele(C, V, n, d, raio):
+    """
+    Gradiente superficial médio e máximo dos subcondutores pelo método de Markt e Mengele.
+
+    A carga de cada fase (q = C V) é dividida igualmente entre os n subcondutores do feixe.
+    O gradiente médio de um subcondutor é E_med = q / (2 pi E n r) e o máximo, que considera o
+    campo dos demais subcondutores do mesmo feixe, é E_max = E_med * (1 + (n - 1) r / A),
+    com A o raio do círculo dos subcondutores. Todas as operações são vetorizadas, de modo que
+    milhares de projetos podem ser avaliados de uma vez.
+
+    Parâmetros:
+    C (array_like): Matriz de capacitâncias das fases (..., Nf, Nf), em F/m (com o raio
+                    equivalente do feixe, como em `metodo_feixe_condutor_tran`).
+    V (array_like): Tensões das fases (..., Nf), em V. Fasores complexos (eficazes) resultam
+                    em gradientes eficazes.
+    n (int ou array_like): Número de subcondutores de cada fase.
+    d (float ou array_like): Distância entre subcondutores adjacentes (metros).
+    raio (float ou array_like): Raio físico dos subcondutores (metros).
+
+    Retorna:
+    tuple: (E_medio, E_maximo), arrays (..., Nf) em V/m (multiplique por 1e-5 para kV/cm).
+
+    Raises:
+    ValueError: Se algum raio não for positivo.
+    """
+    C = np.asarray(C)
+    V = np.asarray(V)
+    n = np.asarray(n)
+    raio = np.asarray(raio, dtype=float)
+    if np.any(raio <= 0):
+        raise ValueError("ERRO! O raio dos subcondutores deve ser positivo.")
+
+    q = np.abs(np.einsum('...ij,...j->...i', C, V))
+    E_medio = q / (2 * math.pi * E * n * raio)
+    A = np.asarray(raio_circunscrito(n, d), dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fator = np.where(n > 1, 1 + (n - 1) * raio / np.where(A > 0, A, 1.0), 1.0)
+    return E_medio, E_medio * fator
+
+def gradiente_imagens_sucessivas(x, h, raio, q, ordem=1, n_pontos=N_PONTOS):
+    """
+    Gradiente superficial máximo de cada subcondutor pelo método das imagens sucessivas.
+
+    Cada subcondutor é representado por sua carga de linha no centro e o solo pelas imagens
+    de todas as cargas. A cada ordem, toda carga externa a um subcondutor i (de raio r, centro c)
+    ganha uma imagem -q dentro dele, em c + r^2 (p - c)/|p - c|^2, compensada por +q no centro,
+    o que torna a superfície de i equipotencial em relação àquela carga sem alterar a sua carga
+    total; as novas cargas recebem também as suas imagens no solo. O campo normal na superfície
+    de cada subcondutor é obtido como série de Fourier em torno do seu centro (somando as cargas
+    uma única vez) e o maior módulo entre `n_pontos` ângulos é retornado.
+
+    As cargas q devem ser as de cada subcondutor, por exemplo de `cargas_subcondutores`. O número
+    de cargas cresce com (2 Ns)^(ordem+1); a primeira ordem já corrige a distorção de campo
+    causada pelos subcondutores vizinhos, com erro da ordem de (r/D)^4.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas (..., Ns) dos centros dos subcondutores (metros).
+    raio (float ou array_like): Raio (..., Ns) dos subcondutores (metros).
+    q (array_like): Cargas (..., Ns) dos subcondutores (C/m), reais ou fasores complexos.
+    ordem (int, opcional): Número de ordens de imagens nos subcondutores. Padrão: 1.
+    n_pontos (int, opcional): Pontos avaliados na superfície de cada subcondutor. Padrão: N_PONTOS.
+
+    Retorna:
+    numpy.ndarray: Gradiente superficial máximo (..., Ns) de cada subcondutor, em V/m.
+
+    Raises:
+    ValueError: Se algum raio ou altura não for positivo, ou se a ordem for negativa.
+    """
+    q = np.asarray(q)
+    x, h, raio = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x, h, raio)))
+    forma = np.broadcast_shapes(x.shape, q.shape)
+    x, h, raio = (np.broadcast_to(v, forma) for v in (x, h, raio))
+    q = np.broadcast_to(q, forma)
+    if np.any(raio <= 0) or np.any(h <= raio):
+        raise ValueError("ERRO! Os raios devem ser positivos e os subcondutores devem estar acima do solo.")
+    if ordem < 0:
+        raise ValueError("ERRO! A ordem das imagens não pode ser negativa.")
+
+    ns = forma[-1]
+    condutores = np.arange(ns)
+
+    # Nível 0: cargas nos centros (dono = subcondutor) e suas imagens no solo (dono = -1).
+    novas = _com_imagens_no_solo(x, h, q, condutores)
+    todas = [novas]
+    for _ in range(ordem):
+        px, py, pq, dono = novas
+        externa = dono != condutores[:, np.newaxis]              # (Ns, M): cargas externas a cada subcondutor
+        cx, cy, r = x[..., :, np.newaxis], h[..., :, np.newaxis], raio[..., :, np.newaxis]
+        dx, dy = px[..., np.newaxis, :] - cx, py[..., np.newaxis, :] - cy
+        fator = r**2 / (dx**2 + dy**2 + ~externa)           # Sem divisão por zero nas cargas próprias
+        ix, iy = (cx + fator * dx)[..., externa], (cy + fator * dy)[..., externa]
+        iq = -np.broadcast_to(pq[..., np.newaxis, :], dx.shape)[..., externa]
+        dono_imagem = np.broadcast_to(condutores[:, np.newaxis], externa.shape)[externa]
+        q_centro = np.where(externa, pq[..., np.newaxis, :], 0).sum(axis=-1)
+
+        novas = _com_imagens_no_solo(np.concatenate([ix, x], axis=-1), np.concatenate([iy, h], axis=-1),
+                                     np.concatenate([iq, q_centro], axis=-1),
+                                     np.concatenate([dono_imagem, condutores]))
+        todas.append(novas)
+
+    px = np.concatenate([c[0] for c in todas], axis=-1)
+    py = np.concatenate([c[1] for c in todas], axis=-1)
+    pq = np.concatenate([c[2] for c in todas], axis=-1)
+    dono = np.concatenate([c[3] for c in todas])
+
+    # Campo normal na superfície do subcondutor i (centro c, raio r, ponto c + r e^(j theta)) como
+    # série de Fourier: com w = p - c, uma carga externa contribui -q Re sum_k (r/w)^k e^(jk theta)
+    # e uma interna q Re sum_k (w/r)^k e^(-jk theta), ambas vezes 1/(2 pi E r). Os coeficientes
+    # somam as M cargas uma única vez e o máximo é procurado em n_pontos ângulos.
+    theta = 2 * np.pi * np.arange(n_pontos) / n_pontos
+    x, h, raio = (v.reshape(-1, ns) for v in (x, h, raio))
+    p = (px + 1j * py).reshape(x.shape[0], -1)
+    pq = pq.reshape(x.shape[0], -1)
+    gradiente = np.empty(x.shape)
+    bloco = max(1, TERMOS_POR_BLOCO // p.shape[1])
+    for inicio in range(0, x.shape[0], bloco):
+        b = slice(inicio, inicio + bloco)
+        for i in range(ns):
+            interna = dono == i
+            r = raio[b, i, np.newaxis]
+            w = p[b] - (x[b, i] + 1j * h[b, i])[:, np.newaxis]
+            u = r / w[:, ~interna]     # |u| < 1: cargas fora do subcondutor
+            v = w[:, interna] / r      # |v| < 1: cargas dentro do subcondutor
+            F = _coeficientes_fourier(u, v, pq[b][:, ~interna], pq[b][:, interna])
+            k = np.arange(F.shape[-1])
+            # F tem a forma (P, 2, N): partes real e imaginária das cargas (fasores).
+            E_n = (F @ np.exp(1j * np.outer(k, theta))).real / (2 * math.pi * E * r[:, :, np.newaxis])
+            gradiente[b, i] = np.abs(E_n[:, 0] + 1j * E_n[:, 1]).max(axis=-1)
+    return gradiente.reshape(forma)
+
+def gradiente_subcondutores(x, h, n, d, raio, V, fases=None, ordem=1, n_pontos=N_PONTOS):
+    """
+    Gradiente superficial máximo de cada subcondutor de uma ou várias torres.
+
+    Expande os feixes (`expandir_feixes`), monta a matriz de potenciais de todos os
+    subcondutores, obtém as cargas para as tensões aplicadas (`cargas_subcondutores`) e aplica
+    o método das imagens sucessivas. Vários projetos com a mesma topologia (mesmos n e fases)
+    são tratados de uma vez passando x, h, d, raio e V com um eixo inicial de projetos.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas (..., B) dos centros dos feixes (metros).
+    n (array_like): Número de subcondutores de cada feixe (B,).
+    d (float ou array_like): Distância entre subcondutores adjacentes (..., B) (metros).
+    raio (float ou array_like): Raio físico dos subcondutores (..., B) (metros).
+    V (array_like): Tensões das fases (..., Nf), em V.
+    fases (array_like, opcional): Fase de cada feixe, ou -1 para para-raios aterrados.
+                                  Padrão: cada feixe é uma fase.
+    ordem (int, opcional): Ordem das imagens sucessivas. Padrão: 1.
+    n_pontos (int, opcional): Pontos avaliados na superfície de cada subcondutor.
+
+    Retorna:
+    tuple: (gradientes, fases_sub), com os gradientes máximos (..., Ns) em V/m e a fase (Ns,)
+           de cada subcondutor.
+    """
+    x, h, d, raio = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x, h, d, raio)))
+    B = x.shape[-1]
+    n = np.broadcast_to(np.asarray(n), (B,))
+    fases = np.arange(B) if fases is None else np.asarray(fases)
+
+    # Expansão vetorizada dos feixes de todos os projetos: as posições relativas ao centro são
+    # proporcionais a d, então basta expandir uma vez com d = 1 e escalar por projeto.
+    dx, dy, _, fases_sub = expandir_feixes(np.zeros(B), np.zeros(B), n, 1.0, 1.0, fases=fases)
+    feixe = np.repeat(np.arange(B), n)
+    xs = x[..., feixe] + d[..., feixe] * dx
+    hs = h[..., feixe] + d[..., feixe] * dy
+    rs = raio[..., feixe]
+
+    q = cargas_subcondutores(_potenciais(xs, hs, rs), fases_sub, V)
+    return gradiente_imagens_sucessivas(xs, hs, rs, q, ordem=ordem, n_pontos=n_pontos), fases_sub
+
+def _coeficientes_fourier(u, v, q_externa, q_interna):
+    """
+    Coeficientes F_k (P, 2, N) do campo normal sum_k Re(F_k e^(jk theta)) para as partes real e
+    imaginária das cargas, com N escolhido para que max(|u|, |v|)^N < TOLERANCIA_SERIE.
+    """
+    rho = max(np.abs(u).max(initial=0.0), np.abs(v).max(initial=0.0))
+    if rho >= 1:
+        raise ValueError("ERRO! Há cargas sobre a superfície de um subcondutor (subcondutores sobrepostos).")
+    n_termos = 2 if rho == 0 else max(2, int(math.ceil(math.log(TOLERANCIA_SERIE) / math.log(rho))) + 1)
+
+    cargas_ext = np.stack([q_externa.real, q_externa.imag], axis=1)   # (P, 2, Me)
+    cargas_int = np.stack([q_interna.real, q_interna.imag], axis=1)   # (P, 2, Mi)
+    F = np.empty(cargas_ext.shape[:2] + (n_termos,), dtype=complex)
+    F[..., 0] = cargas_int.sum(axis=-1)
+    pot_u, pot_v = np.ones_like(u), np.ones_like(v)
+    for k in range(1, n_termos):
+        pot_u = pot_u * u
+        pot_v = pot_v * v
+        # Re(conj(b) e^(jk theta)) = Re(b e^(-jk theta)) para os termos das cargas internas.
+        F[..., k] = (np.conj(np.einsum('pcm,pm->pc', cargas_int, pot_v))
+                     - np.einsum('pcm,pm->pc', cargas_ext, pot_u))
+    return F
+
+def _com_imagens_no_solo(px, py, pq, dono):
+    """Acrescenta às cargas (..., M) as suas imagens no solo (dono -1)."""
+    return (np.concatenate([px, px], axis=-1), np.concatenate([py, -py], axis=-1),
+            np.concatenate([pq, -pq], axis=-1), np.concatenate([dono, np.full(dono.shape, -1)]))
+
+def _potenciais(x, h, raio):
+    """Matrizes de potenciais de Maxwell (..., N, N) de várias torres (m/F), pela pilha de TowerGeometry."""
+    return TowerGeometry(x, h).coeficientes_maxwell(raio) / (2 * math.pi * E)
+
+class TestGradienteSuperficial(unittest.TestCase):
+
+    def setUp(self):
+        # Linha com feixes quádruplos, 500 kV.
+        self.x = np.array([-11.0, 0.0, 11.0])
+        self.h = np.array([22.0, 22.0, 22.0])
+        self.r, self.d, self.n = 0.0148, 0.457, 4
+        a = np.exp(2j * np.pi / 3)
+        self.V = 500e3 / np.sqrt(3) * np.array([1, a**2, a])
+
+    def test_condutor_isolado(self):
+        """Um condutor simples longe do solo tem campo quase uniforme, q / (2 pi E r)."""
+        q = 1e-6
+        g = gradiente_imagens_sucessivas([0.0], [1000.0], 0.01, [q])
+        np.testing.assert_allclose(g, q / (2 * math.pi * E * 0.01), rtol=1e-4)
+
+    def test_cilindro_sobre_plano_exato(self):
+        """Condutor próximo ao solo: com imagens sucessivas, o campo máximo tende ao valor exato."""
+        r, h, V = 0.05, 0.3, 1.0
+        # Solução exata: carga equivalente em sqrt(h^2 - r^2) e campo máximo no ponto mais baixo.
+        a = math.sqrt(h**2 - r**2)
+        q = 2 * math.pi * E * V / math.acosh(h / r)
+        E_exato = q / (2 * math.pi * E) * (1 / (a - (h - r)) + 1 / (a + (h - r)))
+        erros = [abs(gradiente_imagens_sucessivas([0.0], [h], r, [q], ordem=o, n_pontos=360)[0] / E_exato - 1)
+                 for o in (0, 1, 2)]
+        self.assertLess(erros[2], erros[0])
+        self.assertLess(erros[2], 1e-3)
+
+    def test_markt_mengele_proximo_das_imagens(self):
+        """Os dois métodos concordam em cerca de 2% para um feixe quádruplo típico."""
+        from Transversais.feixe_condutor import metodo_feixe_condutor_tran
+        C = metodo_feixe_condutor_tran(self.r, self.r, self.r, 4, 4, 4, self.d, self.d, self.d,
+                                       self.x[0], self.h[0], self.x[1], self.h[1], self.x[2], self.h[2], 100, 1.0)
+        _, E_mm = gradiente_markt_mengele(C, self.V, self.n, self.d, self.r)
+        g, fases = gradiente_subcondutores(self.x, self.h, self.n, self.d, self.r, self.V)
+        self.assertEqual(g.shape, (12,))
+        E_max = np.array([g[fases == f].max() for f in range(3)])
+        np.testing.assert_allclose(E_max, E_mm, rtol=2e-2)
+        # A fase central é a mais solicitada neste arranjo horizontal.
+        self.assertEqual(int(np.argmax(E_max)), 1)
+
+    def test_vetorizado_em_projetos(self):
+        """Vários projetos de uma vez coincidem com o cálculo de cada projeto isolado."""
+        alturas = np.array([18.0, 22.0, 26.0])[:, None] * np.ones(3)
+        g, _ = gradiente_subcondutores(self.x, alturas, self.n, self.d, self.r, self.V)
+        self.assertEqual(g.shape, (3, 12))
+        for k in range(3):
+            g_k, _ = gradiente_subcondutores(self.x, alturas[k], self.n, self.d, self.r, self.V)
+            np.testing.assert_allclose(g[k], g_k, rtol=1e-12)
+        # Markt-Mengele vetorizado com uma pilha de matrizes de capacitância
+        C = np.linalg.inv(_potenciais(np.broadcast_to(self.x, (3, 3)), alturas, np.full((3, 3), 0.2)))
+        E_med, E_max = gradiente_markt_mengele(C, self.V, self.n, self.d, self.r)
+        self.assertEqual(E_max.shape, (3, 3))
+        self.assertTrue(np.all(E_max > E_med))
+
+    def test_para_raios_e_validacoes(self):
+        """Para-raios aterrados têm carga induzida e entradas inválidas levantam ValueError."""
+        x = np.append(self.x, [-6.0, 6.0])
+        h = np.append(self.h, [32.0, 32.0])
+        g, fases = gradiente_subcondutores(x, h, [4, 4, 4, 1, 1], self.d, [self.r] * 3 + [0.005] * 2,
+                                           self.V, fases=[0, 1, 2, -1, -1])
+        self.assertEqual(fases.tolist()[-2:], [-1, -1])
+        self.assertTrue(np.all(g[-2:] > 0))
+        with self.assertRaisesRegex(ValueError, "raios devem ser positivos"):
+            gradiente_imagens_sucessivas([0.0], [10.0], 0.0, [1e-6])
+        with self.assertRaisesRegex(ValueError, "ordem das imagens"):
+            gradiente_imagens_sucessivas([0.0], [10.0], 0.01, [1e-6], ordem=-1)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
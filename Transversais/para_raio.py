@@ -1,6 +1,9 @@
 import math
 import numpy as np
 
+from longitudinais.geometria import obter_geometria
+from longitudinais.reducao_kron import capacitancia_kron, matrizes_mal_condicionadas
+
 def metodo_para_raio_tran(
         ra, rb, rc,
         xa_pos1, ha_pos1, xb_pos2, hb_pos2, xc_pos3, hc_pos3,
@@ -66,84 +69,54 @@ def metodo_para_raio_tran(
         if r_pr_val <= 0:
             raise ValueError("ERRO! Os raios dos cabos para-raios devem ser positivos.")
 
-    # --- Inicializa a matriz de capacitância total transposta ---
-    C_transp_total = np.zeros((3, 3))
-
-    # --- Iterar sobre as 3 Seções da Transposição ---
-    for section_idx in range(3):
-        # Define as coordenadas e raios para a seção atual da transposição
-        if section_idx == 0:  # Seção 1: A na pos1, B na pos2, C na pos3
-            current_xa, current_ha = xa_pos1, ha_pos1
-            current_xb, current_hb = xb_pos2, hb_pos2
-            current_xc, current_hc = xc_pos3, hc_pos3
-            current_l = l1
-            current_x_pr = x_pr_pos1
-            current_h_pr = h_pr_pos1
-            cond_r_sec = [ra, rb, rc] + r_pr
-        elif section_idx == 1:  # Seção 2: A na pos2, B na pos3, C na pos1
-            current_xa, current_ha = xb_pos2, hb_pos2
-            current_xb, current_hb = xc_pos3, hc_pos3
-            current_xc, current_hc = xa_pos1, ha_pos1
-            current_l = l2
-            current_x_pr = x_pr_pos2
-            current_h_pr = h_pr_pos2
-            cond_r_sec = [rc, ra, rb] + r_pr  # C (na pos1), A (na pos2), B (na pos3)
-        else:  # Seção 3: A na pos3, B na pos1, C na pos2
-            current_xa, current_ha = xc_pos3, hc_pos3
-            current_xb, current_hb = xa_pos1, ha_pos1
-            current_xc, current_hc = xb_pos2, hb_pos2
-            current_l = l3
-            current_x_pr = x_pr_pos3
-            current_h_pr = h_pr_pos3
-            cond_r_sec = [rb, rc, ra] + r_pr  # B (na pos1), C (na pos2), A (na pos3)
-
-        if current_l == 0:  # Pula a seção se o comprimento for zero
-            continue
-
-        # Coordenadas de TODOS os condutores (fases + para-raios) para a seção atual
-        cond_x_sec = [current_xa, current_xb, current_xc] + current_x_pr
-        cond_h_sec = [current_ha, current_hb, current_hc] + current_h_pr
-
-        n_total = len(cond_x_sec)  # Número total de condutores (fases + para-raios)
-
-        # --- Construção da Matriz de Potencial (P) estendida (n_total x n_total) para a seção atual ---
-        P_extended_sec = np.zeros((n_total, n_total))
-        for i in range(n_total):
-            for j in range(n_total):
-                xi, hi, ri = cond_x_sec[i], cond_h_sec[i], cond_r_sec[i]
-                xj, hj, rj = cond_x_sec[j], cond_h_sec[j], cond_r_sec[j]
-
-                if i == j:  # Elemento P_ii (auto-potencial)
-                    P_extended_sec[i, j] = 1 / (2 * math.pi * E) * math.log((2 * hi) / ri)
-                else:  # Elemento P_ij (potencial mútuo)
-                    d = np.sqrt(((xi - xj) ** 2) + ((hi - hj) ** 2))
-                    d_prime = np.sqrt(((xi - xj) ** 2) + ((hi + hj) ** 2))
-                    P_extended_sec[i, j] = 1 / (2 * math.pi * E) * math.log(d_prime / d)
-
-        # --- Redução da Matriz de Potencial (Kron Reduction) ---
-        # Particiona P_extended_sec em submatrizes: P_ff, P_fg, P_gf, P_gg
-        # 'f' são as fases (índices 0, 1, 2); 'g' são os para-raios (índices 3 em diante).
-
-        P_ff = P_extended_sec[0:3, 0:3]
-        P_fg = P_extended_sec[0:3, 3:n_total]
-        P_gf = P_extended_sec[3:n_total, 0:3]
-        P_gg = P_extended_sec[3:n_total, 3:n_total]
-
-        # Verifica se P_gg é invertível para evitar erros, apenas se houver para-raios
-        if num_pr > 0:
-            if np.linalg.det(P_gg) == 0:
-                raise ValueError(
-                    f"ERRO! A submatriz P_gg para a seção {section_idx + 1} é singular e não pode ser invertida. Verifique as posições dos para-raios.")
-            P_gg_inv = np.linalg.inv(P_gg)
-            # P_reduzida = P_ff - P_fg * P_gg_inv * P_gf
-            P_reduced_sec = P_ff - np.dot(np.dot(P_fg, P_gg_inv), P_gf)
-        else:  # Se não há para-raios, a matriz de potencial reduzida é simplesmente P_ff.
-            P_reduced_sec = P_ff
-
-        # Cálculo da Matriz de Capacitância para a Seção (por unidade de comprimento)
-        C_matrix_sec_per_m = np.linalg.inv(P_reduced_sec)
-
-        # Adiciona a capacitância total da seção à matriz total transposta
-        C_transp_total += C_matrix_sec_per_m * current_l
+    # --- Coordenadas e raios de cada uma das 3 Seções da Transposição ---
+    # Seção 1: A na pos1, B na pos2, C na pos3
+    # Seção 2: A na pos2, B na pos3, C na pos1
+    # Seção 3: A na pos3, B na pos1, C na pos2
+    secoes = [
+        ([xa_pos1, xb_pos2, xc_pos3] + list(x_pr_pos1), [ha_pos1, hb_pos2, hc_pos3] + list(h_pr_pos1),
+         [ra, rb, rc] + list(r_pr), l1),
+        ([xb_pos2, xc_pos3, xa_pos1] + list(x_pr_pos2), [hb_pos2, hc_pos3, ha_pos1] + list(h_pr_pos2),
+         [rc, ra, rb] + list(r_pr), l2),  # C (na pos1), A (na pos2), B (na pos3)
+        ([xc_pos3, xa_pos1, xb_pos2] + list(x_pr_pos3), [hc_pos3, ha_pos1, hb_pos2] + list(h_pr_pos3),
+         [rb, rc, ra] + list(r_pr), l3),  # B (na pos1), C (na pos2), A (na pos3)
+    ]
+    # Seções de comprimento zero não contribuem e são puladas.
+    numeros_secoes = [k + 1 for k, secao in enumerate(secoes) if secao[3] != 0]
+    secoes = [secao for secao in secoes if secao[3] != 0]
+
+    # Pilhas (S, n_total) com as coordenadas e raios de TODOS os condutores (fases + para-raios) por seção
+    cond_x = np.array([secao[0] for secao in secoes], dtype=float)
+    cond_h = np.array([secao[1] for secao in secoes], dtype=float)
+    cond_r = np.array([secao[2] for secao in secoes], dtype=float)
+    comprimentos = np.array([secao[3] for secao in secoes], dtype=float)
+
+    # --- Construção das Matrizes de Potencial (P) estendidas (S, n_total, n_total) de todas as seções ---
+    # A geometria (distâncias diretas d e até as imagens d_prime) de cada seção vem do cache,
+    # e seções com a mesma disposição de condutores compartilham o mesmo cálculo.
+    # Na diagonal, d é o raio do condutor e d_prime a distância até a própria imagem (2h),
+    # de modo que P_ii = 1/(2 pi E) * log(2h/r) e P_ij = 1/(2 pi E) * log(d_prime/d).
+    P_extended = 1 / (2 * math.pi * E) * np.stack([
+        obter_geometria(x_sec, h_sec).coeficientes_maxwell(r_sec)
+        for x_sec, h_sec, r_sec in zip(cond_x, cond_h, cond_r)
+    ])
+
+    # --- Redução da Matriz de Potencial (Kron Reduction) ---
+    # 'f' são as fases (índices 0, 1, 2); 'g' são os para-raios (índices 3 em diante).
+    # Verifica, pelo número de condição, se P_gg é invertível em cada seção, apenas se houver para-raios.
+    if num_pr > 0:
+        singulares = matrizes_mal_condicionadas(P_extended[:, 3:, 3:])
+        if np.any(singulares):
+            section_idx = numeros_secoes[int(np.argmax(singulares))]
+            raise ValueError(
+                f"ERRO! A submatriz P_gg para a seção {section_idx} é singular e não pode ser invertida. Verifique as posições dos para-raios.")
+
+    # Matriz de Capacitância das fases para cada seção (por unidade de comprimento):
+    # inv(P_ff - P_fg * inv(P_gg) * P_gf) é o bloco das fases de inv(P_extended),
+    # obtido por solução de sistema linear, sem inversas explícitas.
+    C_matrix_sec_per_m = capacitancia_kron(P_extended, 3, limite_condicionamento=None)
+
+    # --- Capacitância total da linha transposta: soma das seções ponderada pelos comprimentos ---
+    C_transp_total = np.einsum('s,sij->ij', comprimentos, C_matrix_sec_per_m)
 
     return C_transp_total  # Retorna a matriz de capacitância total da linha transposta (em Farads)
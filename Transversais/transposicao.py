@@ -1,7 +1,12 @@
 import numpy as np
 import math
 
-def metodo_transposicao_tran(ra, rb, rc, xa_pos1, ha_pos1, xb_pos2, hb_pos2, xc_pos3, hc_pos3, rho, l1, l2, l3):
+from longitudinais.geometria import obter_geometria
+from longitudinais.reducao_kron import capacitancia_kron
+from longitudinais.transposicao_ciclica import esquema_transposicao_ciclico, permutar_secoes, transpor_matriz
+
+def metodo_transposicao_tran(ra, rb, rc, xa_pos1, ha_pos1, xb_pos2, hb_pos2, xc_pos3, hc_pos3, rho, l1, l2, l3,
+                             geometria=None):
     """
     Calcula a matriz de capacitância de fase para uma linha de transmissão trifásica
     totalmente transposta, incorporando diretamente o Método das Imagens para cada seção.
@@ -18,6 +23,8 @@ def metodo_transposicao_tran(ra, rb, rc, xa_pos1, ha_pos1, xb_pos2, hb_pos2, xc_
                               As alturas devem ser positivas.
     rho (float): Resistividade do solo (em Ohm.m).
     l1, l2, l3 (float): Comprimentos das três seções da transposição (em metros).
+    geometria (TowerGeometry, opcional): Geometria já calculada das posições físicas 1, 2 e 3. Se
+                                         fornecida, as coordenadas e alturas são ignoradas (podem ser None).
 
     Retorna:
     numpy.ndarray: Matriz de capacitância de fase (3x3) da linha transposta (em Farads).
@@ -30,7 +37,7 @@ def metodo_transposicao_tran(ra, rb, rc, xa_pos1, ha_pos1, xb_pos2, hb_pos2, xc_
     # --- Validações de Entrada ---
     if rho <= 0:
         raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
-    if ha_pos1 <= 0 or hb_pos2 <= 0 or hc_pos3 <= 0:
+    if np.any(np.asarray([ha_pos1, hb_pos2, hc_pos3] if geometria is None else geometria.h) <= 0):
         raise ValueError(
             "ERRO! As alturas das posições físicas (Ha_pos1, Hb_pos2, Hc_pos3) devem ser maiores que zero.")
     if l1 < 0 or l2 < 0 or l3 < 0:
@@ -38,132 +45,36 @@ def metodo_transposicao_tran(ra, rb, rc, xa_pos1, ha_pos1, xb_pos2, hb_pos2, xc_
     if (l1 + l2 + l3) == 0:
         raise ValueError("ERRO! O comprimento total da linha (l1+l2+l3) não pode ser zero.")
 
-    # --- Inicializa a matriz de capacitância total transposta ---
-    C_transp_total = np.zeros((3, 3))
-
-    # --- Seção 1 (l1): Fases A, B, C nas Posições 1, 2, 3 respectivamente ---
-    # Coordenadas dos condutores A, B, C nesta seção
-    xa, ha = xa_pos1, ha_pos1
-    xb, hb = xb_pos2, hb_pos2
-    xc, hc = xc_pos3, hc_pos3
-
-    # Raios dos condutores A, B, C nesta seção (são sempre os mesmos)
-    ra_sec, rb_sec, rc_sec = ra, rb, rc
-
-    # Cálculo das Distâncias para a Seção 1
-    dab = np.sqrt(((xa - xb) ** 2) + ((ha - hb) ** 2))
-    dac = np.sqrt(((xa - xc) ** 2) + ((ha - hc) ** 2))
-    dbc = np.sqrt(((xb - xc) ** 2) + ((hb - hc) ** 2))
-
-    dab_1 = np.sqrt(((xa - xb) ** 2) + ((ha + hb) ** 2))
-    dac_1 = np.sqrt(((xa - xc) ** 2) + ((ha + hc) ** 2))
-    dbc_1 = np.sqrt(((xb - xc) ** 2) + ((hb + hc) ** 2))
-
-    # Construção da Matriz de Potencial (P) para a Seção 1
-    Paa = 1 / (2 * math.pi * E) * math.log((2 * ha) / ra_sec)
-    Pbb = 1 / (2 * math.pi * E) * math.log((2 * hb) / rb_sec)
-    Pcc = 1 / (2 * math.pi * E) * math.log((2 * hc) / rc_sec)
-
-    Pab = 1 / (2 * math.pi * E) * math.log(dab_1 / dab)
-    Pba = Pab
-    Pac = 1 / (2 * math.pi * E) * math.log(dac_1 / dac)
-    Pca = Pac
-    Pbc = 1 / (2 * math.pi * E) * math.log(dbc_1 / dbc)
-    Pcb = Pbc
-
-    P_matrix_sec1 = np.array([
-        [Paa, Pab, Pac],
-        [Pba, Pbb, Pbc],
-        [Pca, Pcb, Pcc]
-    ])
-
-    # Cálculo da Matriz de Capacitância para a Seção 1 (por unidade de comprimento)
-    C_matrix_sec1_per_m = np.linalg.inv(P_matrix_sec1)
-    C_transp_total += C_matrix_sec1_per_m * l1  # Adiciona a capacitância total da seção 1
-
-    # --- Seção 2 (l2): Fases A, B, C nas Posições 2, 3, 1 respectivamente ---
-    # Condutor A (ra) nas coordenadas (xb_pos2, hb_pos2)
-    # Condutor B (rb) nas coordenadas (xc_pos3, hc_pos3)
-    # Condutor C (rc) nas coordenadas (xa_pos1, ha_pos1)
-    xa, ha = xb_pos2, hb_pos2
-    xb, hb = xc_pos3, hc_pos3
-    xc, hc = xa_pos1, ha_pos1
-
-    # Raios dos condutores A, B, C nesta seção (são sempre os mesmos)
-    ra_sec, rb_sec, rc_sec = ra, rb, rc
-
-    # Cálculo das Distâncias para a Seção 2
-    dab = np.sqrt(((xa - xb) ** 2) + ((ha - hb) ** 2))
-    dac = np.sqrt(((xa - xc) ** 2) + ((ha - hc) ** 2))
-    dbc = np.sqrt(((xb - xc) ** 2) + ((hb - hc) ** 2))
-
-    dab_1 = np.sqrt(((xa - xb) ** 2) + ((ha + hb) ** 2))
-    dac_1 = np.sqrt(((xa - xc) ** 2) + ((ha + hc) ** 2))
-    dbc_1 = np.sqrt(((xb - xc) ** 2) + ((hb + hc) ** 2))
-
-    # Construção da Matriz de Potencial (P) para a Seção 2
-    Paa = 1 / (2 * math.pi * E) * math.log((2 * ha) / ra_sec)
-    Pbb = 1 / (2 * math.pi * E) * math.log((2 * hb) / rb_sec)
-    Pcc = 1 / (2 * math.pi * E) * math.log((2 * hc) / rc_sec)
-
-    Pab = 1 / (2 * math.pi * E) * math.log(dab_1 / dab)
-    Pba = Pab
-    Pac = 1 / (2 * math.pi * E) * math.log(dac_1 / dac)
-    Pca = Pac
-    Pbc = 1 / (2 * math.pi * E) * math.log(dbc_1 / dbc)
-    Pcb = Pbc
-
-    P_matrix_sec2 = np.array([
-        [Paa, Pab, Pac],
-        [Pba, Pbb, Pbc],
-        [Pca, Pcb, Pcc]
-    ])
-
-    # Cálculo da Matriz de Capacitância para a Seção 2 (por unidade de comprimento)
-    C_matrix_sec2_per_m = np.linalg.inv(P_matrix_sec2)
-    C_transp_total += C_matrix_sec2_per_m * l2  # Adiciona a capacitância total da seção 2
-
-    # --- Seção 3 (l3): Fases A, B, C nas Posições 3, 1, 2 respectivamente ---
-    # Condutor A (ra) nas coordenadas (xc_pos3, hc_pos3)
-    # Condutor B (rb) nas coordenadas (xa_pos1, ha_pos1)
-    # Condutor C (rc) nas coordenadas (xb_pos2, hb_pos2)
-    xa, ha = xc_pos3, hc_pos3
-    xb, hb = xa_pos1, ha_pos1
-    xc, hc = xb_pos2, hb_pos2
-
-    # Raios dos condutores A, B, C nesta seção (são sempre os mesmos)
-    ra_sec, rb_sec, rc_sec = ra, rb, rc
-
-    # Cálculo das Distâncias para a Seção 3
-    dab = np.sqrt(((xa - xb) ** 2) + ((ha - hb) ** 2))
-    dac = np.sqrt(((xa - xc) ** 2) + ((ha - hc) ** 2))
-    dbc = np.sqrt(((xb - xc) ** 2) + ((hb - hc) ** 2))
-
-    dab_1 = np.sqrt(((xa - xb) ** 2) + ((ha + hb) ** 2))
-    dac_1 = np.sqrt(((xa - xc) ** 2) + ((ha + hc) ** 2))
-    dbc_1 = np.sqrt(((xb - xc) ** 2) + ((hb + hc) ** 2))
-
-    # Construção da Matriz de Potencial (P) para a Seção 3
-    Paa = 1 / (2 * math.pi * E) * math.log((2 * ha) / ra_sec)
-    Pbb = 1 / (2 * math.pi * E) * math.log((2 * hb) / rb_sec)
-    Pcc = 1 / (2 * math.pi * E) * math.log((2 * hc) / rc_sec)
-
-    Pab = 1 / (2 * math.pi * E) * math.log(dab_1 / dab)
-    Pba = Pab
-    Pac = 1 / (2 * math.pi * E) * math.log(dac_1 / dac)
-    Pca = Pac
-    Pbc = 1 / (2 * math.pi * E) * math.log(dbc_1 / dbc)
-    Pcb = Pbc
-
-    P_matrix_sec3 = np.array([
-        [Paa, Pab, Pac],
-        [Pba, Pbb, Pbc],
-        [Pca, Pcb, Pcc]
-    ])
-
-    # Cálculo da Matriz de Capacitância para a Seção 3 (por unidade de comprimento)
-    C_matrix_sec3_per_m = np.linalg.inv(P_matrix_sec3)
-    C_transp_total += C_matrix_sec3_per_m * l3  # Adiciona a capacitância total da seção 3
+    # --- Geometria por Posição Física (calculada uma única vez para todas as seções) ---
+    # Parte geométrica dos coeficientes de potencial, por posição: log(d_1/d) fora da diagonal
+    # e log(2h) na diagonal, reaproveitada do cache de geometrias. O raio entra à parte,
+    # pois acompanha o condutor de cada fase.
+    if geometria is None:
+        geometria = obter_geometria([xa_pos1, xb_pos2, xc_pos3], [ha_pos1, hb_pos2, hc_pos3])
+    if geometria.condutores_coincidentes:
+        raise ValueError("ERRO! Dois condutores não podem ocupar a mesma posição.")
+    G_pos = geometria.log_razao_imagem
+
+    # --- Matrizes de Potencial (P) das 3 Seções, por fase ---
+    # Seção 1 (l1): Fases A, B, C nas Posições 1, 2, 3
+    # Seção 2 (l2): Fases A, B, C nas Posições 2, 3, 1
+    # Seção 3 (l3): Fases A, B, C nas Posições 3, 1, 2
+    # Cada seção é uma permutação da mesma matriz por posição; os raios (ra, rb, rc) seguem as fases:
+    # P_ii = 1/(2 pi E) * log(2h/r_i) e P_ij = 1/(2 pi E) * log(d_1/d).
+    esquema = esquema_transposicao_ciclico(n_secoes=3, n_fases=3, sentido=1)
+    log_r = np.log([ra, rb, rc])
+    comprimentos = np.array([l1, l2, l3], dtype=float)
+
+    if ra == rb == rc:
+        # Com raios iguais, o termo do raio é um múltiplo da identidade e comuta com as permutações:
+        # basta uma única matriz de capacitância por posição, permutada e somada (forma fechada).
+        P_pos = 1 / (2 * math.pi * E) * (G_pos - log_r[0] * np.eye(3))
+        C_pos_per_m = capacitancia_kron(P_pos, 3, limite_condicionamento=None)
+        C_transp_total = transpor_matriz(C_pos_per_m, comprimentos, esquema)
+    else:
+        # Caso geral: as 3 matrizes de potencial são montadas juntas e resolvidas em lote.
+        P_secoes = 1 / (2 * math.pi * E) * (permutar_secoes(G_pos, esquema) - np.diag(log_r))
+        C_secoes_per_m = capacitancia_kron(P_secoes, 3, limite_condicionamento=None)
+        C_transp_total = np.einsum('s,sij->ij', comprimentos, C_secoes_per_m)
 
     return C_transp_total
-
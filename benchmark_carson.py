@@ -0,0 +1,57 @@
+"""
+Comparação de custo entre a aproximação de primeira ordem de Carson, a série completa,
+o modelo da profundidade complexa e a integral do solo em camadas.
+
+Mede o tempo para montar a pilha (F, N, N) de impedâncias de uma torre de circuito duplo
+com dois para-raios (N = 8), em uma varredura de frequências, para o modelo 'aproximado',
+para o modelo 'serie' com diferentes ordens de truncamento, para o modelo
+'profundidade_complexa' e para o modelo 'multicamadas' com uma única camada (mesmo solo),
+e mostra a diferença máxima de cada um para a série completa.
+
+Uso:
+    python benchmark_carson.py [--frequencias 200] [--rho 1000] [--repeticoes 20]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from longitudinais.Carson_n_condutores import metodo_carson_n_condutores_varredura
+from longitudinais.geometria import obter_geometria
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da correção de Carson: aproximação x série completa.")
+    parser.add_argument('--frequencias', type=int, default=200, help="Número de frequências da varredura.")
+    parser.add_argument('--rho', type=float, default=1000.0, help="Resistividade do solo (Ohm.m).")
+    parser.add_argument('--repeticoes', type=int, default=20, help="Repetições de cada medição.")
+    args = parser.parse_args(argv)
+
+    # Torre de circuito duplo com dois para-raios.
+    x = np.array([-6.0, -6.5, -6.0, 6.0, 6.5, 6.0, -4.0, 4.0])
+    h = np.array([20.0, 26.0, 32.0, 20.0, 26.0, 32.0, 38.0, 38.0])
+    r = np.array([0.05e-3] * 6 + [0.3e-3] * 2)
+    Rmg_val = np.array([0.0124] * 6 + [0.004] * 2)
+    frequencias = np.logspace(1, 6, args.frequencias) # 10 Hz a 1 MHz
+    geometria = obter_geometria(x, h)
+
+    def calcular(modelo, ordem=None):
+        extra = {} if ordem is None else {'ordem_serie': ordem}
+        return metodo_carson_n_condutores_varredura(r, None, None, args.rho, frequencias, Rmg_val=Rmg_val,
+                                                    geometria=geometria, modelo_solo=modelo, **extra)
+
+    casos = ([('aproximado', None)] + [('serie', ordem) for ordem in (8, 16, 24, 32)]
+             + [('profundidade_complexa', None), ('multicamadas', None)])
+    Z_ref = calcular('serie', 60)
+
+    print(f"N = {len(x)} condutores, F = {len(frequencias)} frequências, rho = {args.rho} Ohm.m")
+    print(f"{'modelo':<24}{'ordem':>6}{'tempo (ms)':>14}{'relativo':>10}{'erro máx. |dZ|/|Z|':>22}")
+    tempo_base = None
+    for modelo, ordem in casos:
+        tempo = min(timeit.repeat(lambda: calcular(modelo, ordem), number=1, repeat=args.repeticoes)) * 1e3
+        tempo_base = tempo_base or tempo
+        erro = np.max(np.abs(calcular(modelo, ordem) - Z_ref) / np.abs(Z_ref))
+        print(f"{modelo:<24}{'-' if ordem is None else ordem:>6}{tempo:>14.3f}{tempo / tempo_base:>10.1f}{erro:>22.2e}")
+
+if __name__ == '__main__':
+    main()
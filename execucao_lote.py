@@ -0,0 +1,407 @@
+"""
+Execução em lote (sem interface gráfica) dos métodos de cálculo de parâmetros de linhas.
+
+Lê uma tabela de casos (CSV ou Parquet), com uma linha por caso e uma coluna para cada
+parâmetro (os mesmos nomes e unidades das chaves dos dicionários de `_get_input_values`
+da interface), e grava os resultados em blocos, de modo que milhões de casos podem ser
+processados com memória limitada. As colunas da interface com nome diferente do parâmetro
+da função são renomeadas (COLUNAS_INTERFACE) e, como na interface, o comprimento em km dos
+métodos de Carson multiplica a matriz em Ohm/km (COLUNAS_COMPRIMENTO), resultando em Ohm;
+sem essa coluna, o resultado é por km. Os nomes dos parâmetros da função também são aceitos.
+
+Exemplo:
+    python execucao_lote.py carson_long casos.csv resultados.csv --tamanho-bloco 5000 --processos 8
+
+Colunas vazias usam o valor padrão do parâmetro. Parâmetros que são listas (por exemplo,
+os para-raios de `para_raio_tran`) são escritos como JSON: "[0.005, 0.004]".
+Cada matriz de resultado é achatada em colunas "<prefixo>_<i>_<j>_re" e "<prefixo>_<i>_<j>_im".
+Casos inválidos não interrompem a execução: a mensagem vai para a coluna "erro".
+"""
+
+import argparse
+import csv
+import functools
+import itertools
+import json
+import math
+import sys
+
+import numpy as np
+import unittest
+
+from longitudinais.imagem import metodo_imagem_long
+from longitudinais.Carson_correcao import Metodo_Carson_long
+from longitudinais.Carson_pr import metodo_carson_para_raio
+from longitudinais.Carson_transposicao import metodo_carson_transp
+from longitudinais.feixes_de_condutores import calcular_rmg_feixe
+from longitudinais.componentes_simetricas_sintese import comp_sim_sintese
+from longitudinais.componentes_simetricas_analise import comp_sim_analise
+from Transversais.imagem import metodo_imagem_tran
+from Transversais.para_raio import metodo_para_raio_tran
+from Transversais.transposicao import metodo_transposicao_tran
+from Transversais.feixe_condutor import metodo_feixe_condutor_tran
+from Transversais.capacitancia_de_sequencia import metodo_capacitancia_sequencia_tran
+from execucao_paralela import mapear_em_ordem
+
+# Métodos disponíveis: nome -> (função, prefixo das colunas de resultado, forma do resultado).
+METODOS = {
+    'imagem_long': (metodo_imagem_long, 'Z', (3, 3)),
+    'carson_long': (Metodo_Carson_long, 'Z', (3, 3)),
+    'carson_para_raio': (metodo_carson_para_raio, 'Z', (3, 3)),
+    'carson_transp': (metodo_carson_transp, 'Z', (3, 3)),
+    'rmg_feixe': (calcular_rmg_feixe, 'RMG', ()),
+    'comp_sim_sintese': (comp_sim_sintese, 'Vabc', (3, 1)),
+    'comp_sim_analise': (comp_sim_analise, 'V012', (3, 1)),
+    'imagem_tran': (metodo_imagem_tran, 'C', (3, 3)),
+    'para_raio_tran': (metodo_para_raio_tran, 'C', (3, 3)),
+    'transposicao_tran': (metodo_transposicao_tran, 'C', (3, 3)),
+    'feixe_condutor_tran': (metodo_feixe_condutor_tran, 'C', (3, 3)),
+    'capacitancia_sequencia_tran': (metodo_capacitancia_sequencia_tran, 'C012', (3, 3)),
+}
+
+# Colunas dos dicionários de `_get_input_values` cujo nome difere do parâmetro da função: coluna -> parâmetro.
+COLUNAS_INTERFACE = {
+    'comp_sim_sintese': {f'Van{s}_{parte}': f'Zan{s}_{parte}' for s in '012' for parte in ('modulo', 'angulo')},
+    'comp_sim_analise': {f'V{f}_{parte}': f'Z{f}_{parte}' for f in 'abc' for parte in ('modulo', 'angulo')},
+}
+
+# Comprimento da linha (km) que, como na interface, multiplica o resultado em Ohm/km.
+COLUNAS_COMPRIMENTO = {
+    'carson_long': 'l_km',
+    'carson_para_raio': 'L',
+}
+
+TAMANHO_BLOCO = 10000 # Número padrão de casos lidos, calculados e gravados por vez.
+
+def colunas_resultado(metodo, coluna_id=None):
+    """
+    Retorna a lista de colunas do arquivo de saída para o método escolhido.
+
+    Parâmetros:
+    metodo (str): Nome do método (chave de METODOS).
+    coluna_id (str, opcional): Nome da coluna de identificação repassada da entrada.
+
+    Retorna:
+    list of str: Colunas na ordem em que são gravadas.
+    """
+    _, prefixo, forma = _obter_metodo(metodo)
+    colunas = [coluna_id] if coluna_id else []
+    for indice in np.ndindex(*forma):
+        nome = '_'.join([prefixo] + [str(i) for i in indice])
+        colunas += [f"{nome}_re", f"{nome}_im"]
+    return colunas + ['erro']
+
+def avaliar_bloco(metodo, casos, coluna_id=None):
+    """
+    Avalia um bloco de casos com o método escolhido.
+
+    Parâmetros:
+    metodo (str): Nome do método (chave de METODOS).
+    casos (list of dict): Casos, cada um com as colunas da interface ou os parâmetros da função
+                          (valores numéricos, textos numéricos ou listas em JSON). Valores
+                          vazios ou None usam o padrão da função.
+    coluna_id (str, opcional): Coluna de identificação, repassada sem alteração.
+
+    Retorna:
+    list of list: Uma linha por caso, na ordem de `colunas_resultado`. Casos com erro
+                  (inclusive valores que não podem ser convertidos) têm os resultados
+                  vazios (NaN) e a mensagem na última coluna.
+    """
+    funcao, _, forma = _obter_metodo(metodo)
+    n_valores = 2 * math.prod(forma)
+    linhas = []
+    for caso in casos:
+        linha = [caso.get(coluna_id)] if coluna_id else []
+        try:
+            parametros, comprimento = _parametros_caso(metodo, caso, coluna_id)
+            resultado = np.asarray(funcao(**parametros), dtype=complex).reshape(forma) * comprimento
+            valores = np.column_stack([resultado.real.ravel(), resultado.imag.ravel()]).ravel()
+            linha += valores.tolist() + ['']
+        except (ValueError, TypeError, ZeroDivisionError, np.linalg.LinAlgError) as e:
+            linha += [math.nan] * n_valores + [str(e)]
+        linhas.append(linha)
+    return linhas
+
+def ler_casos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê a tabela de casos em blocos, sem carregar o arquivo inteiro na memória.
+
+    Parâmetros:
+    caminho (str): Arquivo .csv ou .parquet (este último requer pyarrow).
+    tamanho_bloco (int, opcional): Número máximo de casos por bloco.
+
+    Retorna:
+    iterator of list of dict: Blocos de casos (um dicionário por linha).
+    """
+    if tamanho_bloco < 1:
+        raise ValueError("ERRO! O tamanho do bloco deve ser pelo menos 1.")
+    if caminho.lower().endswith('.parquet'):
+        _, pq = _importar_parquet()
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pylist()
+    else:
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            leitor = csv.DictReader(arquivo)
+            while True:
+                bloco = list(itertools.islice(leitor, tamanho_bloco))
+                if not bloco:
+                    break
+                yield bloco
+
+def executar_lote(metodo, entrada, saida, tamanho_bloco=TAMANHO_BLOCO, coluna_id=None, avaliar=None, processos=1):
+    """
+    Lê os casos de `entrada`, avalia o método escolhido e grava os resultados em `saida`, bloco a bloco.
+
+    Parâmetros:
+    metodo (str): Nome do método (chave de METODOS).
+    entrada (str): Arquivo de casos (.csv ou .parquet).
+    saida (str): Arquivo de resultados (.csv ou .parquet).
+    tamanho_bloco (int, opcional): Número de casos processados por vez.
+    coluna_id (str, opcional): Coluna de identificação repassada da entrada para a saída.
+    avaliar (callable, opcional): Função que recebe um iterador de blocos e devolve, na mesma
+                                  ordem, as linhas de resultado de cada bloco. Padrão: avaliação
+                                  com `avaliar_bloco`, em `processos` processos.
+    processos (int, opcional): Número de processos que avaliam os blocos em paralelo. Padrão: 1.
+
+    Retorna:
+    int: Número de casos processados.
+    """
+    _obter_metodo(metodo)
+    colunas = colunas_resultado(metodo, coluna_id)
+    if avaliar is None:
+        avaliar_um = functools.partial(avaliar_bloco, metodo, coluna_id=coluna_id)
+        avaliar = lambda blocos: mapear_em_ordem(avaliar_um, blocos, processos)
+
+    total = 0
+    with _EscritorResultados(saida, colunas, coluna_id) as escritor:
+        for linhas in avaliar(ler_casos(entrada, tamanho_bloco)):
+            escritor.gravar(linhas)
+            total += len(linhas)
+    return total
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Cálculo em lote de parâmetros de linhas de transmissão.")
+    parser.add_argument('metodo', choices=sorted(METODOS), help="Método de cálculo.")
+    parser.add_argument('entrada', help="Arquivo de casos (.csv ou .parquet).")
+    parser.add_argument('saida', help="Arquivo de resultados (.csv ou .parquet).")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO,
+                        help=f"Casos processados por vez (padrão: {TAMANHO_BLOCO}).")
+    parser.add_argument('--coluna-id', default=None,
+                        help="Coluna de identificação repassada para a saída.")
+    parser.add_argument('--processos', type=int, default=1,
+                        help="Processos que calculam os blocos em paralelo (padrão: 1; 0 usa todas as CPUs).")
+    args = parser.parse_args(argv)
+
+    try:
+        total = executar_lote(args.metodo, args.entrada, args.saida, args.tamanho_bloco, args.coluna_id,
+                              processos=args.processos or None)
+    except (OSError, ValueError, ImportError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"{total} casos processados.")
+    return 0
+
+class _EscritorResultados:
+    """Grava os blocos de resultados em CSV ou Parquet, à medida que são calculados."""
+
+    def __init__(self, caminho, colunas, coluna_id=None):
+        self.caminho = caminho
+        self.colunas = colunas
+        self.coluna_id = coluna_id
+        self.parquet = caminho.lower().endswith('.parquet')
+
+    def __enter__(self):
+        if self.parquet:
+            pa, pq = _importar_parquet()
+            campos = [pa.field(c, pa.string() if c in (self.coluna_id, 'erro') else pa.float64())
+                      for c in self.colunas]
+            self.schema = pa.schema(campos)
+            self.escritor = pq.ParquetWriter(self.caminho, self.schema)
+        else:
+            self.arquivo = open(self.caminho, 'w', newline='', encoding='utf-8')
+            self.escritor = csv.writer(self.arquivo)
+            self.escritor.writerow(self.colunas)
+        return self
+
+    def gravar(self, linhas):
+        if self.parquet:
+            pa, _ = _importar_parquet()
+            dados = {c: [linha[k] for linha in linhas] for k, c in enumerate(self.colunas)}
+            if self.coluna_id:
+                dados[self.coluna_id] = [None if v is None else str(v) for v in dados[self.coluna_id]]
+            self.escritor.write_table(pa.Table.from_pydict(dados, schema=self.schema))
+        else:
+            self.escritor.writerows(linhas)
+            self.arquivo.flush()
+
+    def __exit__(self, *exc):
+        if self.parquet:
+            self.escritor.close()
+        else:
+            self.arquivo.close()
+        return False
+
+def _obter_metodo(metodo):
+    try:
+        return METODOS[metodo]
+    except KeyError:
+        raise ValueError(f"ERRO! Método '{metodo}' desconhecido. Disponíveis: {', '.join(sorted(METODOS))}.") from None
+
+def _parametros_caso(metodo, caso, coluna_id=None):
+    """
+    Converte as colunas de um caso nos parâmetros da função (renomeando as colunas da interface)
+    e retorna também o comprimento que multiplica o resultado (1 sem a coluna de comprimento).
+    """
+    renomear = COLUNAS_INTERFACE.get(metodo, {})
+    parametros = {}
+    for chave, valor in caso.items():
+        if chave == coluna_id:
+            continue
+        valor = _converter_valor(valor)
+        if valor is not None:
+            parametros[renomear.get(chave, chave)] = valor
+    comprimento = parametros.pop(COLUNAS_COMPRIMENTO[metodo], 1.0) if metodo in COLUNAS_COMPRIMENTO else 1.0
+    return parametros, comprimento
+
+def _converter_valor(valor):
+    """Converte um valor lido da tabela: vazio -> None, JSON para listas, número para int/float."""
+    if not isinstance(valor, str):
+        return valor
+    valor = valor.strip()
+    if valor == '':
+        return None
+    if valor.startswith('['):
+        return json.loads(valor)
+    try:
+        return int(valor)
+    except ValueError:
+        return float(valor)
+
+def _importar_parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("ERRO! A leitura e gravação de arquivos Parquet requer o pacote 'pyarrow'.") from None
+    return pyarrow, pq
+
+class TestExecucaoLote(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.entrada = f"{self.dir.name}/casos.csv"
+        self.saida = f"{self.dir.name}/resultados.csv"
+        with open(self.entrada, 'w', newline='') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(['id', 'xa', 'xb', 'xc', 'ha', 'hb', 'hc', 'R'])
+            escritor.writerow(['L1', -5, 0, 5, 15, 17, 15, 0.015])
+            escritor.writerow(['L2', -6, 0, 6, 20, 20, -1, 0.015]) # Altura inválida
+            escritor.writerow(['L3', -4, 0, 4, 12, 14, 12, 0.012])
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_csv_confere_com_chamada_direta(self):
+        """Os resultados gravados devem ser os da função chamada diretamente, caso a caso."""
+        total = executar_lote('imagem_tran', self.entrada, self.saida, tamanho_bloco=2, coluna_id='id')
+        self.assertEqual(total, 3)
+        with open(self.saida, newline='') as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+        self.assertEqual([l['id'] for l in linhas], ['L1', 'L2', 'L3'])
+
+        C = metodo_imagem_tran(-4, 0, 4, 12, 14, 12, 0.012)
+        self.assertAlmostEqual(float(linhas[2]['C_0_1_re']), C[0, 1], delta=abs(C[0, 1]) * 1e-12)
+        self.assertEqual(float(linhas[2]['C_0_1_im']), 0.0)
+        self.assertIn("maiores que zero", linhas[1]['erro'])
+        self.assertTrue(math.isnan(float(linhas[1]['C_0_0_re'])))
+
+    def test_processos_em_paralelo(self):
+        """Com vários processos, a saída deve ser idêntica à da execução serial."""
+        executar_lote('imagem_tran', self.entrada, self.saida, tamanho_bloco=1, coluna_id='id')
+        saida_paralela = f"{self.dir.name}/resultados_paralelo.csv"
+        executar_lote('imagem_tran', self.entrada, saida_paralela, tamanho_bloco=1, coluna_id='id', processos=2)
+        with open(self.saida) as serial, open(saida_paralela) as paralela:
+            self.assertEqual(serial.read(), paralela.read())
+
+    def test_lista_em_json(self):
+        """Parâmetros do tipo lista são lidos como JSON."""
+        caso = dict(ra=0.01, rb=0.01, rc=0.01, xa_pos1=-5, ha_pos1=15, xb_pos2=0, hb_pos2=17, xc_pos3=5, hc_pos3=15,
+                    r_pr='[0.005]', x_pr_pos1='[0]', h_pr_pos1='[22]', x_pr_pos2='[0]', h_pr_pos2='[22]',
+                    x_pr_pos3='[0]', h_pr_pos3='[22]', rho='100', l1='1000', l2='1000', l3='1000')
+        linha = avaliar_bloco('para_raio_tran', [caso])[0]
+        self.assertEqual(linha[-1], '')
+        C = metodo_para_raio_tran(0.01, 0.01, 0.01, -5, 15, 0, 17, 5, 15, [0.005], [0], [22], [0], [22], [0], [22],
+                                  100, 1000, 1000, 1000)
+        self.assertEqual(linha[0], C[0, 0])
+
+    def test_valor_mal_formado_nao_interrompe(self):
+        """Um texto não numérico ou um JSON inválido vai para a coluna 'erro' e os demais casos seguem."""
+        with open(self.entrada, 'w', newline='') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(['id', 'xa', 'xb', 'xc', 'ha', 'hb', 'hc', 'R'])
+            escritor.writerow(['L1', -5, 0, 5, 15, 17, 15, 0.015])
+            escritor.writerow(['L2', -6, 'abc', 6, 20, 20, 20, 0.015])
+            escritor.writerow(['L3', -6, 0, 6, 20, 20, 20, '[0.01'])
+            escritor.writerow(['L4', -4, 0, 4, 12, 14, 12, 0.012])
+        self.assertEqual(executar_lote('imagem_tran', self.entrada, self.saida, coluna_id='id'), 4)
+        with open(self.saida, newline='') as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+        self.assertEqual([l['id'] for l in linhas], ['L1', 'L2', 'L3', 'L4'])
+        self.assertEqual([bool(l['erro']) for l in linhas], [False, True, True, False])
+        self.assertIn("abc", linhas[1]['erro'])
+        self.assertTrue(math.isnan(float(linhas[2]['C_0_0_re'])))
+        C = metodo_imagem_tran(-4, 0, 4, 12, 14, 12, 0.012)
+        self.assertAlmostEqual(float(linhas[3]['C_0_1_re']), C[0, 1], delta=abs(C[0, 1]) * 1e-12)
+
+    def test_colunas_da_interface(self):
+        """Cada método aceita exatamente as chaves do dicionário de `_get_input_values` da interface."""
+        import ast
+        import os
+        classes = {
+            'LongitudinalImageCalculator': 'imagem_long', 'CarsonLongitudinalCalculator': 'carson_long',
+            'CarsonGroundWireCalculator': 'carson_para_raio', 'CarsonTransposedCalculator': 'carson_transp',
+            'BundleConductorRMGCalculator': 'rmg_feixe', 'SymmetricalComponentSynthesizer': 'comp_sim_sintese',
+            'SymmetricalComponentAnalyzer': 'comp_sim_analise', 'CapacitanceImageCalculator': 'imagem_tran',
+            'TransposedCapacitanceCalculator': 'transposicao_tran',
+            'CapacitanceGroundWireCalculator': 'para_raio_tran', 'BundledCapacitanceCalculator': 'feixe_condutor_tran',
+            'SequenceCapacitanceCalculator': 'capacitancia_sequencia_tran',
+        }
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Linhamestra.py'), encoding='utf-8') as f:
+            arvore = ast.parse(f.read())
+        chaves = {}
+        for classe in arvore.body:
+            if isinstance(classe, ast.ClassDef) and classe.name in classes:
+                funcao = next(n for n in classe.body if isinstance(n, ast.FunctionDef) and n.name == '_get_input_values')
+                retorno = next(n.value for n in ast.walk(funcao) if isinstance(n, ast.Return) and isinstance(n.value, ast.Dict))
+                chaves[classes[classe.name]] = [k.value for k in retorno.keys]
+        self.assertEqual(sorted(chaves), sorted(METODOS))
+
+        # Valores típicos, nas unidades da interface, para cada chave dos dicionários.
+        valores = dict(ra=0.0001, rb=0.0001, rc=0.0001, rp=0.0003, R=0.015, Rmg_val=None, rho=100.0,
+                       xa=-5.0, xb=0.0, xc=5.0, xp=0.0, ha=15.0, hb=17.0, hc=15.0, hp=22.0,
+                       l=1000.0, l_km=10.0, L=10.0, l1=1000.0, l2=1000.0, l3=1000.0, n=2, d=0.4,
+                       xa_pos1=-5.0, ha_pos1=15.0, xb_pos2=0.0, hb_pos2=17.0, xc_pos3=5.0, hc_pos3=15.0,
+                       r_pr=[0.005], x_pr_pos1=[0.0], h_pr_pos1=[22.0], x_pr_pos2=[0.0], h_pr_pos2=[22.0],
+                       x_pr_pos3=[0.0], h_pr_pos3=[22.0], ra_sub=0.01, rb_sub=0.01, rc_sub=0.01,
+                       na=2, nb=2, nc=2, sa=0.4, sb=0.4, sc=0.4, comprimento_total=1000.0)
+        valores.update({k: 1.0 if k.endswith('modulo') else 0.0
+                        for k in COLUNAS_INTERFACE['comp_sim_sintese'] | COLUNAS_INTERFACE['comp_sim_analise']})
+        for metodo, lista in chaves.items():
+            with self.subTest(metodo=metodo):
+                self.assertEqual(avaliar_bloco(metodo, [{k: valores[k] for k in lista}])[0][-1], '')
+
+        # Como na interface, l_km multiplica a matriz em Ohm/km.
+        caso = {k: valores[k] for k in chaves['carson_long']}
+        Z = Metodo_Carson_long(0.0001, 0.0001, 0.0001, -5.0, 0.0, 5.0, 15.0, 17.0, 15.0, 100.0, R=0.015)
+        self.assertAlmostEqual(avaliar_bloco('carson_long', [caso])[0][0], (Z * 10.0)[0, 0].real, delta=1e-12)
+
+    def test_metodo_desconhecido(self):
+        """Um método inexistente deve levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "Método 'xyz' desconhecido"):
+            executar_lote('xyz', self.entrada, self.saida)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Execução paralela, em um pool de processos, de estudos com muitos casos de linhas.
+
+Casos irregulares (por exemplo, `metodo_para_raio_tran` com número variável de para-raios)
+não podem ser reunidos em um único array. Este módulo distribui a lista de casos em blocos
+entre processos (`concurrent.futures.ProcessPoolExecutor`), recolhe os resultados na ordem
+original e limita as threads de BLAS de cada processo para não sobrecarregar os núcleos.
+O resultado é o mesmo do laço serial `[funcao(**caso) for caso in casos]`.
+"""
+
+import collections
+import contextlib
+import functools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import unittest
+
+# Variáveis de ambiente lidas pelas bibliotecas de BLAS/OpenMP mais comuns ao iniciar.
+VARIAVEIS_THREADS_BLAS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                          'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+_limite_threads = None # Limite de threadpoolctl ativo no processo trabalhador
+
+def executar_paralelo(funcao, casos, processos=None, tamanho_bloco=None, threads_blas=1):
+    """
+    Avalia `funcao` em cada caso, distribuindo os casos entre processos.
+
+    Parâmetros:
+    funcao (callable): Função de cálculo definida no nível de um módulo (precisa ser serializável).
+    casos (iterable): Casos a avaliar. Um dicionário é passado como argumentos nomeados
+                      (funcao(**caso)); uma tupla ou lista, como argumentos posicionais.
+    processos (int, opcional): Número de processos. Padrão: número de CPUs. Com 1, o cálculo
+                               é feito no próprio processo, sem pool.
+    tamanho_bloco (int, opcional): Casos enviados a cada tarefa. Padrão: cerca de 4 tarefas
+                                   por processo quando o número de casos é conhecido.
+    threads_blas (int ou None, opcional): Threads de BLAS em cada processo. Padrão: 1.
+                                          Use None para não alterar.
+
+    Retorna:
+    list: Resultados na mesma ordem dos casos.
+
+    Raises:
+    Exception: A primeira exceção levantada por `funcao`, como no laço serial.
+    """
+    processos = processos or os.cpu_count() or 1
+    if processos < 1:
+        raise ValueError("ERRO! O número de processos deve ser pelo menos 1.")
+    if tamanho_bloco is None:
+        tamanho_bloco = math.ceil(len(casos) / (4 * processos)) if hasattr(casos, '__len__') else 100
+    tamanho_bloco = max(1, tamanho_bloco)
+
+    blocos = _dividir_em_blocos(casos, tamanho_bloco)
+    avaliar = functools.partial(_avaliar_casos, funcao)
+    resultados = []
+    for parcial in mapear_em_ordem(avaliar, blocos, processos, threads_blas):
+        resultados.extend(parcial)
+    return resultados
+
+def mapear_em_ordem(funcao, itens, processos=None, threads_blas=1, max_pendentes=None):
+    """
+    Aplica `funcao` a cada item em um pool de processos, devolvendo os resultados em ordem.
+
+    Os itens são enviados aos poucos (no máximo `max_pendentes` tarefas em andamento), de modo
+    que um iterador muito longo (por exemplo, blocos lidos de um arquivo) não é carregado
+    inteiro na memória.
+
+    Parâmetros:
+    funcao (callable): Função serializável aplicada a cada item.
+    itens (iterable): Itens (por exemplo, blocos de casos).
+    processos (int, opcional): Número de processos. Padrão: número de CPUs. Com 1, não cria pool.
+    threads_blas (int ou None, opcional): Threads de BLAS em cada processo. Padrão: 1.
+    max_pendentes (int, opcional): Máximo de tarefas em andamento. Padrão: 2 por processo.
+
+    Retorna:
+    iterator: Resultados de `funcao`, na ordem dos itens.
+    """
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        yield from map(funcao, itens)
+        return
+    max_pendentes = max_pendentes or 2 * processos
+
+    with _ambiente_threads_blas(threads_blas), \
+         ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_trabalhador,
+                             initargs=(threads_blas,)) as pool:
+        pendentes = collections.deque()
+        for item in itens:
+            pendentes.append(pool.submit(funcao, item))
+            if len(pendentes) >= max_pendentes:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+def _avaliar_casos(funcao, casos):
+    """Avalia um bloco de casos no processo trabalhador."""
+    return [funcao(**caso) if isinstance(caso, dict) else funcao(*caso) for caso in casos]
+
+def _dividir_em_blocos(casos, tamanho_bloco):
+    bloco = []
+    for caso in casos:
+        bloco.append(caso)
+        if len(bloco) == tamanho_bloco:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+def _inicializar_trabalhador(threads_blas):
+    """
+    Fixa o número de threads de BLAS do processo trabalhador.
+
+    Usa threadpoolctl, se instalado, que atua mesmo com o NumPy já carregado (processos
+    criados por fork). Sem ele, valem as variáveis de ambiente definidas pelo processo
+    principal antes de criar o pool.
+    """
+    if threads_blas is None:
+        return
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    global _limite_threads
+    _limite_threads = threadpool_limits(limits=threads_blas)
+
+@contextlib.contextmanager
+def _ambiente_threads_blas(threads_blas):
+    """Define as variáveis de threads de BLAS enquanto os processos são criados e as restaura depois."""
+    if threads_blas is None:
+        yield
+        return
+    anteriores = {var: os.environ.get(var) for var in VARIAVEIS_THREADS_BLAS}
+    os.environ.update({var: str(threads_blas) for var in VARIAVEIS_THREADS_BLAS})
+    try:
+        yield
+    finally:
+        for var, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = valor
+
+class TestExecucaoParalela(unittest.TestCase):
+
+    def test_confere_com_laco_serial(self):
+        """Casos com número variável de para-raios devem dar o mesmo resultado do laço serial."""
+        from Transversais.para_raio import metodo_para_raio_tran
+
+        rng = np.random.default_rng(3)
+        casos = []
+        for k in range(23):
+            n_pr = k % 3
+            x_pr = rng.uniform(-4, 4, n_pr).tolist()
+            h_pr = rng.uniform(22, 25, n_pr).tolist()
+            casos.append(dict(ra=0.01, rb=0.012, rc=0.011, xa_pos1=-5.0, ha_pos1=15.0, xb_pos2=0.0,
+                              hb_pos2=rng.uniform(16, 18), xc_pos3=5.0, hc_pos3=15.0,
+                              r_pr=[0.005] * n_pr, x_pr_pos1=x_pr, h_pr_pos1=h_pr, x_pr_pos2=x_pr,
+                              h_pr_pos2=h_pr, x_pr_pos3=x_pr, h_pr_pos3=h_pr,
+                              rho=100.0, l1=1e3, l2=2e3, l3=3e3))
+
+        serial = [metodo_para_raio_tran(**caso) for caso in casos]
+        paralelo = executar_paralelo(metodo_para_raio_tran, casos, processos=2, tamanho_bloco=4)
+        self.assertEqual(len(paralelo), len(casos))
+        for C_s, C_p in zip(serial, paralelo):
+            np.testing.assert_array_equal(C_s, C_p)
+
+    def test_excecao_propagada(self):
+        """Um caso inválido deve levantar a mesma exceção do laço serial."""
+        with self.assertRaisesRegex(ValueError, "math domain error"):
+            executar_paralelo(math.sqrt, [(4.0,), (-1.0,)], processos=2)
+
+    def test_ambiente_restaurado(self):
+        """As variáveis de threads de BLAS voltam ao valor original após a execução."""
+        antes = os.environ.get('OMP_NUM_THREADS')
+        self.assertEqual(executar_paralelo(abs, [(-1,), (2,), (-3,)], processos=2), [1, 2, 3])
+        self.assertEqual(os.environ.get('OMP_NUM_THREADS'), antes)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -1,7 +1,10 @@
 import math # Importa o módulo math para funções matemáticas como pi, sqrt e log
 import numpy as np # Importa a biblioteca NumPy para operações com arrays e matrizes, especialmente úteis para números complexos
 
-def Metodo_Carson_long(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, R=None, Rmg_val=None):
+from longitudinais.Carson_n_condutores import metodo_carson_n_condutores, metodo_carson_n_condutores_varredura # Núcleo de Carson para N condutores
+
+def Metodo_Carson_long(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, R=None, Rmg_val=None, f=60, modelo_solo='aproximado',
+                       geometria=None, efeito_pelicular=False, raio_interno=0.0, espessuras=None):
     """
     Método de Carson com correção para cálculo de impedâncias longitudinais
     em linhas de transmissão trifásicas, sem cabo para-raio.
@@ -20,35 +23,36 @@ def Metodo_Carson_long(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, R=None, Rmg_val=
                         É crucial que estas resistências estejam em Ohms por metro para consistência com as constantes físicas.
     xa, xb, xc (float): Coordenadas horizontais (X) dos condutores A, B, C (metros).
     ha, hb, hc (float): Coordenadas verticais (altura H) dos condutores A, B, C (metros).
-    rho (float): Resistividade do solo (Ohms-metro). Variável de entrada crucial para a correção de Carson.
+    rho (float ou array_like): Resistividade do solo (Ohms-metro), ou uma por camada, de cima para baixo,
+                               no modelo 'multicamadas'. Variável de entrada crucial para a correção de Carson.
     R (float, opcional): Raio físico do condutor (metros). Usado para calcular o RMG se Rmg_val não for fornecido.
     Rmg_val (float, opcional): Raio Médio Geométrico (RMG) do condutor (metros). Se fornecido, R é ignorado,
                                 pois o RMG é mais preciso para cabos trançados.
+    f (float, opcional): Frequência do sistema (Hz). Padrão: 60 Hz, usado no Brasil e em outras regiões.
+    modelo_solo (str, opcional): Modelo de retorno pelo solo: 'aproximado' (termos de primeira ordem de Carson,
+                                 padrão), 'serie' (série completa de Carson, para altas frequências e
+                                 solos de alta resistividade), 'profundidade_complexa' (fórmula fechada
+                                 de Deri/Semlyen, próxima da série e bem mais barata em varreduras largas)
+                                 ou 'multicamadas' (solo estratificado, com rho por camada e espessuras).
+    geometria (TowerGeometry, opcional): Geometria já calculada dos condutores (por exemplo, de
+                                         `obter_geometria`). Se fornecida, as coordenadas e alturas
+                                         são ignoradas (podem ser None).
+    efeito_pelicular (bool, opcional): Se True, ra, rb e rc são resistências em corrente contínua e a
+                                       resistência de cada fase passa a depender da frequência pela
+                                       impedância interna de Bessel (ver `impedancia_interna`). Exige R,
+                                       que substitui o RMG no termo externo.
+    raio_interno (float, opcional): Raio interno do condutor tubular (ACSR), usado com efeito_pelicular.
+    espessuras (array_like, opcional): Espessuras das camadas do solo, exceto a última (metros), usadas
+                                       com o modelo 'multicamadas'. Padrão: None (solo homogêneo).
 
     Retorna:
     numpy.ndarray: Matriz de impedância 3x3 complexa (Ohms/km).
 
     Raises:
-    ValueError: Se nem R nem Rmg_val forem fornecidos, ou se RMG, rho, ou qualquer altura for não positivo.
+    ValueError: Se nem R nem Rmg_val forem fornecidos, se RMG, rho, ou qualquer altura for não positivo,
+                ou se efeito_pelicular for pedido sem R.
     """
 
-    # --- Constantes Físicas e Elétricas ---
-    f = 60                                     # Frequência do sistema (Hz). Padrão no Brasil e em outras regiões.
-    mi_0 = 4 * math.pi * (10**(-7))            # Permeabilidade magnética do vácuo (H/m). Constante física fundamental.
-    w = 2 * math.pi * f                        # Frequência angular (rad/s). Usada nos cálculos de reatância indutiva.
-
-    # --- Termos de Correção do Método de Carson para o Solo ---
-    # rd: Termo de resistência de Carson (Ohms/m) que representa a parcela de resistência adicionada
-    # devido ao retorno da corrente pelo solo com resistividade finita. É um termo constante.
-    # Esta é uma aproximação amplamente usada para 50/60 Hz.
-    rd = 9.869 * (10**(-7)) * f                # Ohms/m. 
-
-    # De: Distância de retorno equivalente do solo (metros).
-    # É uma profundidade fictícia do plano de retorno da corrente no solo,
-    # que encapsula o efeito da resistividade finita do solo.
-    # A constante 659 é apropriada para rho em Ohm-m e f em Hz, resultando em De em metros.
-    De = 659 * (math.sqrt(rho / f))            # Metros
-
     # --- Cálculo do Raio Médio Geométrico (RMG) ---
     Rmg = None # Inicializa RMG como None para verificar se foi calculado ou fornecido
     if Rmg_val is not None:
@@ -65,47 +69,60 @@ def Metodo_Carson_long(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, R=None, Rmg_val=
         raise ValueError("ERRO! É necessário fornecer o raio do condutor (R) OU o Raio Médio Geométrico (Rmg_val).")
     if Rmg <= 0:
         raise ValueError("ERRO! O Raio Médio Geométrico (RMG) deve ser um valor positivo.")
-    if rho <= 0:
+    if np.any(np.asarray(rho) <= 0):
         raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
-    if ha <= 0 or hb <= 0 or hc <= 0:
+    if np.any(np.asarray([ha, hb, hc] if geometria is None else geometria.h) <= 0):
         # As alturas devem ser positivas, pois o método de Carson assume condutores acima do solo.
         raise ValueError("ERRO! As alturas dos condutores (Ha, Hb, Hc) devem ser maiores que zero.")
 
-    # --- Cálculo das Distâncias Geométricas entre os condutores ---
-    # As distâncias entre os centros dos condutores reais são calculadas usando a fórmula da distância euclidiana 2D.
-    dab = np.sqrt(((xa - xb)**2) + ((ha - hb)**2)) # Distância entre condutores A e B
-    dac = np.sqrt(((xa - xc)**2) + ((ha - hc)**2)) # Distância entre condutores A e C
-    dbc = np.sqrt(((xb - xc)**2) + ((hb - hc)**2)) # Distância entre condutores B e C
-
-    # --- Cálculo das Impedâncias Próprias e Mútuas (em Ohms/metro) ---
-    # As fórmulas de Carson resultam em impedâncias por metro.
-    # Impedâncias Próprias (Zii): Representam a impedância de um condutor em relação ao retorno pelo solo.
-    # Zii = Ri_condutor + R_terra_Carson + j * X_terra_propria_Carson
-    # R_terra_Carson é o termo 'rd'. X_terra_propria_Carson é a parte logarítmica com De/RMG.
-    Zaa = ra + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zbb = rb + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zcc = rc + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-
-    # Impedâncias Mútuas (Zij): Representam o acoplamento eletromagnético entre dois condutores,
-    # considerando o retorno pelo solo.
-    # Zij = R_terra_Carson + j * X_terra_mutua_Carson
-    # R_terra_Carson é o termo 'rd'. X_terra_mutua_Carson é a parte logarítmica com De/dij.
-    Zab = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dab) # Impedância mútua entre A e B
-    Zac = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dac) # Impedância mútua entre A e C
-    Zbc = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dbc) # Impedância mútua entre B e C
-
-    # As impedâncias mútuas são simétricas na matriz de impedância de fase (Zij = Zji).
-    Zba = Zab
-    Zca = Zac
-    Zcb = Zbc
-
-    # --- Construção da Matriz de Impedância (Ohms/metro) e Conversão para Ohms/km ---
-    # Monta a matriz 3x3 de impedâncias de fase em Ohms/metro.
-    # Em seguida, a matriz inteira é multiplicada por 1000 para converter para Ohms/km.
-    Z = np.array([
-        [Zaa, Zab, Zac],
-        [Zba, Zbb, Zbc],
-        [Zca, Zcb, Zcc]
-    ]) * 1000 # 'Z' agora representa a matriz de impedância longitudinal em Ohms/km
-
-    return Z # Retorna a matriz de impedância longitudinal da linha em Ohms/km
\ No newline at end of file
+    # --- Matriz de Impedâncias de Fase (Ohms/metro) ---
+    # As impedâncias próprias (Zii) e mútuas (Zij) de Carson são montadas de uma só vez
+    # pelo núcleo N-condutores, a partir dos vetores de resistências e coordenadas das fases:
+    # Zii = Ri_condutor + rd + j * X_propria_Carson (log De/RMG)
+    # Zij = rd + j * X_mutua_Carson (log De/dij), com Zij = Zji.
+    Z = metodo_carson_n_condutores(
+        [ra, rb, rc], [xa, xb, xc], [ha, hb, hc], rho, R=R, Rmg_val=Rmg, f=f, modelo_solo=modelo_solo,
+        geometria=geometria, efeito_pelicular=efeito_pelicular, raio_interno=raio_interno, espessuras=espessuras
+    ) * 1000 # Conversão de Ohms/metro para Ohms/km
+
+    return Z # Retorna a matriz de impedância longitudinal da linha em Ohms/km
+
+def Metodo_Carson_long_varredura(ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, frequencias, R=None, Rmg_val=None,
+                                 modelo_solo='aproximado', efeito_pelicular=False, raio_interno=0.0,
+                                 geometria=None, espessuras=None):
+    """
+    Varredura em frequência do Método de Carson com correção (`Metodo_Carson_long`).
+
+    Para estudos harmônicos e de transitórios, calcula a matriz de impedância da linha
+    para cada frequência de um vetor. Os logaritmos das distâncias entre condutores não
+    dependem da frequência e são calculados uma única vez; apenas o retorno pelo solo (e a
+    impedância interna, com `efeito_pelicular`) é avaliado por frequência, por broadcast. Todos
+    os valores de `modelo_solo` passam pela varredura: com 'aproximado', os termos de Carson
+    (rd e De); com 'serie', 'profundidade_complexa' ou 'multicamadas', a correção de solo
+    correspondente, calculada par a par para todas as frequências de uma vez.
+
+    Parâmetros:
+    ra, rb, rc, xa, xb, xc, ha, hb, hc, rho, R, Rmg_val, modelo_solo, efeito_pelicular, raio_interno, geometria,
+    espessuras: Como em `Metodo_Carson_long`.
+    frequencias (array_like): Vetor de F frequências (Hz). Devem ser positivas.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa de forma (F, 3, 3) com as matrizes de impedância (Ohms/km),
+                   uma para cada frequência.
+
+    Raises:
+    ValueError: Nas mesmas situações de `Metodo_Carson_long`, ou se alguma frequência for não positiva.
+    """
+
+    # --- Validações de Entrada (mesmas mensagens de Metodo_Carson_long) ---
+    if Rmg_val is None and R is None:
+        raise ValueError("ERRO! É necessário fornecer o raio do condutor (R) OU o Raio Médio Geométrico (Rmg_val).")
+    if np.any(np.asarray([ha, hb, hc] if geometria is None else geometria.h) <= 0):
+        raise ValueError("ERRO! As alturas dos condutores (Ha, Hb, Hc) devem ser maiores que zero.")
+
+    Z_f = metodo_carson_n_condutores_varredura(
+        [ra, rb, rc], [xa, xb, xc], [ha, hb, hc], rho, frequencias, R=R, Rmg_val=Rmg_val, modelo_solo=modelo_solo,
+        efeito_pelicular=efeito_pelicular, raio_interno=raio_interno, geometria=geometria, espessuras=espessuras
+    ) * 1000 # Conversão de Ohms/metro para Ohms/km
+
+    return Z_f # Retorna a pilha (F, 3, 3) de matrizes de impedância em Ohms/km
@@ -0,0 +1,371 @@
+import math
+import numpy as np
+import unittest
+
+from longitudinais.geometria import obter_geometria
+from longitudinais.Carson_serie import ORDEM_SERIE, correcao_serie_pares
+from longitudinais.profundidade_complexa import correcao_profundidade_pares
+from longitudinais.solo_multicamadas import integral_solo_multicamadas
+from longitudinais.impedancia_interna import impedancias_internas
+
+# Modelos de retorno pelo solo disponíveis:
+# 'aproximado': termos de primeira ordem de Carson (rd = 9.869e-7*f e De = 659*sqrt(rho/f));
+# 'serie': série completa de Carson (termos P e Q), com expansão assintótica para k > 5;
+# 'profundidade_complexa': plano de retorno a uma profundidade complexa p = sqrt(rho/(j*w*mi_0));
+# 'multicamadas': integral de Carson generalizada para solo estratificado (rho por camada e espessuras).
+MODELOS_SOLO = ('aproximado', 'serie', 'profundidade_complexa', 'multicamadas')
+
+def metodo_carson_n_condutores(r, x, h, rho, R=None, Rmg_val=None, f=60, geometria=None,
+                               modelo_solo='aproximado', ordem_serie=ORDEM_SERIE,
+                               efeito_pelicular=False, raio_interno=0.0, espessuras=None):
+    """
+    Calcula a matriz primitiva de impedâncias longitudinais (NxN) de uma linha com
+    um número qualquer de condutores (fases e para-raios), usando o Método de Carson
+    com correção para o solo.
+
+    As distâncias entre todos os pares de condutores são obtidas de uma só vez por
+    broadcast das coordenadas, de modo que o custo é uma única passada O(N²) do NumPy,
+    em vez de uma expressão escrita à mão para cada elemento Zij. É o núcleo usado por
+    `Metodo_Carson_long`, `metodo_carson_para_raio` e `metodo_carson_transp`, e permite
+    tratar, por exemplo, torres de circuito duplo com dois para-raios (N = 8).
+
+    Parâmetros:
+    r (array_like): Resistências CA dos N condutores (Ohm/m).
+    x (array_like): Coordenadas horizontais (X) dos N condutores (metros).
+    h (array_like): Coordenadas verticais (altura H) dos N condutores (metros). Devem ser positivas.
+    rho (float ou array_like): Resistividade do solo (Ohm.m). Com o modelo 'multicamadas', pode ser
+                               um vetor com a resistividade de cada camada, de cima para baixo.
+    R (float ou array_like, opcional): Raio físico do condutor (metros), único ou um por condutor.
+                                       Usado para calcular o RMG se Rmg_val não for fornecido.
+    Rmg_val (float ou array_like, opcional): Raio Médio Geométrico (RMG) do condutor (metros),
+                                             único ou um por condutor. Prioritário sobre 'R'.
+    f (float, opcional): Frequência (Hz). Padrão: 60 Hz.
+    geometria (TowerGeometry, opcional): Geometria já calculada dos condutores. Se fornecida,
+                                         x e h são ignorados (podem ser None).
+    modelo_solo (str, opcional): Modelo de retorno pelo solo, um de MODELOS_SOLO. Padrão: 'aproximado'.
+    ordem_serie (int, opcional): Número de termos da série de Carson (modelo 'serie').
+    efeito_pelicular (bool, opcional): Se True, 'r' é a resistência em corrente contínua e a resistência
+                                       fixa é substituída pela impedância interna com efeito pelicular
+                                       (funções de Bessel, ver `impedancia_interna`). Exige o raio físico R,
+                                       que substitui o RMG no termo externo. Padrão: False.
+    raio_interno (float ou array_like, opcional): Raio interno dos condutores tubulares (ACSR, com a alma
+                                                  de aço desprezada), usado com efeito_pelicular. Padrão: 0 (sólido).
+    espessuras (array_like, opcional): Espessuras das camadas do solo, exceto a última (metros), usadas
+                                       com o modelo 'multicamadas'. Padrão: None (solo homogêneo).
+
+    Retorna:
+    numpy.ndarray: Matriz primitiva de impedância NxN complexa (Ohm/m), na mesma ordem dos condutores de entrada.
+
+    Raises:
+    ValueError: Se nem R nem Rmg_val forem fornecidos, se RMG, rho, f ou alguma altura for não positivo,
+                se os vetores tiverem tamanhos diferentes, se dois condutores coincidirem, se o
+                modelo de solo for desconhecido ou se efeito_pelicular for pedido sem o raio físico R.
+    """
+    return metodo_carson_n_condutores_varredura(r, x, h, rho, [f], R=R, Rmg_val=Rmg_val, geometria=geometria,
+                                                modelo_solo=modelo_solo, ordem_serie=ordem_serie,
+                                                efeito_pelicular=efeito_pelicular, raio_interno=raio_interno,
+                                                espessuras=espessuras)[0]
+
+def metodo_carson_n_condutores_varredura(r, x, h, rho, frequencias, R=None, Rmg_val=None, geometria=None,
+                                         modelo_solo='aproximado', ordem_serie=ORDEM_SERIE,
+                                         efeito_pelicular=False, raio_interno=0.0, espessuras=None):
+    """
+    Calcula a matriz primitiva de impedâncias de Carson (NxN) para um conjunto de frequências.
+
+    Apenas os termos de Carson dependem da frequência (rd = 9.869e-7*f e De = 659*sqrt(rho/f)).
+    Como log(De/dij) = log(De) - log(dij), a matriz de logaritmos das distâncias é calculada
+    uma única vez e reaproveitada em todas as frequências, e a pilha (F, N, N) é montada
+    por broadcast, sem repetir o cálculo da geometria para cada frequência. Todos os modelos
+    passam pelo núcleo por pares `impedancia_mutua_carson`: com 'serie', a correção completa de
+    Carson é avaliada de uma vez para todos os pares de condutores e frequências (ver
+    `correcao_carson_serie`); com 'profundidade_complexa', a correção é uma fórmula fechada de
+    logaritmos complexos (ver `correcao_profundidade_complexa`); com 'multicamadas', a integral
+    do solo estratificado usa nós de quadratura em cache por solo e frequência (ver
+    `correcao_solo_multicamadas`).
+    Com efeito_pelicular, a impedância interna de cada tipo de condutor é avaliada uma vez para
+    todo o vetor de frequências e somada à diagonal no lugar da resistência fixa.
+
+    Parâmetros:
+    r, x, h, rho, R, Rmg_val, geometria, modelo_solo, ordem_serie, efeito_pelicular, raio_interno, espessuras:
+        Como em `metodo_carson_n_condutores`.
+    frequencias (array_like): Vetor de F frequências (Hz). Devem ser positivas.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa de forma (F, N, N) com as matrizes primitivas de impedância (Ohm/m).
+
+    Raises:
+    ValueError: Nas mesmas situações de `metodo_carson_n_condutores`.
+    """
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    if np.any(frequencias <= 0):
+        raise ValueError("ERRO! As frequências (f) devem ser valores positivos.")
+    if np.any(np.asarray(rho) <= 0):
+        raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
+    if modelo_solo not in MODELOS_SOLO:
+        raise ValueError(f"ERRO! Modelo de solo '{modelo_solo}' desconhecido. Disponíveis: {', '.join(MODELOS_SOLO)}.")
+    if np.ndim(rho) > 0 and modelo_solo != 'multicamadas':
+        raise ValueError("ERRO! Várias resistividades (solo em camadas) exigem o modelo 'multicamadas'.")
+    if efeito_pelicular and R is None:
+        raise ValueError("ERRO! O efeito pelicular requer o raio físico do condutor (R).")
+
+    # --- Termos independentes da frequência: resistências, RMGs e geometria ---
+    r, Rmg, geometria = _preparar_geometria(r, x, h, R, Rmg_val, geometria)
+    n = r.shape[0]
+    diag = np.arange(n)
+    if efeito_pelicular:
+        # A indutância interna já está em Z_int: o termo externo usa o raio físico, e não o RMG.
+        Rmg = np.broadcast_to(np.asarray(R, dtype=float), (n,))
+
+    # --- Pilha de Matrizes Primitivas de Impedâncias (Ohm/m) ---
+    # Todos os pares (i, j) pelo núcleo mútuo, com d_ii = RMG_i: a diagonal é a impedância própria
+    # externa (log(De/RMG) ou log(2h/RMG) + correção), e Zii recebe ainda a resistência do condutor.
+    d = np.array(geometria.D)
+    d[diag, diag] = Rmg
+    Z = impedancia_mutua_carson(geometria.h[:, np.newaxis] + geometria.h,
+                                np.abs(geometria.x[:, np.newaxis] - geometria.x), d, rho, frequencias,
+                                modelo_solo, ordem_serie, espessuras)
+
+    if efeito_pelicular:
+        Z[:, diag, diag] += impedancias_internas(r, Rmg, frequencias, raio_interno) # (F, N)
+    else:
+        Z[:, diag, diag] += r
+
+    return Z
+
+def impedancia_mutua_carson(H, X, d, rho, frequencias, modelo_solo='aproximado', ordem_serie=ORDEM_SERIE,
+                            espessuras=None):
+    """
+    Núcleo mútuo de Carson para pares de condutores, comum à matriz primitiva e ao acoplamento
+    com condutores de terceiros (`impedancia_mutua_rota`).
+
+    Cada par é descrito pela soma das alturas H = h_i + h_j, pelo afastamento horizontal
+    X = |x_i - x_j| e pela distância direta d (o RMG, para a impedância própria):
+
+    - 'aproximado': Z = rd + j*(w*mi_0/2pi)*ln(De/d), com rd = 9.869e-7*f e De = 659*sqrt(rho/f).
+      Não usa H, e vale também para condutores enterrados enquanto d << De (Carson-Clem);
+    - 'serie': Z = j*(w*mi_0/2pi)*ln(d'/d) + (w*mi_0/pi)*(P + jQ), com d' = sqrt(H^2 + X^2);
+    - 'profundidade_complexa': Z = j*(w*mi_0/2pi)*ln(D(p)/d), D(p) = sqrt((H + 2p)^2 + X^2);
+    - 'multicamadas': Z = j*(w*mi_0/2pi)*ln(d'/d) + correção do solo estratificado.
+
+    Parâmetros:
+    H, X, d (array_like): Arrays de mesma forma (...) com somas de alturas, afastamentos e
+                          distâncias diretas (metros).
+    rho (float ou array_like): Resistividade do solo (Ohm.m); uma por camada no modelo 'multicamadas'.
+    frequencias (array_like): Vetor de F frequências (Hz).
+    modelo_solo, ordem_serie, espessuras: Como em `metodo_carson_n_condutores`.
+
+    Retorna:
+    numpy.ndarray: Array complexo (F, ...) de impedâncias (Ohm/m). As entradas são validadas pelo chamador.
+    """
+    mi_0 = 4 * math.pi * (10**(-7))            # Permeabilidade magnética do vácuo (H/m).
+
+    H, X, d = np.broadcast_arrays(np.asarray(H, dtype=float), np.asarray(X, dtype=float),
+                                  np.asarray(d, dtype=float))
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    f = frequencias.reshape(frequencias.shape + (1,) * H.ndim)
+    w = 2 * math.pi * f                        # Frequência angular (rad/s).
+    log_d = np.log(d)
+
+    if modelo_solo == 'aproximado':
+        rd = 9.869 * (10**(-7)) * f                                   # Termo de resistência de Carson (Ohm/m).
+        log_De = math.log(659) + 0.5 * (math.log(rho) - np.log(f))    # log(De), com De = 659*sqrt(rho/f) (metros).
+        return rd + ((1j * w * mi_0) / (2 * math.pi)) * (log_De - log_d)
+
+    # Método das imagens (solo perfeito) mais a correção do solo de cada modelo.
+    Z = ((1j * w * mi_0) / (2 * math.pi)) * (np.log(np.hypot(X, H)) - log_d)
+    if modelo_solo == 'serie':
+        return Z + correcao_serie_pares(H, X, rho, frequencias, ordem_serie)
+    if modelo_solo == 'multicamadas':
+        return Z + integral_solo_multicamadas(H, X, rho, espessuras, frequencias)
+    return Z + correcao_profundidade_pares(H, X, rho, frequencias)
+
+def _preparar_geometria(r, x, h, R, Rmg_val, geometria=None):
+    """
+    Valida as entradas dos condutores e retorna o vetor de resistências (N,), o vetor de
+    RMGs (N,) e o TowerGeometry dos condutores.
+
+    As distâncias vêm do TowerGeometry da torre (fornecido ou obtido do cache por
+    `obter_geometria`), de modo que avaliações repetidas da mesma disposição não
+    recalculam a geometria.
+    """
+
+    # --- Conversão das entradas para vetores (N,) ---
+    r = np.atleast_1d(np.asarray(r, dtype=float))
+    if geometria is None:
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        h = np.atleast_1d(np.asarray(h, dtype=float))
+    else:
+        x, h = geometria.x, geometria.h
+    n = h.shape[0]
+
+    # --- Cálculo do Raio Médio Geométrico (RMG) de cada condutor ---
+    Rmg = None
+    if Rmg_val is not None:
+        Rmg = np.asarray(Rmg_val, dtype=float)
+    elif R is not None:
+        Rmg = np.asarray(R, dtype=float) * math.exp(-1/4) # RMG de condutor sólido a partir do raio físico.
+
+    # --- Validações de Entrada ---
+    if Rmg is None:
+        raise ValueError("ERRO! É necessário fornecer o raio do condutor (R) OU o Raio Médio Geométrico (Rmg_val).")
+    if np.any(Rmg <= 0):
+        raise ValueError("ERRO! O Raio Médio Geométrico (RMG) deve ser um valor positivo.")
+    if not (r.shape == x.shape == h.shape == (n,)):
+        raise ValueError("ERRO! Os vetores de resistências (r), coordenadas (x) e alturas (h) devem ter o mesmo tamanho.")
+    if np.any(h <= 0):
+        raise ValueError("ERRO! As alturas de todos os condutores (h) devem ser maiores que zero.")
+
+    if geometria is None:
+        geometria = obter_geometria(x, h)
+    if geometria.condutores_coincidentes:
+        raise ValueError("ERRO! Dois condutores não podem ocupar a mesma posição.")
+
+    return r, np.broadcast_to(Rmg, (n,)), geometria
+
+class TestMetodoCarsonNCondutores(unittest.TestCase):
+
+    def setUp(self):
+        # Torre de circuito duplo com dois para-raios (8 condutores).
+        self.x = np.array([-6.0, -6.5, -6.0, 6.0, 6.5, 6.0, -4.0, 4.0])
+        self.h = np.array([20.0, 26.0, 32.0, 20.0, 26.0, 32.0, 38.0, 38.0])
+        self.r = np.array([0.05e-3] * 6 + [0.3e-3] * 2)
+        self.rho = 100.0
+        self.Rmg_val = np.array([0.0124] * 6 + [0.004] * 2)
+
+    def test_forma_e_simetria(self):
+        """A matriz primitiva deve ser NxN, complexa e simétrica."""
+        Z = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val)
+        self.assertEqual(Z.shape, (8, 8))
+        self.assertTrue(np.issubdtype(Z.dtype, np.complexfloating))
+        np.testing.assert_allclose(Z, Z.T, rtol=1e-15)
+
+    def test_elementos_conferem_com_formulas_de_carson(self):
+        """Confere um elemento próprio e um mútuo com as fórmulas escalares de Carson."""
+        Z = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val)
+        f = 60
+        w = 2 * math.pi * f
+        mi_0 = 4 * math.pi * 1e-7
+        rd = 9.869e-7 * f
+        De = 659 * math.sqrt(self.rho / f)
+
+        Z66_esperado = self.r[6] + rd + 1j * w * mi_0 / (2 * math.pi) * math.log(De / self.Rmg_val[6])
+        d07 = math.hypot(self.x[0] - self.x[7], self.h[0] - self.h[7])
+        Z07_esperado = rd + 1j * w * mi_0 / (2 * math.pi) * math.log(De / d07)
+
+        np.testing.assert_allclose(Z[6, 6], Z66_esperado, rtol=1e-12)
+        np.testing.assert_allclose(Z[0, 7], Z07_esperado, rtol=1e-12)
+
+    def test_condutores_coincidentes(self):
+        """Dois condutores na mesma posição devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "Dois condutores não podem ocupar a mesma posição."):
+            metodo_carson_n_condutores([1e-4, 1e-4], [0.0, 0.0], [10.0, 10.0], 100.0, R=0.01)
+
+    def test_validacoes(self):
+        """Verifica as mensagens de erro das validações de entrada."""
+        with self.assertRaisesRegex(ValueError, r"É necessário fornecer o raio do condutor \(R\) OU o Raio Médio Geométrico \(Rmg_val\)."):
+            metodo_carson_n_condutores(self.r, self.x, self.h, self.rho)
+        with self.assertRaisesRegex(ValueError, r"A resistividade do solo \(rho\) deve ser um valor positivo."):
+            metodo_carson_n_condutores(self.r, self.x, self.h, 0.0, R=0.01)
+        with self.assertRaisesRegex(ValueError, r"As alturas de todos os condutores \(h\) devem ser maiores que zero."):
+            metodo_carson_n_condutores(self.r, self.x, -self.h, self.rho, R=0.01)
+        with self.assertRaisesRegex(ValueError, "devem ter o mesmo tamanho."):
+            metodo_carson_n_condutores(self.r[:3], self.x, self.h, self.rho, R=0.01)
+
+    def test_varredura_confere_com_formulas_fechadas(self):
+        """Cada fatia da varredura confere com rd = 9.869e-7*f e De = 659*sqrt(rho/f) naquela frequência."""
+        frequencias = np.array([50.0, 60.0, 180.0, 1e3, 5e3])
+        Z_f = metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, frequencias, Rmg_val=self.Rmg_val)
+        self.assertEqual(Z_f.shape, (5, 8, 8))
+        mi_0 = 4 * math.pi * 1e-7
+        n = len(self.x)
+        for k, f in enumerate(frequencias):
+            rd = 9.869e-7 * f
+            De = 659 * math.sqrt(self.rho / f)
+            X = 1j * 2 * math.pi * f * mi_0 / (2 * math.pi)
+            esperado = np.empty((n, n), dtype=complex)
+            for i in range(n):
+                for j in range(n):
+                    if i == j:
+                        esperado[i, j] = self.r[i] + rd + X * math.log(De / self.Rmg_val[i])
+                    else:
+                        d = math.hypot(self.x[i] - self.x[j], self.h[i] - self.h[j])
+                        esperado[i, j] = rd + X * math.log(De / d)
+            np.testing.assert_allclose(Z_f[k], esperado, rtol=1e-12)
+
+    def test_geometria_fornecida(self):
+        """Passar um TowerGeometry deve dar o mesmo resultado que passar as coordenadas."""
+        geometria = obter_geometria(self.x, self.h)
+        Z = metodo_carson_n_condutores(self.r, None, None, self.rho, Rmg_val=self.Rmg_val, geometria=geometria)
+        np.testing.assert_array_equal(Z, metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val))
+
+    def test_nucleo_mutuo_por_pares(self):
+        """O núcleo por pares, avaliado em um único par (H, X, d), reproduz o elemento da matriz primitiva."""
+        frequencias = [60.0, 5e3]
+        i, j = 1, 6
+        H, X, d = self.h[i] + self.h[j], abs(self.x[i] - self.x[j]), math.hypot(self.x[i] - self.x[j], self.h[i] - self.h[j])
+        for modelo in MODELOS_SOLO:
+            Z = metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, frequencias,
+                                                     Rmg_val=self.Rmg_val, modelo_solo=modelo)
+            Z_par = impedancia_mutua_carson(H, X, d, self.rho, frequencias, modelo)
+            self.assertEqual(Z_par.shape, (2,))
+            np.testing.assert_allclose(Z_par, Z[:, i, j], rtol=1e-12)
+            # Na diagonal, d é o RMG e o núcleo dá a impedância própria externa.
+            Z_propria = impedancia_mutua_carson(2 * self.h[i], 0.0, self.Rmg_val[i], self.rho, frequencias, modelo)
+            np.testing.assert_allclose(Z_propria + self.r[i], Z[:, i, i], rtol=1e-12)
+
+    def test_modelo_serie(self):
+        """O modelo 'serie' com ordem 0 reproduz o aproximado; com a série completa difere pouco a 60 Hz."""
+        Z_aprox = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val)
+        Z_ordem0 = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val,
+                                              modelo_solo='serie', ordem_serie=0)
+        np.testing.assert_allclose(Z_ordem0, Z_aprox, rtol=1e-3)
+
+        Z_serie = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val, modelo_solo='serie')
+        np.testing.assert_allclose(Z_serie.imag, Z_aprox.imag, rtol=2e-2)
+        np.testing.assert_allclose(Z_serie, Z_serie.T, rtol=1e-14)
+        Z_p = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val,
+                                         modelo_solo='profundidade_complexa')
+        np.testing.assert_allclose(Z_p, Z_serie, rtol=2e-2)
+        with self.assertRaisesRegex(ValueError, "Modelo de solo 'xyz' desconhecido"):
+            metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val, modelo_solo='xyz')
+
+    def test_modelo_multicamadas(self):
+        """Solo homogêneo reproduz a série de Carson; duas camadas ficam entre os solos de cada camada."""
+        frequencias = [60.0, 1e4]
+        Z_serie = metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, frequencias,
+                                                       Rmg_val=self.Rmg_val, modelo_solo='serie')
+        Z_homog = metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, frequencias,
+                                                       Rmg_val=self.Rmg_val, modelo_solo='multicamadas')
+        np.testing.assert_allclose(Z_homog, Z_serie, rtol=1e-5)
+
+        Z_camadas = metodo_carson_n_condutores(self.r, self.x, self.h, [self.rho, 10 * self.rho], Rmg_val=self.Rmg_val,
+                                               modelo_solo='multicamadas', espessuras=[50.0])
+        Z_fundo = metodo_carson_n_condutores(self.r, self.x, self.h, 10 * self.rho, Rmg_val=self.Rmg_val,
+                                             modelo_solo='multicamadas')
+        self.assertTrue(np.all((Z_camadas.imag > Z_homog[0].imag) & (Z_camadas.imag < Z_fundo.imag)))
+        with self.assertRaisesRegex(ValueError, "exigem o modelo 'multicamadas'"):
+            metodo_carson_n_condutores(self.r, self.x, self.h, [self.rho, 10 * self.rho], Rmg_val=self.Rmg_val)
+        with self.assertRaisesRegex(ValueError, r"resistividade do solo \(rho\)"):
+            metodo_carson_n_condutores(self.r, self.x, self.h, [self.rho, -1.0], Rmg_val=self.Rmg_val,
+                                       modelo_solo='multicamadas', espessuras=[50.0])
+
+    def test_efeito_pelicular(self):
+        """Em baixa frequência, Z_int reproduz r_cc e o RMG R*e^(-1/4); em alta, a resistência cresce."""
+        R = np.array([0.015] * 6 + [0.005] * 2)
+        frequencias = [1.0, 1e5]
+        Z_cc = metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, frequencias, R=R)
+        Z_pel = metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, frequencias, R=R,
+                                                     efeito_pelicular=True)
+        np.testing.assert_allclose(Z_pel[0], Z_cc[0], rtol=1e-4)
+        self.assertTrue(np.all(np.diag(Z_pel[1]).real > np.diag(Z_cc[1]).real))
+        np.testing.assert_array_equal(Z_pel[1] - np.diag(np.diag(Z_pel[1])), Z_cc[1] - np.diag(np.diag(Z_cc[1])))
+        with self.assertRaisesRegex(ValueError, r"O efeito pelicular requer o raio físico do condutor \(R\)."):
+            metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg_val, efeito_pelicular=True)
+
+    def test_varredura_frequencia_invalida(self):
+        """Frequências não positivas devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, r"As frequências \(f\) devem ser valores positivos."):
+            metodo_carson_n_condutores_varredura(self.r, self.x, self.h, self.rho, [60.0, 0.0], R=0.01)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
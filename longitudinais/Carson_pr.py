@@ -1,9 +1,13 @@
 import unittest
 import numpy as np
-from numpy.linalg import inv
 import math
 
-def metodo_carson_para_raio(ra, rb, rc, rp, xa, xb, xc, xp, ha, hb, hc, hp, rho, R=None, Rmg_val=None):
+from longitudinais.Carson_n_condutores import metodo_carson_n_condutores, metodo_carson_n_condutores_varredura
+from longitudinais.reducao_kron import reducao_kron
+
+def metodo_carson_para_raio(ra, rb, rc, rp, xa, xb, xc, xp, ha, hb, hc, hp, rho, R=None, Rmg_val=None,
+                            modelo_solo='aproximado', geometria=None, efeito_pelicular=False, raio_interno=0.0,
+                            espessuras=None):
     """
     Calcula a impedância longitudinal de uma linha de transmissão trifásica com cabo para-raios,
     usando o Método de Carson e a redução de Kron.
@@ -15,17 +19,23 @@ def metodo_carson_para_raio(ra, rb, rc, rp, xa, xb, xc, xp, ha, hb, hc, hp, rho,
     rp (float): Resistência CA do para-raios (Ohm/m).
     xa, xb, xc, xp (float): Coordenadas horizontais (X) dos condutores (metros).
     ha, hb, hc, hp (float): Coordenadas verticais (H) dos condutores (metros). Devem ser positivas.
-    rho (float): Resistividade do solo (Ohm.m).
+    rho (float ou array_like): Resistividade do solo (Ohm.m), ou uma por camada no modelo 'multicamadas'.
     R (float, opcional): Raio físico do condutor (metros). Usado para calcular RMG se Rmg_val não for dado.
     Rmg_val (float, opcional): Raio Médio Geométrico (RMG) dos condutores (metros). Prioritário sobre 'R'.
                                 Assume-se o mesmo RMG para todos os condutores.
+    modelo_solo (str, opcional): Modelo de retorno pelo solo ('aproximado', 'serie', 'profundidade_complexa'
+                                 ou 'multicamadas'). Padrão: 'aproximado'.
+    geometria (TowerGeometry, opcional): Geometria já calculada dos 4 condutores (A, B, C, P). Se fornecida,
+                                         as coordenadas e alturas são ignoradas (podem ser None).
+    efeito_pelicular (bool, opcional): Se True, ra, rb, rc e rp são resistências em corrente contínua,
+                                       substituídas pela impedância interna com efeito pelicular a 60 Hz
+                                       (ver `impedancia_interna`). Exige R, que substitui o RMG no termo externo.
+    raio_interno (float ou array_like, opcional): Raio interno dos condutores tubulares (ACSR), único ou
+                                                  um por condutor (A, B, C, P), usado com efeito_pelicular.
+    espessuras (array_like, opcional): Espessuras das camadas do solo, exceto a última (metros), usadas
+                                       com o modelo 'multicamadas'. Padrão: None (solo homogêneo).
     """
     
-    # --- Constantes Físicas ---
-    f = 60                       # Frequência do sistema (Hz).
-    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
-    w = 2 * math.pi * f          # Frequência angular (rad/s).
-
     # --- Cálculo/Validação do Raio Médio Geométrico (RMG) ---
     Rmg = None 
     if Rmg_val is not None:
@@ -34,71 +44,68 @@ def metodo_carson_para_raio(ra, rb, rc, rp, xa, xb, xc, xp, ha, hb, hc, hp, rho,
         Rmg = R * math.exp(-1/4) # Cálculo padrão de RMG a partir do raio físico.
     
     # --- Validações de Entrada ---
-    if rho <= 0:
+    if np.any(np.asarray(rho) <= 0):
         raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
     if Rmg is None:
         raise ValueError("ERRO! É necessário fornecer o raio do condutor (R) OU o Raio Médio Geométrico (Rmg_val).")
     if Rmg <= 0:
         raise ValueError("ERRO! O Raio Médio Geométrico (RMG) deve ser um valor positivo.")
-    if ha <= 0 or hb <= 0 or hc <= 0 or hp <= 0:
+    if np.any(np.asarray([ha, hb, hc, hp] if geometria is None else geometria.h) <= 0):
         raise ValueError("ERRO! As alturas de TODOS os condutores (Ha, Hb, Hc, Hp) devem ser maiores que zero.")
 
-    # --- Termos de Correção do Método de Carson ---
-    rd = 9.869 * (10**(-7)) * f    # Termo de resistência de Carson (Ohms/m).
-    De = 659 * (math.sqrt(rho / f)) # Distância de retorno equivalente do solo (metros).
-
-    # --- Cálculo das Distâncias Geométricas ---
-    # Distâncias euclidianas 2D entre condutores reais.
-    dab = np.sqrt(((xa - xb)**2) + ((ha - hb)**2))
-    dac = np.sqrt(((xa - xc)**2) + ((ha - hc)**2))
-    dbc = np.sqrt(((xb - xc)**2) + ((hb - hc)**2))
-    dap = np.sqrt(((xa - xp)**2) + ((ha - hp)**2))
-    dbp = np.sqrt(((xb - xp)**2) + ((hb - hp)**2))
-    dcp = np.sqrt(((xc - xp)**2) + ((hc - hp)**2))
-
-    # --- Cálculo das Impedâncias Próprias e Mútuas (Ohm/m) ---
-    # Zii: Impedâncias próprias (condutor para retorno no solo).
-    Zaa = ra + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zbb = rb + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zcc = rc + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zpp = rp + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-
-    # Zij: Impedâncias mútuas (acoplamento entre dois condutores e retorno no solo).
-    Zab = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dab)
-    Zac = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dac)
-    Zbc = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dbc)
-    Zap = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dap)
-    Zbp = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dbp)
-    Zcp = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dcp)
-
-    # Assimetria natural das mútuas na matriz de impedância (Zij = Zji).
-    Zba = Zab
-    Zca = Zac
-    Zcb = Zbc
-    Zpa = Zap
-    Zpb = Zbp
-    Zpc = Zcp
-
-    # --- Construção das Submatrizes para Redução de Kron ---
-    Z_1 = np.array([[Zaa, Zab, Zac], [Zba, Zbb, Zbc], [Zca, Zcb, Zcc]]) # Impedâncias fase-fase (Zff)
-    Z_2 = np.array([[Zap], [Zbp], [Zcp]])                               # Impedâncias fase-para-raios (Zfp)
-    Z_3 = np.array([[Zpa, Zpb, Zpc]])                                   # Impedâncias para-raios-fase (Zpf)
-    Z_4 = np.array([[Zpp]])                                             # Impedância para-raios-para-raios (Zpp)
+    # --- Matriz Primitiva de Impedâncias (Ohm/m) ---
+    # Matriz 4x4 (fases A, B, C e para-raios P) montada pelo núcleo de Carson para N condutores:
+    # Zii = ri + rd + j*(w*mi_0/2pi)*log(De/RMG) e Zij = rd + j*(w*mi_0/2pi)*log(De/dij), com Zij = Zji.
+    Z_prim = metodo_carson_n_condutores(
+        [ra, rb, rc, rp], [xa, xb, xc, xp], [ha, hb, hc, hp], rho, R=R, Rmg_val=Rmg, modelo_solo=modelo_solo,
+        geometria=geometria, efeito_pelicular=efeito_pelicular, raio_interno=raio_interno, espessuras=espessuras
+    )
 
     # --- Redução de Kron para Eliminação do Para-Raios ---
+    # Particionando Z_prim em Z_1 (fase-fase), Z_2 (fase-para-raios), Z_3 (para-raios-fase) e Z_4 (Zpp):
     # Fórmula: Z_reduzida = Z_1 - (Z_2 @ inv(Z_4) @ Z_3)
-    
-    # Prevenção de divisão por zero ou número muito pequeno na inversão
-    # Embora np.linalg.inv levante um LinAlgError, esta verificação oferece uma mensagem mais clara.
-    if abs(Z_4[0,0]) < 1e-15: # Usar uma tolerância adequada para números de ponto flutuante
-        raise ValueError("Impedância própria do para-raios (Zpp) é zero ou muito pequena, impossível realizar redução de Kron.")
-
-    # A multiplicação de matrizes com '@' é mais explícita e pythonica
-    Zp = Z_1 - (Z_2 @ inv(Z_4) @ Z_3) # Matriz de impedância de fase final.
+    # O termo inv(Z_4) @ Z_3 é obtido por solução do sistema linear (sem inversa explícita), e o
+    # condicionamento de Z_4 é verificado antes, com mensagem clara caso seja singular.
+    Zp = reducao_kron(Z_prim, 3) # Matriz de impedância de fase final.
 
     # Converter para Ohms/km, que é a unidade padrão na maioria das aplicações
     return Zp * 1000
 
+def metodo_carson_para_raio_varredura(ra, rb, rc, rp, xa, xb, xc, xp, ha, hb, hc, hp, rho, frequencias, R=None,
+                                      Rmg_val=None, modelo_solo='aproximado', geometria=None,
+                                      efeito_pelicular=False, raio_interno=0.0, espessuras=None):
+    """
+    Varredura em frequência da impedância de fase com para-raios (`metodo_carson_para_raio`).
+
+    A pilha primitiva (F, 4, 4) é montada de uma vez pelo núcleo de Carson e a redução de Kron
+    é aplicada a todas as frequências em uma única operação vetorizada, resultando na resposta
+    (F, 3, 3) das fases com o para-raios aterrado, pronta para o ajuste vetorial (`ajuste_vetorial`).
+
+    Parâmetros:
+    ra, rb, rc, rp, xa, xb, xc, xp, ha, hb, hc, hp, rho, R, Rmg_val, modelo_solo, geometria, efeito_pelicular,
+    raio_interno, espessuras: Como em `metodo_carson_para_raio`.
+    frequencias (array_like): Vetor de F frequências (Hz). Devem ser positivas.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (F, 3, 3) com as matrizes de impedância de fase (Ohms/km).
+
+    Raises:
+    ValueError: Nas mesmas situações de `metodo_carson_para_raio`, ou se alguma frequência for não positiva.
+    """
+
+    # --- Validações de Entrada (mesmas mensagens de metodo_carson_para_raio) ---
+    if Rmg_val is None and R is None:
+        raise ValueError("ERRO! É necessário fornecer o raio do condutor (R) OU o Raio Médio Geométrico (Rmg_val).")
+    if np.any(np.asarray([ha, hb, hc, hp] if geometria is None else geometria.h) <= 0):
+        raise ValueError("ERRO! As alturas de TODOS os condutores (Ha, Hb, Hc, Hp) devem ser maiores que zero.")
+
+    Z_prim = metodo_carson_n_condutores_varredura(
+        [ra, rb, rc, rp], [xa, xb, xc, xp], [ha, hb, hc, hp], rho, frequencias, R=R, Rmg_val=Rmg_val,
+        modelo_solo=modelo_solo, geometria=geometria, efeito_pelicular=efeito_pelicular, raio_interno=raio_interno,
+        espessuras=espessuras
+    )
+    return reducao_kron(Z_prim, 3) * 1000 # Pilha (F, 3, 3) em Ohms/km
+
 ### Classe de Teste `TestMetodoCarsonParaRaio` (Com a Correção)
 class TestMetodoCarsonParaRaio(unittest.TestCase):
 
@@ -150,6 +157,60 @@ class TestMetodoCarsonParaRaio(unittest.TestCase):
         self.assertFalse(np.any(np.isnan(result)))
         self.assertFalse(np.any(np.isinf(result)))
 
+    def test_geometria_pronta(self):
+        """Uma TowerGeometry já calculada substitui as coordenadas e dá o mesmo resultado."""
+        from longitudinais.geometria import obter_geometria
+        p = self.common_params
+        g = obter_geometria([p['xa'], p['xb'], p['xc'], p['xp']], [p['ha'], p['hb'], p['hc'], p['hp']])
+        sem_coordenadas = dict(p, xa=None, xb=None, xc=None, xp=None, ha=None, hb=None, hc=None, hp=None)
+        np.testing.assert_allclose(metodo_carson_para_raio(**sem_coordenadas, geometria=g),
+                                   metodo_carson_para_raio(**p), rtol=1e-14)
+
+    def test_efeito_pelicular(self):
+        """O efeito pelicular chega ao núcleo: a 60 Hz, fica próximo de r_cc e do RMG R*e^(-1/4)."""
+        from longitudinais.Carson_correcao import Metodo_Carson_long
+        p = dict(self.common_params, ra=1e-4, rb=1e-4, rc=1e-4, rp=3e-4)
+        Z_pel = metodo_carson_para_raio(**p, efeito_pelicular=True)
+        np.testing.assert_allclose(Z_pel, metodo_carson_para_raio(**p), rtol=1e-2)
+        self.assertTrue(np.all(np.diag(Z_pel).real > np.diag(metodo_carson_para_raio(**p)).real))
+        fases = [p[k] for k in ('ra', 'rb', 'rc', 'xa', 'xb', 'xc', 'ha', 'hb', 'hc', 'rho')]
+        np.testing.assert_allclose(Metodo_Carson_long(*fases, R=p['R'], efeito_pelicular=True),
+                                   Metodo_Carson_long(*fases, R=p['R']), rtol=1e-2)
+        with self.assertRaisesRegex(ValueError, "efeito pelicular requer"):
+            metodo_carson_para_raio(**dict(p, R=None, Rmg_val=0.0096), efeito_pelicular=True)
+
+    def test_varredura(self):
+        """Cada fatia da varredura coincide com o cálculo a 60 Hz e a resistência cresce com f."""
+        frequencias = [60.0, 1e3, 1e5]
+        Z_f = metodo_carson_para_raio_varredura(**self.common_params, frequencias=frequencias, modelo_solo='serie')
+        self.assertEqual(Z_f.shape, (3, 3, 3))
+        np.testing.assert_allclose(Z_f[0], metodo_carson_para_raio(**self.common_params, modelo_solo='serie'),
+                                   rtol=1e-12)
+        self.assertTrue(np.all(np.diff(Z_f[:, 0, 0].real) > 0))
+        with self.assertRaisesRegex(ValueError, "maiores que zero"):
+            metodo_carson_para_raio_varredura(**dict(self.common_params, hp=0.0), frequencias=frequencias)
+
+    def test_solo_multicamadas(self):
+        """rho por camada e espessuras chegam ao núcleo: o solo em duas camadas difere do homogêneo."""
+        from longitudinais.Carson_correcao import Metodo_Carson_long, Metodo_Carson_long_varredura
+        camadas = dict(self.common_params, rho=[100.0, 1000.0])
+        Z_camadas = metodo_carson_para_raio(**camadas, modelo_solo='multicamadas', espessuras=[5.0])
+        Z_homogeneo = metodo_carson_para_raio(**self.common_params, modelo_solo='multicamadas')
+        self.assertGreater(np.abs(Z_camadas - Z_homogeneo).max(), 1e-2) # Ohm/km
+        Z_f = metodo_carson_para_raio_varredura(**camadas, frequencias=[60.0], modelo_solo='multicamadas',
+                                                espessuras=[5.0])
+        np.testing.assert_allclose(Z_f[0], Z_camadas, rtol=1e-12)
+
+        p = camadas
+        fases = [p[k] for k in ('ra', 'rb', 'rc', 'xa', 'xb', 'xc', 'ha', 'hb', 'hc')]
+        Z_long = Metodo_Carson_long(*fases, [100.0, 1000.0], R=p['R'], modelo_solo='multicamadas', espessuras=[5.0])
+        Z_long_f = Metodo_Carson_long_varredura(*fases, [100.0, 1000.0], [60.0], R=p['R'], modelo_solo='multicamadas',
+                                                espessuras=[5.0])
+        np.testing.assert_allclose(Z_long_f[0], Z_long, rtol=1e-12)
+        self.assertGreater(np.abs(Z_long - Metodo_Carson_long(*fases, 100.0, R=p['R'])).max(), 1e-3)
+        with self.assertRaisesRegex(ValueError, "resistividade do solo"):
+            metodo_carson_para_raio(**dict(p, rho=[100.0, -1.0]), modelo_solo='multicamadas', espessuras=[5.0])
+
     def test_matrix_symmetry(self):
         """Verifica se a matriz de impedância resultante é simétrica (Zij = Zji)."""
         result = metodo_carson_para_raio(**self.common_params)
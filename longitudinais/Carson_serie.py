@@ -0,0 +1,206 @@
+import functools
+import math
+import numpy as np
+import unittest
+
+from longitudinais.geometria import obter_geometria
+
+# Ordem padrão de truncamento da série de Carson (número de termos em k).
+# Com 24 termos o erro de truncamento relativo em P e Q fica abaixo de 1e-8 em todo o intervalo k <= 5.
+ORDEM_SERIE = 24
+
+# Acima deste valor de k, a série converge lentamente e é usada a expansão assintótica.
+K_ASSINTOTICO = 5.0
+
+def termos_carson(k, theta, ordem=ORDEM_SERIE):
+    """
+    Termos de correção P e Q de Carson para o retorno pelo solo.
+
+    Para k <= 5 usa a série infinita de Carson truncada em `ordem` termos; para k > 5,
+    a expansão assintótica. A série é avaliada de uma vez para todos os elementos de k e
+    theta (pares de condutores e frequências), acumulando (k * e^(j*theta))^i termo a termo,
+    e os coeficientes b_i, c_i e d_i são calculados uma única vez por ordem.
+
+        P = pi/8 - b1*k*cos(theta) + b2*[(c2 - ln k)*k^2*cos(2theta) + theta*k^2*sin(2theta)]
+            + b3*k^3*cos(3theta) - d4*k^4*cos(4theta) - ...
+        Q = -0.0386 + 0.5*ln(2/k) + b1*k*cos(theta) - d2*k^2*cos(2theta) + b3*k^3*cos(3theta)
+            - b4*[(c4 - ln k)*k^4*cos(4theta) + theta*k^4*sin(4theta)] + ...
+
+    Parâmetros:
+    k (array_like): Parâmetro de Carson k = 4*pi*sqrt(5)*1e-4 * D * sqrt(f/rho), com D = 2h
+                    (próprio) ou a distância até a imagem d_ij' (mútuo). Deve ser positivo.
+    theta (array_like): Ângulo (rad) entre a vertical e a reta até a imagem (zero para o próprio).
+    ordem (int, opcional): Número de termos da série (0 reproduz a aproximação de primeira ordem).
+
+    Retorna:
+    tuple: (P, Q), arrays reais com a forma de broadcast de k e theta.
+    """
+    if ordem < 0:
+        raise ValueError("ERRO! A ordem da série de Carson deve ser não-negativa.")
+    k, theta = np.broadcast_arrays(np.asarray(k, dtype=float), np.asarray(theta, dtype=float))
+    if np.any(k <= 0):
+        raise ValueError("ERRO! O parâmetro k de Carson deve ser positivo.")
+
+    P = np.empty(k.shape)
+    Q = np.empty(k.shape)
+
+    serie = k <= K_ASSINTOTICO
+    P[serie], Q[serie] = _serie_carson(k[serie], theta[serie], ordem)
+
+    assint = ~serie
+    P[assint], Q[assint] = _assintotico_carson(k[assint], theta[assint])
+    return P, Q
+
+def correcao_carson_serie(x, h, rho, frequencias, ordem=ORDEM_SERIE, geometria=None):
+    """
+    Correção de Carson completa (série) para a impedância de retorno pelo solo.
+
+        Delta_Z_ij = (w * mi_0 / pi) * (P_ij + j*Q_ij)   (Ohm/m)
+
+    Parâmetros:
+    x, h (array_like): Coordenadas horizontais e alturas dos N condutores (metros).
+    rho (float): Resistividade do solo (Ohm.m).
+    frequencias (array_like): Vetor de F frequências (Hz).
+    ordem (int, opcional): Número de termos da série de Carson.
+    geometria (TowerGeometry, opcional): Geometria já calculada; se fornecida, x e h são ignorados.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (F, N, N) com as correções de Carson (Ohm/m).
+    """
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+
+    if rho <= 0:
+        raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    if np.any(frequencias <= 0):
+        raise ValueError("ERRO! As frequências (f) devem ser valores positivos.")
+    if geometria is None:
+        geometria = obter_geometria(x, h)
+    H = geometria.h[:, np.newaxis] + geometria.h
+    X = np.abs(geometria.x[:, np.newaxis] - geometria.x)
+    return correcao_serie_pares(H, X, rho, frequencias, ordem)
+
+def correcao_serie_pares(H, X, rho, frequencias, ordem=ORDEM_SERIE):
+    """
+    Correção de Carson (série) para pares de pontos dados pela soma das alturas H = h_i + h_j
+    e pelo afastamento horizontal X = |x_i - x_j| (ver `correcao_carson_serie`).
+
+    Parâmetros:
+    H, X (array_like): Arrays de mesma forma (...) com somas de alturas (> 0) e afastamentos (metros).
+    rho, frequencias, ordem: Como em `correcao_carson_serie` (já validados pelo chamador).
+
+    Retorna:
+    numpy.ndarray: Array complexo (F, ...) com as correções de Carson (Ohm/m).
+    """
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+
+    H, X = np.broadcast_arrays(np.asarray(H, dtype=float), np.abs(np.asarray(X, dtype=float)))
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    f = frequencias.reshape(frequencias.shape + (1,) * H.ndim)
+    k = 4 * math.pi * math.sqrt(5) * 1e-4 * np.hypot(X, H) * np.sqrt(f / rho) # (F, ...)
+    P, Q = termos_carson(k, np.arctan2(X, H), ordem)
+
+    w = 2 * math.pi * f
+    return (w * mi_0 / math.pi) * (P + 1j * Q)
+
+@functools.lru_cache(maxsize=None)
+def _coeficientes_serie(ordem):
+    """Coeficientes b_i, c_i e d_i (i = 1..ordem) da série de Carson."""
+    b = np.zeros(ordem + 3)
+    c = np.zeros(ordem + 3)
+    b[1] = math.sqrt(2) / 6
+    b[2] = 1 / 16
+    c[2] = 1.3659315
+    for i in range(3, ordem + 1):
+        sinal = 1 if ((i - 1) // 4) % 2 == 0 else -1 # Sinal de b_i: + para i = 1..4, - para i = 5..8, ...
+        b[i] = sinal * abs(b[i - 2]) / (i * (i + 2))
+        c[i] = c[i - 2] + 1 / i + 1 / (i + 2)
+    d = math.pi / 4 * b
+    for v in (b, c, d):
+        v.setflags(write=False)
+    return b, c, d
+
+def _serie_carson(k, theta, ordem):
+    """Série de Carson (k <= 5) para arrays 1D."""
+    b, c, d = _coeficientes_serie(ordem)
+    log_k = np.log(k)
+
+    P = np.full(k.shape, math.pi / 8)
+    Q = -0.0386 + 0.5 * (math.log(2) - log_k)
+
+    z = k * np.exp(1j * theta) # k*e^(j*theta); z^i = k^i*(cos(i*theta) + j*sin(i*theta))
+    z_i = np.ones(k.shape, dtype=complex)
+    for i in range(1, ordem + 1):
+        z_i = z_i * z
+        termo_cos = z_i.real # k^i * cos(i*theta)
+        resto = i % 4
+        if resto == 1:
+            P -= b[i] * termo_cos
+            Q += b[i] * termo_cos
+        elif resto == 3:
+            P += b[i] * termo_cos
+            Q += b[i] * termo_cos
+        else:
+            termo_log = (c[i] - log_k) * termo_cos + theta * z_i.imag
+            if resto == 2:
+                P += b[i] * termo_log
+                Q -= d[i] * termo_cos
+            else:
+                P -= d[i] * termo_cos
+                Q -= b[i] * termo_log
+    return P, Q
+
+def _assintotico_carson(k, theta):
+    """Expansão assintótica de Carson (k > 5) para arrays 1D."""
+    raiz2 = math.sqrt(2)
+    P = (np.cos(theta) / (raiz2 * k) - np.cos(2 * theta) / k**2 + np.cos(3 * theta) / (raiz2 * k**3)
+         + 3 * np.cos(5 * theta) / (raiz2 * k**5) - 45 * np.cos(7 * theta) / (raiz2 * k**7))
+    Q = (np.cos(theta) / (raiz2 * k) - np.cos(3 * theta) / (raiz2 * k**3)
+         + 3 * np.cos(5 * theta) / (raiz2 * k**5) + 45 * np.cos(7 * theta) / (raiz2 * k**7))
+    return P, Q
+
+class TestCarsonSerie(unittest.TestCase):
+
+    def test_ordem_zero_igual_aproximacao(self):
+        """Com ordem 0, a correção reproduz rd = 9.869e-7*f e De = 659*sqrt(rho/f)."""
+        f, rho, h = 60.0, 100.0, 20.0
+        dZ = correcao_carson_serie([0.0], [h], rho, [f], ordem=0)[0, 0, 0]
+        w = 2 * math.pi * f
+        De = 659 * math.sqrt(rho / f)
+        esperado = 9.869e-7 * f + 1j * w * 2e-7 * math.log(De / (2 * h))
+        np.testing.assert_allclose(dZ.real, esperado.real, rtol=1e-4)
+        np.testing.assert_allclose(dZ.imag, esperado.imag, rtol=1e-4)
+
+    def test_convergencia_da_serie(self):
+        """A ordem padrão já coincide com uma série muito mais longa."""
+        k = np.array([0.01, 0.5, 2.0, 5.0])
+        theta = np.array([0.0, 0.3, 1.0, 1.4])
+        P, Q = termos_carson(k, theta)
+        P_ref, Q_ref = termos_carson(k, theta, ordem=80)
+        np.testing.assert_allclose(P, P_ref, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(Q, Q_ref, rtol=1e-8, atol=1e-12)
+
+    def test_confere_com_integral_de_carson(self):
+        """Valores de referência obtidos por integração numérica da integral de Carson."""
+        P, Q = termos_carson([1.0, 3.0, 5.0, 8.0], [0.0, 0.5, 1.2, 0.5])
+        np.testing.assert_allclose(P[:3], [0.2563654868, 0.1496580225, 0.0758478566], atol=1e-7) # Série
+        np.testing.assert_allclose(P[3], 0.0691898564, atol=1e-5) # Expansão assintótica (k > 5)
+        # A constante -0.0386 da série é arredondada, o que limita a precisão de Q a ~1e-5.
+        np.testing.assert_allclose(Q, [0.5052400891, 0.2003872681, 0.0577709752, 0.0774090796], atol=2e-5)
+
+    def test_continuidade_em_k_5(self):
+        """Série e expansão assintótica devem praticamente coincidir na transição k = 5."""
+        theta = np.array([0.0, 0.5, 1.0])
+        P_s, Q_s = _serie_carson(np.full(3, 5.0), theta, 80)
+        P_a, Q_a = _assintotico_carson(np.full(3, 5.0), theta)
+        np.testing.assert_allclose(P_s, P_a, atol=2e-3)
+        np.testing.assert_allclose(Q_s, Q_a, atol=2e-3)
+
+    def test_forma_e_simetria(self):
+        """A pilha de correções tem forma (F, N, N) e é simétrica."""
+        dZ = correcao_carson_serie([-5.0, 0.0, 5.0], [15.0, 17.0, 15.0], 1000.0, [60.0, 1e4, 1e6])
+        self.assertEqual(dZ.shape, (3, 3, 3))
+        np.testing.assert_allclose(dZ, np.swapaxes(dZ, -1, -2), rtol=1e-14)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -2,7 +2,11 @@ import numpy as np
 import math
 import unittest
 
-def metodo_carson_transp(ra,rb,rc,xa,ha,xb,hb,xc,hc,rho,l1,l2,l3,R=None,Rmg_val=None):
+from longitudinais.Carson_n_condutores import metodo_carson_n_condutores
+from longitudinais.transposicao_ciclica import esquema_transposicao_ciclico, transpor_matriz
+
+def metodo_carson_transp(ra,rb,rc,xa,ha,xb,hb,xc,hc,rho,l1,l2,l3,R=None,Rmg_val=None,modelo_solo='aproximado',
+                         geometria=None,efeito_pelicular=False,raio_interno=0.0,espessuras=None):
     """
     Calcula a impedância longitudinal de uma linha de transmissão trifásica
     transposta usando o Método de Carson.
@@ -17,28 +21,28 @@ def metodo_carson_transp(ra,rb,rc,xa,ha,xb,hb,xc,hc,rho,l1,l2,l3,R=None,Rmg_val=
     xa, xb, xc (float): Coordenadas horizontais (X) dos condutores A, B e C (em metros).
     ha, hb, hc (float): Coordenadas verticais (H) dos condutores A, B e C (em metros).
                         As alturas devem ser positivas.
-    rho (float): Resistividade do solo (em Ohm.m).
+    rho (float ou array_like): Resistividade do solo (em Ohm.m), ou uma por camada no modelo 'multicamadas'.
     l1, l2, l3 (float): Comprimentos das três seções da transposição (em metros).
     R (float, opcional): Raio físico do condutor (em metros).
                          Usado para calcular o RMG se 'Rmg_val' não for fornecido.
     Rmg_val (float, opcional): Raio Médio Geométrico do condutor (em metros).
                                Se fornecido, tem prioridade sobre 'R'.
+    modelo_solo (str, opcional): Modelo de retorno pelo solo ('aproximado', 'serie', 'profundidade_complexa'
+                                 ou 'multicamadas'). Padrão: 'aproximado'.
+    geometria (TowerGeometry, opcional): Geometria já calculada das posições da seção 1. Se fornecida,
+                                         as coordenadas e alturas são ignoradas (podem ser None).
+    efeito_pelicular (bool, opcional): Se True, ra, rb e rc são resistências em corrente contínua,
+                                       substituídas pela impedância interna com efeito pelicular a 60 Hz
+                                       (ver `impedancia_interna`). Exige R, que substitui o RMG no termo externo.
+    raio_interno (float, opcional): Raio interno do condutor tubular (ACSR), usado com efeito_pelicular.
+    espessuras (array_like, opcional): Espessuras das camadas do solo, exceto a última (metros), usadas
+                                       com o modelo 'multicamadas'. Padrão: None (solo homogêneo).
 
     Retorna:
     numpy.ndarray: Matriz de impedância de fase (3x3) da linha transposta (em Ohms).
                    A impedância é calculada para o comprimento total da linha (l1 + l2 + l3).
     """
 
-    # --- Constantes Físicas e Elétricas ---
-    f = 60                                       # Frequência do sistema em Hertz (Hz).
-    mi_0 = 4 * math.pi * (10**(-7))              # Permeabilidade magnética do vácuo em Henry/metro (H/m).
-    w = 2 * math.pi * f                          # Frequência angular em radianos/segundo (rad/s).
-
-    # --- Termos de Correção do Método de Carson para o Solo ---
-    # `rd`: Termo de resistência de Carson (Ohm/m) que modela a resistência do retorno da corrente pelo solo.
-    # É uma aproximação amplamente usada para frequências de 50/60 Hz.
-    rd = 9.869 * (10**(-7)) * f                  # Ohm/m
-
     # --- Cálculo e Validação do Raio Médio Geométrico (RMG) ---
     Rmg = None # Inicializa a variável RMG.
     if Rmg_val is not None:
@@ -58,10 +62,10 @@ def metodo_carson_transp(ra,rb,rc,xa,ha,xb,hb,xc,hc,rho,l1,l2,l3,R=None,Rmg_val=
     if Rmg <= 0:
         # O RMG deve ser um valor positivo.
         raise ValueError("ERRO! O Raio Médio Geométrico (RMG) deve ser um valor positivo.")
-    if rho <= 0:
+    if np.any(np.asarray(rho) <= 0):
         # A resistividade do solo deve ser um valor positivo.
         raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
-    if ha <= 0 or hb <= 0 or hc <= 0:
+    if np.any(np.asarray([ha, hb, hc] if geometria is None else geometria.h) <= 0):
         # As alturas dos condutores devem ser maiores que zero, pois o método de Carson assume condutores acima do solo.
         raise ValueError("ERRO! As alturas dos condutores (Ha, Hb, Hc) devem ser maiores que zero.")
     if l1 < 0 or l2 < 0 or l3 < 0:
@@ -71,64 +75,25 @@ def metodo_carson_transp(ra,rb,rc,xa,ha,xb,hb,xc,hc,rho,l1,l2,l3,R=None,Rmg_val=
         # O comprimento total da linha não pode ser zero.
         raise ValueError("ERRO! O comprimento total da linha (l1+l2+l3) não pode ser zero.")
 
-    # `De`: Distância de retorno equivalente do solo (metros).
-    # É uma profundidade fictícia do plano de retorno da corrente que captura o efeito da resistividade finita do solo.
-    De = 659 * (math.sqrt(rho / f))              # Metros
-
-    # --- Cálculo das Distâncias Geométricas entre os condutores ---
-    # As distâncias entre os centros dos condutores são calculadas usando a fórmula euclidiana 2D.
-    dab = np.sqrt(((xa - xb)**2) + ((ha - hb)**2)) # Distância entre condutores A e B
-    dac = np.sqrt(((xa - xc)**2) + ((ha - hc)**2)) # Distância entre condutores A e C
-    dbc = np.sqrt(((xb - xc)**2) + ((hb - hc)**2)) # Distância entre condutores B e C
-
-    # --- Cálculo das Impedâncias Próprias e Mútuas por unidade de comprimento (Ohm/m) ---
-    # `Zii`: Impedância própria do condutor `i` em relação ao retorno pelo solo.
+    # --- Matriz de Impedâncias por unidade de comprimento (Ohm/m) ---
+    # Montada pelo núcleo de Carson para N condutores, com as fases nas posições da seção 1:
     # `Zii` = (resistência do condutor) + `rd` + j * (reatância própria de Carson)
-    Zaa = ra + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zbb = rb + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-    Zcc = rc + rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / Rmg)
-
-    # `Zij`: Impedância mútua entre os condutores `i` e `j`, considerando o retorno pelo solo.
-    # `Zij` = `rd` + j * (reatância mútua de Carson)
-    Zab = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dab) # Mútua entre A e B
-    Zac = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dac) # Mútua entre A e C
-    Zbc = rd + ((1j * w * mi_0) / (2 * math.pi)) * math.log(De / dbc) # Mútua entre B e C
-
-    # A matriz de impedância de fase é simétrica, então Zij = Zji.
-    Zba = Zab
-    Zca = Zac
-    Zcb = Zbc
-
-    # --- Composição das Matrizes das Seções da Transposição ---
-    # Cada matriz representa a impedância por unidade de comprimento para o arranjo de fases em uma seção.
-
-    # Seção 1 (l1): Arranjo padrão (A na pos1, B na pos2, C na pos3)
-    Z_1 = np.array([
-        [Zaa, Zab, Zac],
-        [Zba, Zbb, Zbc],
-        [Zca, Zcb, Zcc]
-    ]) * l1 # Multiplica pela comprimento da seção para obter a impedância total da seção
-
-    # Seção 2 (l2): Arranjo rotacionado (B na pos1, C na pos2, A na pos3)
-    # A matriz é rearranjada para mapear as impedâncias das posições físicas para as fases A, B e C.
-    # A está na posição 3, B na 1, C na 2.
-    Z_2 = np.array([
-        [Zcc, Zca, Zcb], # Linha da Fase A (corresponde à posição 3)
-        [Zac, Zaa, Zab], # Linha da Fase B (corresponde à posição 1)
-        [Zbc, Zba, Zbb]  # Linha da Fase C (corresponde à posição 2)
-    ]) * l2
-
-    # Seção 3 (l3): Segundo arranjo rotacionado (C na pos1, A na pos2, B na pos3)
-    # Mapeamento: A está na posição 2, B na 3, C na 1.
-    Z_3 = np.array([
-        [Zbb, Zbc, Zba], # Linha da Fase A (corresponde à posição 2)
-        [Zcb, Zcc, Zca], # Linha da Fase B (corresponde à posição 3)
-        [Zab, Zac, Zaa]  # Linha da Fase C (corresponde à posição 1)
-    ]) * l3
+    # `Zij` = `rd` + j * (reatância mútua de Carson), com Zij = Zji.
+    Z = metodo_carson_n_condutores([ra, rb, rc], [xa, xb, xc], [ha, hb, hc], rho, R=R, Rmg_val=Rmg, modelo_solo=modelo_solo,
+                                   geometria=geometria, efeito_pelicular=efeito_pelicular, raio_interno=raio_interno,
+                                   espessuras=espessuras)
+
+    # --- Composição das Seções da Transposição ---
+    # Cada seção é a mesma matriz por posição física, apenas permutada para o arranjo de fases da seção:
+    # Seção 1 (l1): A na pos1, B na pos2, C na pos3
+    # Seção 2 (l2): A na pos3, B na pos1, C na pos2
+    # Seção 3 (l3): A na pos2, B na pos3, C na pos1
+    esquema = esquema_transposicao_ciclico(n_secoes=3, n_fases=3, sentido=-1)
 
     # --- Cálculo da Impedância Total da Linha Transposta ---
-    # A impedância da linha transposta é a soma das impedâncias de cada seção.
-    Z_transp = Z_1 + Z_2 + Z_3
+    # A impedância da linha transposta é a soma das impedâncias de cada seção (Z por metro * comprimento),
+    # calculada em uma única operação vetorizada.
+    Z_transp = transpor_matriz(Z, [l1, l2, l3], esquema)
 
     return Z_transp
 
@@ -280,6 +245,35 @@ class TestMetodoCarsonTransp(unittest.TestCase):
             )
         self.assertIn("ERRO! O comprimento total da linha (l1+l2+l3) não pode ser zero.", str(cm.exception))
 
+    def test_geometria_pronta(self):
+        """Uma TowerGeometry já calculada substitui as coordenadas e dá o mesmo resultado."""
+        from longitudinais.geometria import obter_geometria
+        g = obter_geometria([self.xa, self.xb, self.xc], [self.ha, self.hb, self.hc])
+        Z_geometria = metodo_carson_transp(self.ra, self.rb, self.rc, None, None, None, None, None, None,
+                                           self.rho, self.l1, self.l2, self.l3, R=self.R, geometria=g)
+        Z = metodo_carson_transp(self.ra, self.rb, self.rc, self.xa, self.ha, self.xb, self.hb, self.xc, self.hc,
+                                 self.rho, self.l1, self.l2, self.l3, R=self.R)
+        np.testing.assert_allclose(Z_geometria, Z, rtol=1e-14)
+
+    def test_efeito_pelicular(self):
+        """Com efeito pelicular a 60 Hz, o resultado fica próximo do RMG R*e^(-1/4) e a resistência cresce."""
+        argumentos = (self.ra, self.rb, self.rc, self.xa, self.ha, self.xb, self.hb, self.xc, self.hc,
+                      self.rho, self.l1, self.l2, self.l3)
+        Z = metodo_carson_transp(*argumentos, R=self.R)
+        Z_pel = metodo_carson_transp(*argumentos, R=self.R, efeito_pelicular=True)
+        np.testing.assert_allclose(Z_pel, Z, rtol=1e-2)
+        self.assertGreater(Z_pel[0, 0].real, Z[0, 0].real)
+
+    def test_solo_multicamadas(self):
+        """Com rho por camada e espessuras, o modelo 'multicamadas' considera o solo estratificado."""
+        argumentos = (self.ra, self.rb, self.rc, self.xa, self.ha, self.xb, self.hb, self.xc, self.hc)
+        comprimentos = (self.l1, self.l2, self.l3)
+        Z_camadas = metodo_carson_transp(*argumentos, [self.rho, 10 * self.rho], *comprimentos, R=self.R,
+                                         modelo_solo='multicamadas', espessuras=[5.0])
+        Z_homogeneo = metodo_carson_transp(*argumentos, self.rho, *comprimentos, R=self.R, modelo_solo='multicamadas')
+        self.assertGreater(np.abs(Z_camadas - Z_homogeneo).max(), 1e-3 * np.abs(Z_homogeneo).max())
+        np.testing.assert_allclose(Z_camadas, Z_camadas.T, rtol=1e-12)
+
     def test_specific_Rmg_val_usage(self):
         """
         Verifica se a função utiliza corretamente o RMG fornecido diretamente (Rmg_val),
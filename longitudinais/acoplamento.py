@@ -0,0 +1,185 @@
+import numpy as np
+import unittest
+
+from longitudinais.Carson_serie import ORDEM_SERIE
+from longitudinais.Carson_n_condutores import MODELOS_SOLO, impedancia_mutua_carson
+
+def impedancia_mutua_rota(x, h, x_vitima, h_vitima, rho, f=60, modelo_solo='aproximado', ordem_serie=ORDEM_SERIE,
+                          espessuras=None):
+    """
+    Impedâncias mútuas entre os condutores da linha e um condutor de terceiros (duto ou cabo de
+    telecomunicações) em cada segmento de uma rota.
+
+    Usa o mesmo núcleo mútuo da matriz primitiva (`impedancia_mutua_carson`), avaliado de uma vez
+    para todos os pares (segmento, condutor) por broadcast, com H = h + h_vitima e X = |x - x_vitima|.
+    No modelo 'aproximado', vale também para condutores enterrados (h_vitima < 0) enquanto d << De
+    (fórmula de Carson-Clem).
+
+    Parâmetros:
+    x, h (array_like): Coordenadas horizontais e alturas dos N condutores da linha (metros).
+    x_vitima (array_like): Posição horizontal do condutor de terceiros em cada um dos S segmentos,
+                           no mesmo referencial de x (metros).
+    h_vitima (float ou array_like): Altura do condutor de terceiros em cada segmento (metros);
+                                    negativa para condutores enterrados (apenas no modelo 'aproximado').
+    rho (float ou array_like): Resistividade do solo (Ohm.m); uma por camada no modelo 'multicamadas'.
+    f (float, opcional): Frequência (Hz). Padrão: 60 Hz.
+    modelo_solo (str, opcional): Um de MODELOS_SOLO. Padrão: 'aproximado'.
+    ordem_serie (int, opcional): Número de termos da série de Carson (modelo 'serie').
+    espessuras (array_like, opcional): Espessuras das camadas do solo, exceto a última (modelo 'multicamadas').
+
+    Retorna:
+    numpy.ndarray: Matriz complexa (S, N) de impedâncias mútuas (Ohm/m).
+
+    Raises:
+    ValueError: Se rho ou f não forem positivos, se o modelo for desconhecido, se o condutor de
+                terceiros coincidir com um condutor da linha ou estiver enterrado com um modelo
+                que exige alturas positivas.
+    """
+    if np.any(np.asarray(rho) <= 0):
+        raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
+    if f <= 0:
+        raise ValueError("ERRO! A frequência (f) deve ser um valor positivo.")
+    if modelo_solo not in MODELOS_SOLO:
+        raise ValueError(f"ERRO! Modelo de solo '{modelo_solo}' desconhecido. Disponíveis: {', '.join(MODELOS_SOLO)}.")
+    if np.ndim(rho) > 0 and modelo_solo != 'multicamadas':
+        raise ValueError("ERRO! Várias resistividades (solo em camadas) exigem o modelo 'multicamadas'.")
+
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    h = np.atleast_1d(np.asarray(h, dtype=float))
+    x_vitima, h_vitima = np.broadcast_arrays(np.atleast_1d(np.asarray(x_vitima, dtype=float)),
+                                             np.asarray(h_vitima, dtype=float))
+    if x.shape != h.shape:
+        raise ValueError("ERRO! Os vetores de coordenadas (x) e alturas (h) devem ter o mesmo tamanho.")
+    if modelo_solo != 'aproximado' and np.any(h_vitima <= 0):
+        raise ValueError("ERRO! Condutores enterrados (h_vitima <= 0) só são suportados no modelo 'aproximado'.")
+
+    dx = x - x_vitima[:, np.newaxis]                               # (S, N)
+    d = np.hypot(dx, h - h_vitima[:, np.newaxis])
+    if np.any(d == 0):
+        raise ValueError("ERRO! O condutor de terceiros não pode coincidir com um condutor da linha.")
+
+    return impedancia_mutua_carson(h + h_vitima[:, np.newaxis], np.abs(dx), d, rho, [f], modelo_solo,
+                                   ordem_serie, espessuras)[0]
+
+def fem_induzida(x, h, I, comprimentos, x_vitima, h_vitima, rho, f=60, modelo_solo='aproximado',
+                 ordem_serie=ORDEM_SERIE, espessuras=None):
+    """
+    Força eletromotriz longitudinal induzida em um condutor de terceiros ao longo de uma rota.
+
+    A rota é descrita por S segmentos paralelos à linha, cada um com o seu comprimento e a sua
+    posição (afastamento e altura) em relação à seção transversal da linha; aproximações
+    oblíquas são representadas por segmentos curtos. Em cada segmento, E_s = sum_n Z_m[s, n] I_n
+    (V/m) e a FEM do segmento é E_s * L_s. Todo o cálculo é uma única passada vetorizada sobre os
+    S segmentos.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas dos N condutores da linha (metros).
+    I (array_like): Correntes (fasores, A) dos N condutores, (N,) ou uma por segmento (S, N).
+                    Inclua as correntes dos para-raios (ver `correntes_para_raios`) para
+                    considerar o seu efeito de blindagem.
+    comprimentos (array_like): Comprimentos (S,) dos segmentos (metros).
+    x_vitima, h_vitima, rho, f, modelo_solo, ordem_serie, espessuras: Como em `impedancia_mutua_rota`.
+
+    Retorna:
+    tuple: (fem_segmentos, fem_acumulada), fasores (S,) em V, com a FEM de cada segmento e a FEM
+           acumulada desde o início da rota até o fim de cada segmento.
+    """
+    comprimentos = np.atleast_1d(np.asarray(comprimentos, dtype=float))
+    if np.any(comprimentos < 0):
+        raise ValueError("ERRO! Os comprimentos dos segmentos não podem ser negativos.")
+    Z_m = impedancia_mutua_rota(x, h, x_vitima, h_vitima, rho, f, modelo_solo, ordem_serie, espessuras)
+    if Z_m.shape[0] != comprimentos.shape[0]:
+        raise ValueError("ERRO! É necessário um comprimento para cada segmento da rota.")
+    campo = (Z_m * np.asarray(I)).sum(axis=-1)  # Correntes (N,) ou (S, N), por broadcast
+    fem = campo * comprimentos
+    return fem, np.cumsum(fem)
+
+def correntes_para_raios(Z, I_fases):
+    """
+    Correntes induzidas nos para-raios aterrados (queda de tensão nula) pelas correntes de fase.
+
+    Com Z particionada em fases (f) e para-raios (g): I_g = -Z_gg^-1 Z_gf I_f.
+
+    Parâmetros:
+    Z (array_like): Matriz primitiva (N, N) de impedâncias (Ohm/m), com as fases primeiro.
+    I_fases (array_like): Correntes de fase (n_fases,) ou (..., n_fases) (A).
+
+    Retorna:
+    numpy.ndarray: Correntes (..., N) de todos os condutores (fases seguidas dos para-raios).
+    """
+    Z = np.asarray(Z)
+    I_fases = np.asarray(I_fases)
+    n_fases = I_fases.shape[-1]
+    if not 1 <= n_fases <= Z.shape[-1]:
+        raise ValueError(f"ERRO! O número de correntes de fase deve estar entre 1 e {Z.shape[-1]}.")
+    Z_gf = Z[n_fases:, :n_fases]
+    Z_gg = Z[n_fases:, n_fases:]
+    I_g = -np.linalg.solve(Z_gg, np.einsum('gf,...f->g...', Z_gf, I_fases).reshape(Z_gg.shape[0], -1))
+    I_g = np.moveaxis(I_g.reshape((Z_gg.shape[0],) + I_fases.shape[:-1]), 0, -1)
+    return np.concatenate([np.broadcast_to(I_fases, I_g.shape[:-1] + (n_fases,)), I_g], axis=-1)
+
+class TestAcoplamento(unittest.TestCase):
+
+    def setUp(self):
+        # Linha de circuito simples com dois para-raios e rota de um duto.
+        self.x = np.array([-8.0, 0.0, 8.0, -5.0, 5.0])
+        self.h = np.array([18.0, 18.0, 18.0, 28.0, 28.0])
+        self.r = np.array([0.06e-3] * 3 + [0.4e-3] * 2)
+        self.Rmg = np.array([0.0124] * 3 + [0.004] * 2)
+        self.rho = 100.0
+
+    def test_mutua_igual_matriz_primitiva(self):
+        """Z_m coincide com o elemento mútuo da matriz primitiva com o condutor de terceiros incluído."""
+        from longitudinais.Carson_n_condutores import metodo_carson_n_condutores
+        for modelo in MODELOS_SOLO:
+            Z_m = impedancia_mutua_rota(self.x, self.h, [40.0], 6.0, self.rho, modelo_solo=modelo)
+            Z = metodo_carson_n_condutores(np.append(self.r, 1e-4), np.append(self.x, 40.0),
+                                           np.append(self.h, 6.0), self.rho, Rmg_val=np.append(self.Rmg, 0.01),
+                                           modelo_solo=modelo)
+            np.testing.assert_allclose(Z_m[0], Z[-1, :-1], rtol=1e-12)
+        camadas = dict(modelo_solo='multicamadas', espessuras=[30.0])
+        Z_m = impedancia_mutua_rota(self.x, self.h, [40.0], 6.0, [self.rho, 1000.0], **camadas)
+        Z = metodo_carson_n_condutores(np.append(self.r, 1e-4), np.append(self.x, 40.0), np.append(self.h, 6.0),
+                                       [self.rho, 1000.0], Rmg_val=np.append(self.Rmg, 0.01), **camadas)
+        np.testing.assert_allclose(Z_m[0], Z[-1, :-1], rtol=1e-10)
+
+    def test_rota_vetorizada(self):
+        """Milhares de segmentos em uma chamada coincidem com o cálculo segmento a segmento."""
+        S = 5000
+        afastamento = 30 + 200 * np.abs(np.sin(np.linspace(0, 6, S)))
+        L = np.full(S, 20.0)
+        I = 1000 * np.array([1, np.exp(-2j * np.pi / 3), np.exp(2j * np.pi / 3), 0, 0])
+        fem, acumulada = fem_induzida(self.x, self.h, I, L, afastamento, -1.5, self.rho)
+        self.assertEqual(fem.shape, (S,))
+        for s in (0, 1234, S - 1):
+            Z_s = impedancia_mutua_rota(self.x, self.h, [afastamento[s]], -1.5, self.rho)[0]
+            np.testing.assert_allclose(fem[s], (Z_s @ I) * L[s], rtol=1e-12)
+        np.testing.assert_allclose(acumulada[-1], fem.sum(), rtol=1e-12)
+
+    def test_blindagem_dos_para_raios(self):
+        """Em um curto-circuito fase-terra, as correntes induzidas nos para-raios reduzem a FEM."""
+        from longitudinais.Carson_n_condutores import metodo_carson_n_condutores
+        Z = metodo_carson_n_condutores(self.r, self.x, self.h, self.rho, Rmg_val=self.Rmg)
+        I = correntes_para_raios(Z, [10e3, 0, 0])
+        self.assertEqual(I.shape, (5,))
+        # Queda de tensão nula nos para-raios
+        np.testing.assert_allclose((Z @ I)[3:], 0.0, atol=1e-9)
+        sem, _ = fem_induzida(self.x, self.h, np.array([10e3, 0, 0, 0, 0]), [1000.0], [50.0], 1.0, self.rho)
+        com, _ = fem_induzida(self.x, self.h, I, [1000.0], [50.0], 1.0, self.rho)
+        self.assertLess(abs(com[0]), abs(sem[0]))
+        # Várias condições de corrente de uma vez
+        I_pilha = correntes_para_raios(Z, np.array([[10e3, 0, 0], [0, 10e3, 0]]))
+        self.assertEqual(I_pilha.shape, (2, 5))
+        np.testing.assert_allclose(I_pilha[0], I, rtol=1e-12)
+
+    def test_validacoes(self):
+        """Entradas inválidas devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "só são suportados no modelo 'aproximado'"):
+            impedancia_mutua_rota(self.x, self.h, [40.0], -1.0, self.rho, modelo_solo='serie')
+        with self.assertRaisesRegex(ValueError, "não pode coincidir"):
+            impedancia_mutua_rota(self.x, self.h, [0.0], 18.0, self.rho)
+        with self.assertRaisesRegex(ValueError, "um comprimento para cada segmento"):
+            fem_induzida(self.x, self.h, np.ones(5), [1.0, 2.0], [40.0], 1.0, self.rho)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,146 @@
+import numpy as np
+import unittest
+
+from longitudinais.reducao_kron import reducao_kron, capacitancia_kron
+
+# --- Transformação de Fortescue (componentes simétricas) ---
+# Operador a = 1∠120°, calculado uma única vez na importação do módulo.
+ALFA = np.exp(1j * 2 * np.pi / 3)
+
+# Matriz de síntese A: [Va; Vb; Vc] = A @ [V0; V1; V2].
+MATRIZ_SINTESE = np.array([[1, 1, 1],
+                           [1, ALFA**2, ALFA],
+                           [1, ALFA, ALFA**2]], dtype=complex)
+
+# Matriz de análise A^-1 = (1/3) * conj(A): [V0; V1; V2] = A^-1 @ [Va; Vb; Vc].
+MATRIZ_ANALISE = (1/3) * np.array([[1, 1, 1],
+                                   [1, ALFA, ALFA**2],
+                                   [1, ALFA**2, ALFA]], dtype=complex)
+
+MATRIZ_SINTESE.setflags(write=False)
+MATRIZ_ANALISE.setflags(write=False)
+
+def fase_para_sequencia(M_abc):
+    """
+    Transforma uma matriz de fase (Z, Y, C ou P) em matriz de sequência: M_012 = A^-1 @ M_abc @ A.
+
+    Parâmetros:
+    M_abc (array_like): Matriz (3, 3) ou pilha (..., 3, 3) de fase.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) complexa (..., 3, 3) de sequência, na ordem [0, 1, 2].
+
+    Raises:
+    ValueError: Se as duas últimas dimensões não forem (3, 3).
+    """
+    M_abc = np.asarray(M_abc)
+    _verificar_forma_3x3(M_abc)
+    return MATRIZ_ANALISE @ M_abc @ MATRIZ_SINTESE
+
+def sequencia_para_fase(M_012):
+    """
+    Transformação inversa de `fase_para_sequencia`: M_abc = A @ M_012 @ A^-1.
+
+    Parâmetros:
+    M_012 (array_like): Matriz (3, 3) ou pilha (..., 3, 3) de sequência.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) complexa (..., 3, 3) de fase.
+    """
+    M_012 = np.asarray(M_012)
+    _verificar_forma_3x3(M_012)
+    return MATRIZ_SINTESE @ M_012 @ MATRIZ_ANALISE
+
+def impedancia_sequencia(Z):
+    """
+    Matriz de impedâncias de sequência Z012 a partir da matriz primitiva de fase.
+
+    Com mais de três condutores, os excedentes (para-raios aterrados) são eliminados por
+    redução de Kron antes da transformação de Fortescue. A operação é vetorizada sobre uma
+    pilha de matrizes (frequências, seções ou casos de um lote).
+
+    Parâmetros:
+    Z (array_like): Matriz (N, N) ou pilha (..., N, N) de impedâncias, com as três fases primeiro.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) complexa (..., 3, 3) de impedâncias de sequência.
+
+    Raises:
+    ValueError: Se houver menos de três condutores ou se a submatriz dos para-raios for
+                singular ou mal condicionada.
+    """
+    Z = _matriz_das_fases(Z, reducao_kron)
+    return fase_para_sequencia(Z)
+
+def capacitancia_sequencia(P):
+    """
+    Matriz de capacitâncias de sequência C012 a partir da matriz de potenciais de Maxwell.
+
+    A matriz de capacitâncias de fase é o bloco das fases de P^-1 (ver `capacitancia_kron`),
+    que já elimina os para-raios aterrados quando N > 3.
+
+    Parâmetros:
+    P (array_like): Matriz (N, N) ou pilha (..., N, N) de potenciais (m/F), com as três fases primeiro.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) complexa (..., 3, 3) de capacitâncias de sequência (F/m).
+
+    Raises:
+    ValueError: Se houver menos de três condutores ou se o bloco dos para-raios for
+                singular ou mal condicionado.
+    """
+    C = _matriz_das_fases(P, capacitancia_kron)
+    return fase_para_sequencia(C)
+
+def _matriz_das_fases(M, reduzir):
+    M = np.asarray(M)
+    if M.ndim < 2 or M.shape[-1] != M.shape[-2] or M.shape[-1] < 3:
+        raise ValueError("ERRO! A matriz de fase deve ser quadrada, com pelo menos três condutores (as fases).")
+    return reduzir(M, 3)
+
+def _verificar_forma_3x3(M):
+    if M.shape[-2:] != (3, 3):
+        raise ValueError("ERRO! A transformação de componentes simétricas exige matrizes 3x3.")
+
+class TestComponentesSimetricas(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        A = rng.normal(size=(6, 5, 5))
+        self.P = A @ np.swapaxes(A, -1, -2) + 5 * np.eye(5)
+        self.Z = self.P + 1j * self.P[::-1]
+
+    def test_matrizes_inversas(self):
+        """As matrizes de análise e síntese são inversas uma da outra."""
+        np.testing.assert_allclose(MATRIZ_ANALISE @ MATRIZ_SINTESE, np.eye(3), atol=1e-15)
+
+    def test_ida_e_volta(self):
+        """Fase -> sequência -> fase reproduz a pilha original."""
+        Z = self.Z[:, :3, :3]
+        np.testing.assert_allclose(sequencia_para_fase(fase_para_sequencia(Z)), Z, atol=1e-12)
+
+    def test_linha_equilibrada_diagonal(self):
+        """Matriz de fase simétrica equilibrada: Z0 = Zp + 2Zm e Z1 = Z2 = Zp - Zm, sem acoplamentos."""
+        Zp, Zm = 0.3 + 1.2j, 0.1 + 0.5j
+        Z = np.full((3, 3), Zm) + np.eye(3) * (Zp - Zm)
+        np.testing.assert_allclose(fase_para_sequencia(Z), np.diag([Zp + 2 * Zm, Zp - Zm, Zp - Zm]), atol=1e-14)
+
+    def test_com_para_raios(self):
+        """Com N > 3, a redução de Kron é aplicada antes da transformação, matriz a matriz."""
+        Z012 = impedancia_sequencia(self.Z)
+        C012 = capacitancia_sequencia(self.P)
+        self.assertEqual(Z012.shape, (6, 3, 3))
+        for k in range(6):
+            np.testing.assert_allclose(Z012[k], fase_para_sequencia(reducao_kron(self.Z[k], 3)), rtol=1e-12)
+            C = np.linalg.inv(self.P[k])[:3, :3]
+            np.testing.assert_allclose(C012[k], MATRIZ_ANALISE @ C @ MATRIZ_SINTESE, rtol=1e-10, atol=1e-14)
+
+    def test_formas_invalidas(self):
+        """Matrizes com menos de três condutores ou fora de 3x3 devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "pelo menos três condutores"):
+            impedancia_sequencia(np.eye(2))
+        with self.assertRaisesRegex(ValueError, "exige matrizes 3x3"):
+            fase_para_sequencia(np.eye(4))
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -2,6 +2,8 @@ import numpy as np # Importa a biblioteca NumPy para operações com arrays e ma
 import math # Importa o módulo math para funções matemáticas como conversão de graus para radianos.
 import cmath # Importa o módulo cmath para operações com números complexos (fasores).
 
+from longitudinais.componentes_simetricas import MATRIZ_ANALISE # Matriz de Fortescue pré-calculada
+
 import unittest
 
 def comp_sim_analise(Za_modulo, Za_angulo, Zb_modulo, Zb_angulo, Zc_modulo, Zc_angulo):
@@ -44,32 +46,74 @@ def comp_sim_analise(Za_modulo, Za_angulo, Zb_modulo, Zb_angulo, Zc_modulo, Zc_a
     # print("\nMatriz das tensões de fase [Va; Vb; Vc]:")
     # print(Vabc)
 
-    # 3. Cálculo do operador complexo 'a' (fasor de magnitude 1 e ângulo de 120 graus).
-    # O operador 'a' é fundamental nas transformações de componentes simétricas.
-    magnitude = 1
-    angulo_graus = 120
-    angulo_rad = math.radians(angulo_graus)
-    a = cmath.rect(magnitude, angulo_rad)
-    # print(f"\nOperador 'a': {a:.4f}")
-
-    # 4. Criação da matriz de transformação 'A' para a ANÁLISE de componentes simétricas.
-    # Esta matriz é a inversa da matriz de síntese (sem o fator 1/3) e permite a conversão
-    # das tensões de fase para as componentes de sequência.
-    A = np.array([[1, 1, 1],
-                  [1, a, a**2],
-                  [1, a**2, a]])
-    # print("\nMatriz de Transformação para Análise (A):")
-    # print(A)
-
-    # 5. Realização da multiplicação matricial para obter as componentes de sequência.
-    # A fórmula para a análise é: [V0; V1; V2] = (1/3) * A @ [Va; Vb; Vc].
-    Z012 = (1/3) * A @ Zabc
+    # 3. Realização da multiplicação matricial para obter as componentes de sequência.
+    # A fórmula para a análise é: [V0; V1; V2] = (1/3) * A @ [Va; Vb; Vc], com a matriz de
+    # análise (já multiplicada por 1/3) pré-calculada no módulo componentes_simetricas.
+    Z012 = MATRIZ_ANALISE @ Zabc
     # print("\nComponentes de Sequência Resultantes [V0; V1; V2]:")
     # print(V012)
 
     # Retorna o array NumPy contendo as componentes de sequência calculadas.
     return Z012
 
+def comp_sim_analise_vetorizada(Vabc, angulos=None, saida=None):
+    """
+    Análise de componentes simétricas de T conjuntos de fasores de uma só vez.
+
+    Em vez de converter e transformar um conjunto de fasores por chamada, como em
+    `comp_sim_analise`, as T linhas são transformadas com uma única multiplicação matricial
+    [V0, V1, V2] = [Va, Vb, Vc] @ (A^-1)^T, adequada a registros de PMU (fasores por quadro).
+
+    Parâmetros:
+    Vabc (array_like): Array (T, 3) de fasores complexos [Va, Vb, Vc] por linha ou, se
+                       `angulos` for fornecido, os módulos correspondentes (reais).
+    angulos (array_like, opcional): Array (T, 3) com os ângulos em graus (entrada polar).
+    saida (numpy.ndarray, opcional): Array complexo (T, 3) onde o resultado é escrito,
+                                     evitando alocação a cada bloco.
+
+    Retorna:
+    numpy.ndarray: Array complexo (T, 3) com as componentes de sequência [V0, V1, V2] de cada linha.
+
+    Raises:
+    ValueError: Se as entradas não tiverem a forma (T, 3).
+    """
+    Vabc = np.asarray(Vabc)
+    if angulos is not None:
+        angulos = np.asarray(angulos, dtype=float)
+        if angulos.shape != Vabc.shape:
+            raise ValueError("ERRO! Os arrays de módulos e ângulos devem ter a mesma forma (T, 3).")
+        angulos_rad = np.radians(angulos)
+        Vabc = Vabc * (np.cos(angulos_rad) + 1j * np.sin(angulos_rad))
+    if Vabc.ndim != 2 or Vabc.shape[1] != 3:
+        raise ValueError("ERRO! Os fasores de fase devem formar um array de forma (T, 3).")
+    return np.matmul(Vabc, _ANALISE_T, out=saida)
+
+def comp_sim_analise_fluxo(blocos, polar=False):
+    """
+    Análise de componentes simétricas sobre um fluxo de blocos de fasores.
+
+    Consome um iterável de blocos (por exemplo, leituras sucessivas de um arquivo ou de uma
+    fila de PMUs) e produz, para cada bloco, as componentes de sequência com uma única
+    multiplicação matricial, sem carregar o registro inteiro na memória.
+
+    Parâmetros:
+    blocos (iterável): Blocos (T, 3) de fasores complexos ou, com polar=True, pares
+                       (modulos, angulos) de arrays (T, 3), com os ângulos em graus.
+    polar (bool, opcional): Indica se os blocos estão na forma polar. Padrão: False.
+
+    Retorna:
+    gerador: Arrays complexos (T, 3) com as componentes [V0, V1, V2], um por bloco de entrada.
+    """
+    for bloco in blocos:
+        if polar:
+            modulos, angulos = bloco
+            yield comp_sim_analise_vetorizada(modulos, angulos)
+        else:
+            yield comp_sim_analise_vetorizada(bloco)
+
+# Transposta contígua da matriz de análise, para transformar fasores dispostos em linhas.
+_ANALISE_T = np.ascontiguousarray(MATRIZ_ANALISE.T)
+
 class TestCompSimAnalise(unittest.TestCase):
     
     # O método setUp é executado antes de cada teste.
@@ -214,6 +258,38 @@ class TestCompSimAnalise(unittest.TestCase):
         self.assertComplexAlmostEqual(resultado_V012[1, 0], V1_esperado, self.tolerance)
         self.assertComplexAlmostEqual(resultado_V012[2, 0], V2_esperado, self.tolerance)
 
+class TestCompSimAnaliseVetorizada(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.modulos = rng.uniform(50.0, 150.0, size=(200, 3))
+        self.angulos = rng.uniform(-180.0, 180.0, size=(200, 3))
+
+    def test_confere_com_analise_escalar(self):
+        """Cada linha deve coincidir com comp_sim_analise aplicada aos mesmos fasores."""
+        V012 = comp_sim_analise_vetorizada(self.modulos, self.angulos)
+        self.assertEqual(V012.shape, (200, 3))
+        for t in (0, 57, 199):
+            argumentos = [v for par in zip(self.modulos[t], self.angulos[t]) for v in par]
+            np.testing.assert_allclose(V012[t], comp_sim_analise(*argumentos)[:, 0], rtol=1e-12, atol=1e-12)
+
+    def test_fluxo_de_blocos(self):
+        """Os blocos do fluxo, concatenados, reproduzem a análise do registro inteiro."""
+        Vabc = self.modulos * np.exp(1j * np.radians(self.angulos))
+        esperado = comp_sim_analise_vetorizada(Vabc)
+        blocos = (Vabc[i:i + 64] for i in range(0, 200, 64))
+        np.testing.assert_allclose(np.concatenate(list(comp_sim_analise_fluxo(blocos))), esperado, rtol=1e-12)
+        blocos_polares = ((self.modulos[i:i + 64], self.angulos[i:i + 64]) for i in range(0, 200, 64))
+        resultado = np.concatenate(list(comp_sim_analise_fluxo(blocos_polares, polar=True)))
+        np.testing.assert_allclose(resultado, esperado, rtol=1e-12)
+
+    def test_forma_invalida(self):
+        """Entradas que não têm a forma (T, 3) devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, r"array de forma \(T, 3\)"):
+            comp_sim_analise_vetorizada(np.ones((10, 2)))
+        with self.assertRaisesRegex(ValueError, "mesma forma"):
+            comp_sim_analise_vetorizada(np.ones((10, 3)), np.ones((9, 3)))
+
 # Este bloco garante que os testes sejam executados quando o script é chamado diretamente.
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
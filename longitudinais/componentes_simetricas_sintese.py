@@ -2,6 +2,8 @@ import numpy as np
 import math
 import cmath
 
+from longitudinais.componentes_simetricas import MATRIZ_SINTESE # Matriz de Fortescue pré-calculada
+
 import unittest
 
 def comp_sim_sintese(Zan0_modulo, Zan0_angulo, Zan1_modulo, Zan1_angulo, Zan2_modulo, Zan2_angulo):
@@ -42,22 +44,9 @@ def comp_sim_sintese(Zan0_modulo, Zan0_angulo, Zan1_modulo, Zan1_angulo, Zan2_mo
     # print("\nMatriz Van (Componentes de Sequência):")
     # print(Van)
 
-    # Calculando o operador 'a' (1 ângulo 120 graus)
-    magnitude_a = 1
-    angulo_graus_a = 120
-    angulo_rad_a = math.radians(angulo_graus_a)
-    a = cmath.rect(magnitude_a, angulo_rad_a)
-    # print(f"\nOperador 'a': {a:.4f}")
-
-    # Criando a matriz de transformação A (matriz de síntese)
-    A = np.array([[1, 1, 1],
-                  [1, a**2, a],
-                  [1, a, a**2]])
-    # print("\nMatriz de Transformação A:")
-    # print(A)
-
-    # Realizando a multiplicação matricial para obter as tensões de fase
-    Zabc = A @ Zan
+    # Realizando a multiplicação matricial para obter as tensões de fase,
+    # com a matriz de síntese A pré-calculada no módulo componentes_simetricas.
+    Zabc = MATRIZ_SINTESE @ Zan
     # print("\nMatriz Vabc (Tensões de Fase):")
     # print(Vabc)
 
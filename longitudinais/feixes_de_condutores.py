@@ -2,26 +2,148 @@ import math
 import numpy as np
 import unittest
 
-def calcular_rmg_feixe(n, d, R=None, Rmg_val=None):
+def raio_circunscrito(n, d):
+    """
+    Raio do círculo que passa pelos centros de n subcondutores em polígono regular de lado d.
+
+    Parâmetros:
+    n (int ou array_like): Número de subcondutores (n >= 1).
+    d (float ou array_like): Distância entre subcondutores adjacentes (em metros).
+
+    Retorna:
+    numpy.ndarray ou float: Raio A = d / (2 sen(pi/n)) (em metros), nulo para n = 1.
+    """
+    n = np.asarray(n)
+    d = np.asarray(d, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        A = np.where(n > 1, d / (2 * np.sin(np.pi / np.maximum(n, 1))), 0.0)
+    return A[()] if A.ndim == 0 else A
+
+def rmg_feixes(n, d, raio_subcondutor):
+    """
+    RMG (ou raio equivalente) de feixes em polígono regular, vetorizado sobre vários feixes.
+
+    Para n subcondutores igualmente espaçados em um círculo de raio A, o produto das distâncias
+    de um subcondutor aos demais é n * A^(n-1), e o RMG do feixe é (n * r * A^(n-1))^(1/n).
+    Com r igual ao RMG do subcondutor obtém-se o RMG usado nas impedâncias; com r igual ao
+    raio físico, o raio equivalente usado nas capacitâncias.
+
+    Parâmetros:
+    n (int ou array_like): Número de subcondutores de cada feixe (n >= 1).
+    d (float ou array_like): Distância entre subcondutores adjacentes (em metros).
+    raio_subcondutor (float ou array_like): RMG ou raio físico do subcondutor (em metros).
+    Os três argumentos são combinados por broadcasting.
+
+    Retorna:
+    numpy.ndarray ou float: RMG (ou raio equivalente) de cada feixe (em metros).
+
+    Raises:
+    ValueError: Se algum n não for inteiro maior ou igual a 1, ou se d ou o raio não forem positivos.
+    """
+    n_arr = np.asarray(n)
+    d_arr = np.asarray(d, dtype=float)
+    r_arr = np.asarray(raio_subcondutor, dtype=float)
+    if np.any(n_arr < 1) or np.any(n_arr != np.round(n_arr)):
+        raise ValueError("ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1.")
+    if np.any(r_arr <= 0):
+        raise ValueError("ERRO! O RMG do subcondutor deve ser um valor positivo.")
+    if np.any((d_arr <= 0) & (n_arr > 1)):
+        raise ValueError("ERRO! A distância entre os subcondutores 'd' deve ser maior que zero.")
+
+    A = np.asarray(raio_circunscrito(n_arr, d_arr))
+    # Em log para evitar estouro com feixes grandes: ln(RMG) = (ln(n r) + (n-1) ln A) / n.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_A = np.where(n_arr > 1, np.log(np.where(A > 0, A, 1.0)), 0.0)
+    rmg = np.exp((np.log(n_arr * r_arr) + (n_arr - 1) * log_A) / n_arr)
+    return rmg[()] if rmg.ndim == 0 else rmg
+
+def rmg_feixe_coordenadas(coordenadas, raio_subcondutor):
+    """
+    RMG (ou raio equivalente) de feixes com subcondutores em posições arbitrárias.
+
+    O RMG é a média geométrica das n^2 distâncias entre subcondutores, com o RMG (ou raio) do
+    próprio subcondutor no lugar das distâncias de cada um a si mesmo.
+
+    Parâmetros:
+    coordenadas (array_like): Posições (..., n, 2) dos subcondutores de cada feixe (em metros).
+    raio_subcondutor (float ou array_like): RMG ou raio físico do subcondutor (em metros),
+                                            escalar ou com a forma dos eixos iniciais (...).
+
+    Retorna:
+    numpy.ndarray ou float: RMG (ou raio equivalente) de cada feixe (em metros).
+
+    Raises:
+    ValueError: Se as coordenadas não tiverem forma (..., n, 2), se houver subcondutores
+                coincidentes ou se o raio não for positivo.
+    """
+    coordenadas = np.asarray(coordenadas, dtype=float)
+    r = np.asarray(raio_subcondutor, dtype=float)
+    if coordenadas.ndim < 2 or coordenadas.shape[-1] != 2:
+        raise ValueError("ERRO! As coordenadas dos subcondutores devem ter forma (..., n, 2).")
+    if np.any(r <= 0):
+        raise ValueError("ERRO! O RMG do subcondutor deve ser um valor positivo.")
+
+    n = coordenadas.shape[-2]
+    diferencas = coordenadas[..., :, np.newaxis, :] - coordenadas[..., np.newaxis, :, :]
+    distancias = np.hypot(diferencas[..., 0], diferencas[..., 1])
+    fora_diagonal = ~np.eye(n, dtype=bool)
+    if np.any(distancias[..., fora_diagonal] <= 0):
+        raise ValueError("ERRO! Os subcondutores de um feixe não podem ocupar a mesma posição.")
+
+    soma_log = np.log(distancias[..., fora_diagonal]).sum(axis=-1) + n * np.log(r)
+    rmg = np.exp(soma_log / n**2)
+    return rmg[()] if rmg.ndim == 0 else rmg
+
+def posicoes_subcondutores(n, d, x=0.0, h=0.0, angulo=None):
+    """
+    Expande feixes em polígono regular nas posições explícitas de seus subcondutores.
+
+    Parâmetros:
+    n (int): Número de subcondutores por feixe (o mesmo para todos os feixes).
+    d (float ou array_like): Distância entre subcondutores adjacentes (em metros), por feixe.
+    x, h (float ou array_like): Coordenadas horizontal e vertical do centro de cada feixe (em metros).
+    angulo (float, opcional): Rotação do polígono (em radianos). Padrão: lados horizontais
+                              (subcondutores lado a lado para n = 2, quadrado alinhado para n = 4).
+
+    Retorna:
+    numpy.ndarray: Posições (..., n, 2) dos subcondutores, com (...) a forma comum de d, x e h.
+    """
+    if n < 1 or int(n) != n:
+        raise ValueError("ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1.")
+    n = int(n)
+    d, x, h = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (d, x, h)))
+    if angulo is None:
+        angulo = np.pi / n - np.pi / 2 if n > 1 else 0.0
+    A = np.asarray(raio_circunscrito(n, d), dtype=float)
+    theta = angulo + 2 * np.pi * np.arange(n) / n
+    px = x[..., np.newaxis] + A[..., np.newaxis] * np.cos(theta)
+    py = h[..., np.newaxis] + A[..., np.newaxis] * np.sin(theta)
+    return np.stack([px, py], axis=-1)
+
+def calcular_rmg_feixe(n, d, R=None, Rmg_val=None, coordenadas=None):
     """
     Calcula o Raio Médio Geométrico (RMG) equivalente de um feixe de condutores.
 
-    A função suporta feixes com 2, 3 ou 4 subcondutores em arranjos comuns.
+    A função suporta feixes com qualquer número de subcondutores em polígono regular
+    (n = 1 retorna o RMG do próprio subcondutor) ou em posições arbitrárias ('coordenadas').
 
     Parâmetros:
-    n (int): Número de subcondutores no feixe (2, 3 ou 4).
+    n (int): Número de subcondutores no feixe (n >= 1).
     d (float): Distância entre subcondutores adjacentes no feixe (em metros).
+               Ignorada se 'coordenadas' for fornecido.
     R (float, opcional): Raio físico do subcondutor individual (em metros).
                          Usado para calcular o RMG do subcondutor se 'Rmg_val' não for fornecido.
     Rmg_val (float, opcional): Raio Médio Geométrico (RMG) do subcondutor individual (em metros).
                                Tem prioridade sobre o cálculo a partir de 'R'.
+    coordenadas (array_like, opcional): Posições (n, 2) dos subcondutores (em metros), para
+                                        feixes assimétricos.
 
     Retorna:
     float: O Raio Médio Geométrico (RMG) equivalente do feixe (em metros).
 
     Levanta:
     ValueError: Se 'R' ou 'Rmg_val' não forem fornecidos, forem negativos,
-                se 'd' for negativo ou zero, ou se 'n' não for 2, 3 ou 4.
+                se 'd' for negativo ou zero, ou se 'n' não for um inteiro maior ou igual a 1.
     """
     
     # --- Cálculo do Raio Médio Geométrico (RMG) do subcondutor individual ---
@@ -36,25 +158,17 @@ def calcular_rmg_feixe(n, d, R=None, Rmg_val=None):
         raise ValueError("ERRO! É necessário fornecer o raio físico (R) OU o RMG do subcondutor (Rmg_val).")
     if rmg_subcondutor <= 0:
         raise ValueError("ERRO! O RMG do subcondutor deve ser um valor positivo.")
+
+    if coordenadas is not None:
+        return float(rmg_feixe_coordenadas(coordenadas, rmg_subcondutor))
+
     if d <= 0:
         raise ValueError("ERRO! A distância entre os subcondutores 'd' deve ser maior que zero.")
+    if n < 1 or int(n) != n:
+        raise ValueError("ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1.")
 
-    # --- Cálculo do RMG do Feixe baseando-se no número de subcondutores (n) ---
-    Rmg_feixe = 0.0 # Inicializa Rmg_feixe para garantir que seja sempre definida
-
-    if n == 2:
-        # Feixe de 2 subcondutores: RMG_feixe = sqrt(r' * d)
-        Rmg_feixe = (rmg_subcondutor * d)**(1/2)
-    elif n == 3:
-        # Feixe de 3 subcondutores (triângulo equilátero): RMG_feixe = (r' * d^2)^(1/3)
-        Rmg_feixe = (rmg_subcondutor * (d**2))**(1/3)
-    elif n == 4:
-        # Feixe de 4 subcondutores (quadrado): RMG_feixe = (r' * d^3 * sqrt(2))^(1/4)
-        Rmg_feixe = (rmg_subcondutor * (d**3) * math.sqrt(2))**(1/4)
-    else:
-        raise ValueError("ERRO! O número de subcondutores 'n' suportado é 2, 3 ou 4 para este cálculo.")
-    
-    return Rmg_feixe
+    # --- RMG do feixe em polígono regular: (n * r' * A^(n-1))^(1/n), A = raio circunscrito ---
+    return float(rmg_feixes(n, d, rmg_subcondutor))
 
 class TestCalcularRMGFeixe(unittest.TestCase):
 
@@ -163,16 +277,53 @@ class TestCalcularRMGFeixe(unittest.TestCase):
             calcular_rmg_feixe(n=2, d=-0.45, R=0.01)
 
     def test_n_unsupported(self):
-        # Deve levantar ValueError se 'n' não for 2, 3 ou 4
-        with self.assertRaisesRegex(ValueError, "ERRO! O número de subcondutores 'n' suportado é 2, 3 ou 4 para este cálculo."):
-            calcular_rmg_feixe(n=1, d=0.5, R=0.01)
-
-        with self.assertRaisesRegex(ValueError, "ERRO! O número de subcondutores 'n' suportado é 2, 3 ou 4 para este cálculo."):
-            calcular_rmg_feixe(n=5, d=0.5, R=0.01)
-            
-        with self.assertRaisesRegex(ValueError, "ERRO! O número de subcondutores 'n' suportado é 2, 3 ou 4 para este cálculo."):
+        # Deve levantar ValueError se 'n' não for um inteiro maior ou igual a 1
+        with self.assertRaisesRegex(ValueError, "ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1."):
             calcular_rmg_feixe(n=0, d=0.5, R=0.01)
 
+        with self.assertRaisesRegex(ValueError, "ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1."):
+            calcular_rmg_feixe(n=2.5, d=0.5, R=0.01)
+
+        with self.assertRaisesRegex(ValueError, "ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1."):
+            rmg_feixes([2, -1], 0.5, 0.01)
+
+    # --- Feixes gerais (n qualquer, posições arbitrárias, vetorização) ---
+
+    def test_n_equals_1(self):
+        # Um único condutor: o RMG do feixe é o do próprio subcondutor
+        self.assertAlmostEqual(calcular_rmg_feixe(n=1, d=0.5, Rmg_val=0.012), 0.012, delta=self.tolerance)
+
+    def test_n_6_e_8_igual_coordenadas(self):
+        # Para n = 6 e n = 8, a fórmula do polígono coincide com a média geométrica das distâncias
+        for n in (6, 8):
+            coords = posicoes_subcondutores(n, 0.457, x=3.0, h=20.0)
+            esperado = calcular_rmg_feixe(n=n, d=0.457, R=0.0159, coordenadas=coords)
+            self.assertAlmostEqual(calcular_rmg_feixe(n=n, d=0.457, R=0.0159), esperado, delta=self.tolerance)
+            # Espaçamento entre subcondutores adjacentes igual a d
+            self.assertAlmostEqual(float(np.linalg.norm(coords[1] - coords[0])), 0.457, delta=self.tolerance)
+
+    def test_hexagono_formula_fechada(self):
+        # Hexágono de lado d: A = d e RMG = (6 r' d^5)^(1/6)
+        r, d = 0.01, 0.4
+        self.assertAlmostEqual(calcular_rmg_feixe(n=6, d=d, Rmg_val=r), (6 * r * d**5)**(1/6), delta=self.tolerance)
+
+    def test_feixe_assimetrico(self):
+        # Feixe duplo com espaçamento d em posições arbitrárias equivale ao caso n = 2
+        coords = [[0.0, 0.0], [0.3, 0.4]]  # distância 0.5
+        self.assertAlmostEqual(calcular_rmg_feixe(n=2, d=1.0, Rmg_val=0.01, coordenadas=coords),
+                               calcular_rmg_feixe(n=2, d=0.5, Rmg_val=0.01), delta=self.tolerance)
+
+    def test_rmg_feixes_vetorizado(self):
+        # Vários feixes de uma vez, conferidos com a função escalar
+        n = np.array([1, 2, 3, 4, 6, 8, 12])
+        d = np.linspace(0.3, 0.6, len(n))
+        calculado = rmg_feixes(n, d, 0.012)
+        esperado = [calcular_rmg_feixe(n=int(k), d=float(dk), Rmg_val=0.012) for k, dk in zip(n, d)]
+        np.testing.assert_allclose(calculado, esperado, rtol=1e-12)
+        # Vetorização das coordenadas: (feixes, n, 2)
+        coords = posicoes_subcondutores(4, d, x=np.arange(len(n)), h=15.0)
+        np.testing.assert_allclose(rmg_feixe_coordenadas(coords, 0.012), rmg_feixes(4, d, 0.012), rtol=1e-12)
+
 # Bloco para rodar os testes quando o script é executado diretamente
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
@@ -0,0 +1,280 @@
+import collections
+import functools
+import threading
+import numpy as np
+import unittest
+
+# Número de casas decimais (em metros) usado para arredondar as coordenadas na chave do cache.
+# 9 casas (nanômetros) absorvem ruído de ponto flutuante sem confundir geometrias distintas.
+CASAS_DECIMAIS_CACHE = 9
+
+# Número máximo de geometrias mantidas no cache LRU.
+TAMANHO_CACHE = 1024
+
+# Permissividade do vácuo (F/m), comum aos cálculos de gradiente superficial, campos e linha segmentada.
+# As funções de capacitância trifásicas (Transversais) mantêm as suas constantes locais.
+PERMISSIVIDADE_VACUO = 8.854187817 * 10**(-12)
+
+class TowerGeometry:
+    """
+    Geometria dos condutores de uma torre, com as matrizes de distâncias calculadas sob demanda
+    e guardadas para reuso.
+
+    Todas as funções longitudinais (impedância) e transversais (capacitância) usam as mesmas
+    distâncias entre condutores (d_ij) e entre condutores e imagens (d_ij'). Um objeto
+    TowerGeometry calcula cada matriz uma única vez, na primeira vez em que é pedida, e a
+    reaproveita em todos os cálculos seguintes da mesma torre. As matrizes são somente leitura,
+    pois podem ser compartilhadas entre vários cálculos pelo cache de `obter_geometria`.
+
+    Coordenadas com eixos iniciais (..., N) descrevem uma pilha de torres com o mesmo número de
+    condutores (por exemplo, vários projetos avaliados de uma vez); as matrizes têm então a forma
+    (..., N, N). O cache de `obter_geometria` e o núcleo de Carson usam apenas uma torre (N,).
+
+    Atributos:
+    x (numpy.ndarray): Coordenadas horizontais (X) dos N condutores (metros), (N,) ou (..., N).
+    h (numpy.ndarray): Alturas (H) dos N condutores acima do solo (metros), com a forma de x.
+    n (int): Número de condutores.
+    """
+
+    def __init__(self, x, h):
+        x = np.atleast_1d(np.array(x, dtype=float))
+        h = np.atleast_1d(np.array(h, dtype=float))
+        if x.shape != h.shape:
+            raise ValueError("ERRO! Os vetores de coordenadas (x) e alturas (h) devem ter o mesmo tamanho.")
+        x.setflags(write=False)
+        h.setflags(write=False)
+        self.x = x
+        self.h = h
+        self.n = x.shape[-1]
+
+    def __repr__(self):
+        return f"TowerGeometry(x={self.x.tolist()}, h={self.h.tolist()})"
+
+    @functools.cached_property
+    def D(self):
+        """Matriz (N, N) de distâncias entre condutores reais d_ij (diagonal nula)."""
+        return _somente_leitura(np.sqrt(self._diff_x**2 + (self.h[..., :, np.newaxis] - self.h[..., np.newaxis, :])**2))
+
+    @functools.cached_property
+    def D_imagem(self):
+        """Matriz (N, N) de distâncias d_ij' entre cada condutor e a imagem do outro (diagonal 2h)."""
+        return _somente_leitura(np.sqrt(self._diff_x**2 + self._soma_h**2))
+
+    @functools.cached_property
+    def log_D(self):
+        """Matriz (N, N) de log(d_ij), com diagonal nula (o termo próprio depende do raio/RMG)."""
+        D = self.D.copy()
+        D[..., self._diag, self._diag] = 1.0
+        with np.errstate(divide='ignore'):
+            return _somente_leitura(np.log(D))
+
+    @functools.cached_property
+    def log_D_imagem(self):
+        """Matriz (N, N) de log(d_ij'), com log(2h) na diagonal."""
+        return _somente_leitura(np.log(self.D_imagem))
+
+    @functools.cached_property
+    def log_razao_imagem(self):
+        """Matriz (N, N) de log(d_ij'/d_ij), com log(2h) na diagonal (parte geométrica de Maxwell)."""
+        return _somente_leitura(self.log_D_imagem - self.log_D)
+
+    @functools.cached_property
+    def angulo_imagem(self):
+        """Matriz (N, N) do ângulo (rad) entre a vertical e a reta do condutor i à imagem de j (diagonal nula)."""
+        return _somente_leitura(np.arctan2(np.abs(self._diff_x), self._soma_h))
+
+    @functools.cached_property
+    def condutores_coincidentes(self):
+        """True se dois condutores distintos ocupam a mesma posição."""
+        D = self.D.copy()
+        D[..., self._diag, self._diag] = np.inf
+        return bool(np.any(D == 0))
+
+    def coeficientes_maxwell(self, raios):
+        """
+        Parte adimensional da matriz de potenciais de Maxwell: log(d_ij'/d_ij) fora da diagonal
+        e log(2h_i/r_i) na diagonal. Multiplicada por 1/(2 pi E) resulta na matriz P (m/F).
+
+        Parâmetros:
+        raios (float ou array_like): Raio (ou raio equivalente) de cada condutor (metros), com
+                                     broadcast para a forma das coordenadas.
+
+        Retorna:
+        numpy.ndarray: Nova matriz (..., N, N) real, que pode ser alterada pelo chamador.
+
+        Raises:
+        ValueError: Se dois condutores coincidirem (potencial mútuo infinito).
+        """
+        if self.condutores_coincidentes:
+            raise ValueError("ERRO! Dois condutores não podem ocupar a mesma posição.")
+        G = np.array(self.log_razao_imagem)
+        G[..., self._diag, self._diag] -= np.log(np.broadcast_to(np.asarray(raios, dtype=float), self.x.shape))
+        return G
+
+    @functools.cached_property
+    def _diff_x(self):
+        return self.x[..., :, np.newaxis] - self.x[..., np.newaxis, :]
+
+    @functools.cached_property
+    def _soma_h(self):
+        return self.h[..., :, np.newaxis] + self.h[..., np.newaxis, :]
+
+    @property
+    def _diag(self):
+        return np.arange(self.n)
+
+def obter_geometria(x, h, casas_decimais=CASAS_DECIMAIS_CACHE):
+    """
+    Retorna o TowerGeometry de uma torre, reaproveitando o objeto (e as matrizes já calculadas)
+    quando a mesma disposição de condutores é avaliada novamente.
+
+    A chave do cache LRU são as coordenadas arredondadas, de modo que cálculos sucessivos de
+    impedância e capacitância da mesma torre (por exemplo, pela interface gráfica ou por um
+    script) não repetem o trabalho de geometria. O objeto guardado é construído com as
+    coordenadas exatas da primeira chamada; chamadas cujas coordenadas diferem apenas abaixo
+    da precisão do arredondamento reutilizam esse mesmo objeto.
+
+    Parâmetros:
+    x (array_like): Coordenadas horizontais (X) dos N condutores (metros).
+    h (array_like): Alturas (H) dos N condutores (metros).
+    casas_decimais (int, opcional): Casas decimais usadas para arredondar as coordenadas na chave.
+
+    Retorna:
+    TowerGeometry: Geometria (possivelmente compartilhada) da torre.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    h = np.atleast_1d(np.asarray(h, dtype=float))
+    if x.ndim != 1 or x.shape != h.shape:
+        raise ValueError("ERRO! Os vetores de coordenadas (x) e alturas (h) devem ter o mesmo tamanho.")
+    chave = (casas_decimais,
+             tuple(np.round(x, casas_decimais).tolist()),
+             tuple(np.round(h, casas_decimais).tolist()))
+
+    with _trava_cache:
+        geometria = _cache_geometrias.get(chave)
+        if geometria is not None:
+            _cache_geometrias.move_to_end(chave)
+            return geometria
+
+    geometria = TowerGeometry(x, h)
+    with _trava_cache:
+        geometria = _cache_geometrias.setdefault(chave, geometria)
+        _cache_geometrias.move_to_end(chave)
+        while len(_cache_geometrias) > TAMANHO_CACHE:
+            _cache_geometrias.popitem(last=False) # Descarta a geometria usada há mais tempo
+    return geometria
+
+def limpar_cache_geometria():
+    """Esvazia o cache de geometrias usado por `obter_geometria`."""
+    with _trava_cache:
+        _cache_geometrias.clear()
+
+_cache_geometrias = collections.OrderedDict()
+_trava_cache = threading.Lock()
+
+def _somente_leitura(M):
+    M.setflags(write=False)
+    return M
+
+class TestTowerGeometry(unittest.TestCase):
+
+    def setUp(self):
+        self.x = [-5.0, 0.0, 5.0, 0.0]
+        self.h = [15.0, 17.0, 15.0, 22.0]
+
+    def test_distancias(self):
+        """Confere as matrizes de distâncias com as fórmulas escalares."""
+        g = TowerGeometry(self.x, self.h)
+        self.assertAlmostEqual(g.D[0, 1], np.hypot(-5.0 - 0.0, 15.0 - 17.0), places=12)
+        self.assertAlmostEqual(g.D_imagem[0, 3], np.hypot(-5.0 - 0.0, 15.0 + 22.0), places=12)
+        np.testing.assert_allclose(np.diag(g.D_imagem), 2 * np.array(self.h))
+        np.testing.assert_allclose(np.diag(g.log_D), 0.0)
+        np.testing.assert_allclose(g.log_razao_imagem[1, 2], np.log(g.D_imagem[1, 2] / g.D[1, 2]), rtol=1e-14)
+
+    def test_coeficientes_maxwell(self):
+        """A diagonal deve ser log(2h/r) e a matriz devolvida deve ser uma cópia alterável."""
+        g = TowerGeometry(self.x, self.h)
+        G = g.coeficientes_maxwell([0.01, 0.02, 0.01, 0.005])
+        self.assertAlmostEqual(G[3, 3], np.log(2 * 22.0 / 0.005), places=12)
+        G[0, 0] = 0.0
+        self.assertNotEqual(g.coeficientes_maxwell(0.01)[0, 0], 0.0)
+
+    def test_pilha_de_torres(self):
+        """Coordenadas (..., N) dão as matrizes de cada torre empilhadas."""
+        alturas = np.array(self.h) + np.array([[0.0], [3.0], [6.0]])
+        g = TowerGeometry(np.broadcast_to(self.x, alturas.shape), alturas)
+        G = g.coeficientes_maxwell(0.01)
+        self.assertEqual(G.shape, (3, 4, 4))
+        for k in range(3):
+            np.testing.assert_allclose(G[k], TowerGeometry(self.x, alturas[k]).coeficientes_maxwell(0.01), rtol=1e-14)
+        with self.assertRaisesRegex(ValueError, "mesma posição"):
+            TowerGeometry([[0.0, 1.0], [0.0, 0.0]], [[10.0, 10.0], [10.0, 10.0]]).coeficientes_maxwell(0.01)
+
+    def test_matrizes_somente_leitura(self):
+        """As matrizes em cache não podem ser alteradas acidentalmente."""
+        g = TowerGeometry(self.x, self.h)
+        with self.assertRaises(ValueError):
+            g.D[0, 1] = 0.0
+
+    def test_cache_reutiliza_geometria(self):
+        """Coordenadas iguais (a menos de ruído de arredondamento) devem reutilizar o mesmo objeto."""
+        g1 = obter_geometria(self.x, self.h)
+        g2 = obter_geometria(np.array(self.x) + 1e-13, self.h)
+        self.assertIs(g1, g2)
+        self.assertIsNot(g1, obter_geometria(self.x, [15.0, 17.0, 15.0, 23.0]))
+        np.testing.assert_array_equal(g1.x, self.x) # Guarda as coordenadas exatas da primeira chamada
+        limpar_cache_geometria()
+        self.assertIsNot(obter_geometria(self.x, self.h), g1)
+
+    def test_condutores_coincidentes(self):
+        """Detecta dois condutores na mesma posição."""
+        self.assertFalse(TowerGeometry(self.x, self.h).condutores_coincidentes)
+        self.assertTrue(TowerGeometry([0.0, 0.0], [10.0, 10.0]).condutores_coincidentes)
+        with self.assertRaisesRegex(ValueError, "mesma posição"):
+            TowerGeometry([0.0, 0.0], [10.0, 10.0]).coeficientes_maxwell(0.01)
+
+    def test_funcoes_trifasicas_aceitam_geometria(self):
+        """Passar a geometria pronta dá o mesmo resultado que passar as coordenadas."""
+        from longitudinais.Carson_correcao import Metodo_Carson_long
+        from Transversais.imagem import metodo_imagem_tran
+        x, h = self.x[:3], self.h[:3]
+        g = obter_geometria(x, h)
+        np.testing.assert_allclose(
+            Metodo_Carson_long(1e-4, 1e-4, 1e-4, None, None, None, None, None, None, 100.0, R=0.015, geometria=g),
+            Metodo_Carson_long(1e-4, 1e-4, 1e-4, *x, *h, 100.0, R=0.015), rtol=1e-14)
+        np.testing.assert_allclose(metodo_imagem_tran(None, None, None, None, None, None, 0.012, geometria=g),
+                                   metodo_imagem_tran(*x, *h, 0.012), rtol=1e-14)
+        with self.assertRaisesRegex(ValueError, "mesma posição"):
+            metodo_imagem_tran(0.0, 0.0, 5.0, 12.0, 12.0, 12.0, 0.012)
+
+    def test_demais_funcoes_trifasicas_aceitam_geometria(self):
+        """Imagem, sequência, transposição e feixes também aceitam a geometria pronta."""
+        from longitudinais.imagem import metodo_imagem_long
+        from Transversais.capacitancia_de_sequencia import metodo_capacitancia_sequencia_tran
+        from Transversais.transposicao import metodo_transposicao_tran
+        from Transversais.feixe_condutor import metodo_feixe_condutor_tran
+        x, h = self.x[:3], self.h[:3]
+        xh = [v for par in zip(x, h) for v in par]
+        g = obter_geometria(x, h)
+        nenhum = [None] * 6
+        np.testing.assert_allclose(
+            metodo_imagem_long(0.1, 0.1, 0.1, *nenhum, 1000.0, R=0.015, geometria=g),
+            metodo_imagem_long(0.1, 0.1, 0.1, *xh, 1000.0, R=0.015), rtol=1e-14)
+        np.testing.assert_allclose(
+            metodo_capacitancia_sequencia_tran(0.015, 0.015, 0.015, *nenhum, 100.0, geometria=g),
+            metodo_capacitancia_sequencia_tran(0.015, 0.015, 0.015, *x, *h, 100.0), rtol=1e-14)
+        np.testing.assert_allclose(
+            metodo_transposicao_tran(0.015, 0.015, 0.015, *nenhum, 100.0, 1e3, 1e3, 1e3, geometria=g),
+            metodo_transposicao_tran(0.015, 0.015, 0.015, *xh, 100.0, 1e3, 1e3, 1e3), rtol=1e-14)
+        for explicitos in (False, True):
+            np.testing.assert_allclose(
+                metodo_feixe_condutor_tran(0.012, 0.012, 0.012, 2, 2, 2, 0.4, 0.4, 0.4, *nenhum, 100.0, 1e3,
+                                           subcondutores_explicitos=explicitos, geometria=g),
+                metodo_feixe_condutor_tran(0.012, 0.012, 0.012, 2, 2, 2, 0.4, 0.4, 0.4, *xh, 100.0, 1e3,
+                                           subcondutores_explicitos=explicitos), rtol=1e-14)
+        with self.assertRaisesRegex(ValueError, "alturas"):
+            metodo_imagem_long(0.1, 0.1, 0.1, *nenhum, 1000.0, R=0.015,
+                               geometria=obter_geometria(x, [h[0], -1.0, h[2]]))
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -2,7 +2,9 @@ import numpy as np  # Operações numéricas e matriciais
 import math         # Funções matemáticas (pi, log, exp)
 import unittest
 
-def metodo_imagem_long(ra, rb, rc, xa, ha, xb, hb, xc, hc, l, R=None, Rmg_val=None):
+from longitudinais.geometria import obter_geometria # Cache de distâncias da torre
+
+def metodo_imagem_long(ra, rb, rc, xa, ha, xb, hb, xc, hc, l, R=None, Rmg_val=None, geometria=None):
     """
     Calcula a matriz de impedância série por unidade de comprimento de uma linha de transmissão trifásica,
     usando o Método das Imagens para efeito do solo.
@@ -14,6 +16,8 @@ def metodo_imagem_long(ra, rb, rc, xa, ha, xb, hb, xc, hc, l, R=None, Rmg_val=No
     l (float): Comprimento total da linha (metros).
     R (float, opcional): Raio físico do condutor (metros).
     Rmg_val (float, opcional): Raio Médio Geométrico (RMG) do condutor (metros).
+    geometria (TowerGeometry, opcional): Geometria já calculada dos condutores. Se fornecida,
+                                         as coordenadas e alturas são ignoradas (podem ser None).
 
     Retorna:
     numpy.ndarray: Matriz de impedância série 3x3 complexa para o comprimento total da linha (Ohms).
@@ -41,45 +45,91 @@ def metodo_imagem_long(ra, rb, rc, xa, ha, xb, hb, xc, hc, l, R=None, Rmg_val=No
             raise ValueError("ERRO! O Raio (R) ou o Raio Médio Geométrico (Rmg_val) deve ser positivo.")
     
     # --- Validação das Alturas ---
-    if ha <= 0 or hb <= 0 or hc <= 0:
+    if np.any(np.asarray([ha, hb, hc] if geometria is None else geometria.h) <= 0):
         raise ValueError("ERRO! As alturas dos condutores (ha, hb, hc) devem ser maiores que zero.")
 
-    # --- Cálculo das Distâncias Geométricas ---
-    # Distâncias entre condutores reais (d_ij)
-    dab = np.sqrt(((xa - xb)**2) + ((ha - hb)**2))
-    dac = np.sqrt(((xa - xc)**2) + ((ha - hc)**2))
-    dbc = np.sqrt(((xb - xc)**2) + ((hb - hc)**2))
-    
-    # Distâncias entre condutores e suas imagens (d_i,j')
-    dab_l = np.sqrt(((xa - xb)**2) + ((ha + hb)**2))
-    dac_l = np.sqrt(((xa - xc)**2) + ((ha + hc)**2))
-    dbc_l = np.sqrt(((xb - xc)**2) + ((hb + hc)**2))
-    
+    # --- Geometria dos Condutores (distâncias d_ij e d_ij', reaproveitadas do cache) ---
+    if geometria is None:
+        geometria = obter_geometria([xa, xb, xc], [ha, hb, hc])
+
     # --- Cálculo das Impedâncias Série por unidade de comprimento ---
-    # Impedâncias Próprias (diagonal: Zaa, Zbb, Zcc)
-    Zaa = ra + (((1j * mi_0 * w) / (2 * math.pi)) * math.log((2 * ha) / Rmg))
-    Zbb = rb + (((1j * mi_0 * w) / (2 * math.pi)) * math.log((2 * hb) / Rmg))
-    Zcc = rc + (((1j * mi_0 * w) / (2 * math.pi)) * math.log((2 * hc) / Rmg))
-    
-    # Impedâncias Mútuas (fora da diagonal: Zab, Zac, Zbc e suas simetrias)
-    Zab = ((1j * w * mi_0) / (2 * math.pi)) * (math.log(dab_l / dab))
-    Zac = ((1j * w * mi_0) / (2 * math.pi)) * (math.log(dac_l / dac))
-    Zbc = ((1j * w * mi_0) / (2 * math.pi)) * (math.log(dbc_l / dbc))
-    
-    # Pela simetria da linha (Z_ij = Z_ji)
-    Zba = Zab
-    Zca = Zac
-    Zcb = Zbc
-    
-    # --- Montagem da Matriz de Impedância da Linha ---
-    Z = np.array([ # Matriz de impedância por unidade de comprimento
-        [Zaa, Zab, Zac],
-        [Zba, Zbb, Zbc],
-        [Zca, Zcb, Zcc]
-    ])
+    # Fora da diagonal: Zij = j*(w*mi_0/2pi)*log(d_ij'/d_ij); na diagonal: Zii = ri + j*(w*mi_0/2pi)*log(2*hi/RMG).
+    Z = ((1j * w * mi_0) / (2 * math.pi)) * geometria.coeficientes_maxwell(Rmg)
+    Z[[0, 1, 2], [0, 1, 2]] += [ra, rb, rc]
 
     return Z * l # Retorna a matriz de impedância total da linha
 
+def metodo_imagem_long_lote(ra, rb, rc, xa, ha, xb, hb, xc, hc, l, R=None, Rmg_val=None):
+    """
+    Versão vetorizada de `metodo_imagem_long` para avaliar muitas geometrias de torre de uma só vez.
+
+    Todos os argumentos aceitam arrays de forma (N,) (ou escalares, que são replicados
+    por broadcast), e as N matrizes 3x3 são calculadas em uma única passada do NumPy,
+    sem laço em Python. O resultado de cada caso é idêntico ao da função escalar.
+
+    Parâmetros:
+    ra, rb, rc (array_like): Resistências de fase dos condutores a, b, c (Ohm/unidade de comprimento).
+    xa, xb, xc (array_like): Coordenadas horizontais (X) dos condutores a, b, c (metros).
+    ha, hb, hc (array_like): Alturas verticais (H) dos condutores a, b, c acima do solo (metros).
+    l (array_like): Comprimento total da linha (metros).
+    R (array_like, opcional): Raio físico do condutor (metros).
+    Rmg_val (array_like, opcional): Raio Médio Geométrico (RMG) do condutor (metros).
+
+    Retorna:
+    numpy.ndarray: Array complexo de forma (N, 3, 3) com as matrizes de impedância série
+                   para o comprimento total de cada linha (Ohms).
+
+    Raises:
+    ValueError: Para entradas inválidas (RMG não fornecido/inválido, alturas <= 0) em qualquer caso do lote.
+    """
+
+    # --- Constantes Físicas e Frequência ---
+    mi_0 = 4 * math.pi * (10**(-7))       # Permeabilidade magnética do vácuo (H/m)
+    f = 60                                # Frequência do sistema (Hz)
+    w = 2 * math.pi * f                   # Frequência angular (rad/s)
+
+    # --- Cálculo e Validação do Raio Médio Geométrico (RMG) ---
+    if Rmg_val is not None:
+        Rmg = np.asarray(Rmg_val, dtype=float)
+    elif R is not None:
+        Rmg = np.asarray(R, dtype=float) * math.exp(-1/4) # Cálculo do RMG a partir do raio físico
+    else:
+        raise ValueError("ERRO! Forneça o Raio (R) OU o Raio Médio Geométrico (Rmg_val).")
+
+    if np.any(Rmg <= 0):
+        raise ValueError("ERRO! O Raio (R) ou o Raio Médio Geométrico (Rmg_val) deve ser positivo.")
+
+    # --- Alinhamento das entradas em arrays de mesma forma (N,) ---
+    ra, rb, rc, xa, ha, xb, hb, xc, hc, l, Rmg = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (ra, rb, rc, xa, ha, xb, hb, xc, hc, l, Rmg))
+    )
+
+    # --- Validação das Alturas ---
+    if np.any(ha <= 0) or np.any(hb <= 0) or np.any(hc <= 0):
+        raise ValueError("ERRO! As alturas dos condutores (ha, hb, hc) devem ser maiores que zero.")
+
+    # --- Matrizes (N, 3) de resistências e coordenadas, uma linha por caso ---
+    r = np.stack((ra, rb, rc), axis=-1)
+    x = np.stack((xa, xb, xc), axis=-1)
+    h = np.stack((ha, hb, hc), axis=-1)
+
+    # --- Cálculo das Distâncias Geométricas (N, 3, 3) ---
+    diff_x = x[:, :, np.newaxis] - x[:, np.newaxis, :]
+    d = np.sqrt((diff_x**2) + ((h[:, :, np.newaxis] - h[:, np.newaxis, :])**2))     # Entre condutores reais (d_ij)
+    d_l = np.sqrt((diff_x**2) + ((h[:, :, np.newaxis] + h[:, np.newaxis, :])**2))   # Entre condutores e imagens (d_i,j')
+
+    # A diagonal recebe o RMG e a distância até a própria imagem (2h),
+    # de modo que log(d_l/d) reproduz log(2h/RMG) para as impedâncias próprias.
+    diag = np.arange(3)
+    d[:, diag, diag] = Rmg[:, np.newaxis]
+    d_l[:, diag, diag] = 2 * h
+
+    # --- Montagem das Matrizes de Impedância (N, 3, 3) ---
+    Z = ((1j * w * mi_0) / (2 * math.pi)) * np.log(d_l / d)
+    Z[:, diag, diag] += r
+
+    return Z * l[:, np.newaxis, np.newaxis] # Retorna as matrizes de impedância total de cada linha
+
 # --- CLASSE DE TESTE UNITÁRIO ---
 class TestMetodoImagemLong(unittest.TestCase):
 
@@ -181,6 +231,37 @@ class TestMetodoImagemLong(unittest.TestCase):
         Z_result = metodo_imagem_long(ra, rb, rc, xa, ha, xb, hb, xc, hc, l, R=R)
         np.testing.assert_allclose(Z_result, np.zeros((3, 3), dtype=complex), atol=1e-9)
 
+    def test_lote_igual_a_funcao_escalar(self):
+        """Testa se a versão em lote reproduz, caso a caso, a função escalar."""
+        rng = np.random.default_rng(0)
+        N = 50
+        params = {
+            'ra': rng.uniform(1e-5, 1e-4, N), 'rb': rng.uniform(1e-5, 1e-4, N), 'rc': rng.uniform(1e-5, 1e-4, N),
+            'xa': rng.uniform(-10.0, -3.0, N), 'ha': rng.uniform(8.0, 30.0, N),
+            'xb': rng.uniform(-1.0, 1.0, N), 'hb': rng.uniform(8.0, 30.0, N),
+            'xc': rng.uniform(3.0, 10.0, N), 'hc': rng.uniform(8.0, 30.0, N),
+            'l': rng.uniform(1e3, 1e5, N),
+        }
+        Rmg_val = rng.uniform(0.005, 0.02, N)
+
+        Z_lote = metodo_imagem_long_lote(**params, Rmg_val=Rmg_val)
+        self.assertEqual(Z_lote.shape, (N, 3, 3))
+        self.assertTrue(np.issubdtype(Z_lote.dtype, np.complexfloating))
+
+        for i in range(N):
+            Z_escalar = metodo_imagem_long(**{k: v[i] for k, v in params.items()}, Rmg_val=Rmg_val[i])
+            np.testing.assert_allclose(Z_lote[i], Z_escalar, rtol=1e-14, atol=0)
+
+    def test_lote_validacoes(self):
+        """Testa se a versão em lote aplica as mesmas validações da função escalar."""
+        ha = np.array([10.0, -1.0])
+        with self.assertRaisesRegex(ValueError, "As alturas dos condutores \(ha, hb, hc\) devem ser maiores que zero."):
+            metodo_imagem_long_lote(0.1, 0.1, 0.1, -5.0, ha, 0.0, 10.0, 5.0, 10.0, 1000.0, R=0.01)
+        with self.assertRaisesRegex(ValueError, "Forneça o Raio \(R\) OU o Raio Médio Geométrico \(Rmg_val\)."):
+            metodo_imagem_long_lote(0.1, 0.1, 0.1, -5.0, 10.0, 0.0, 10.0, 5.0, 10.0, 1000.0)
+        with self.assertRaisesRegex(ValueError, "deve ser positivo."):
+            metodo_imagem_long_lote(0.1, 0.1, 0.1, -5.0, 10.0, 0.0, 10.0, 5.0, 10.0, 1000.0, Rmg_val=np.array([0.01, 0.0]))
+
 # --- Execução dos Testes ---
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import functools
+import math
+import numpy as np
+import unittest
+
+from scipy.special import ive, kve
+
+# Número máximo de tipos de condutor (e varreduras de frequência) guardados no cache.
+TAMANHO_CACHE = 256
+
+def impedancia_interna(r_cc, raio_externo, frequencias, raio_interno=0.0, mi_r=1.0):
+    """
+    Impedância interna de um condutor com efeito pelicular, pelas funções de Bessel.
+
+    Condutor sólido (raio_interno = 0), com m = sqrt(j*w*mi*sigma):
+
+        Z_int = (rho_c * m / (2 pi a)) * I0(m a) / I1(m a)
+
+    Condutor tubular (raio_interno = q > 0), como a camada de alumínio de um cabo ACSR
+    com a alma de aço desprezada, e retorno externo:
+
+        Z_int = (rho_c * m / (2 pi a)) * [I0(m a) K1(m q) + K0(m a) I1(m q)]
+                                        / [I1(m a) K1(m q) - I1(m q) K1(m a)]
+
+    As funções de Bessel escaladas (ive, kve) evitam estouro numérico em altas frequências.
+    O resultado é guardado em cache por tipo de condutor e vetor de frequências, de modo que
+    condutores repetidos (as três fases de um mesmo cabo, por exemplo) são calculados uma vez.
+
+    Parâmetros:
+    r_cc (float): Resistência em corrente contínua do condutor (Ohm/m).
+    raio_externo (float): Raio externo do condutor (metros).
+    frequencias (array_like): Frequências (Hz). Devem ser positivas.
+    raio_interno (float, opcional): Raio interno do condutor tubular (metros). Padrão: 0 (sólido).
+    mi_r (float, opcional): Permeabilidade relativa do material condutor. Padrão: 1.
+
+    Retorna:
+    numpy.ndarray: Impedâncias internas complexas (Ohm/m), com a forma de `frequencias`.
+                   O array é somente leitura, pois pode ser compartilhado pelo cache.
+
+    Raises:
+    ValueError: Se r_cc, os raios, mi_r ou alguma frequência forem inválidos.
+    """
+    frequencias = np.asarray(frequencias, dtype=float)
+    if r_cc <= 0:
+        raise ValueError("ERRO! A resistência em corrente contínua (r_cc) deve ser um valor positivo.")
+    if raio_externo <= 0:
+        raise ValueError("ERRO! O raio externo do condutor deve ser um valor positivo.")
+    if not 0 <= raio_interno < raio_externo:
+        raise ValueError("ERRO! O raio interno deve ser não-negativo e menor que o raio externo.")
+    if mi_r <= 0:
+        raise ValueError("ERRO! A permeabilidade relativa (mi_r) deve ser um valor positivo.")
+    if np.any(frequencias <= 0):
+        raise ValueError("ERRO! As frequências (f) devem ser valores positivos.")
+
+    Z = _impedancia_interna_em_cache(float(r_cc), float(raio_externo), float(raio_interno), float(mi_r),
+                                     tuple(frequencias.ravel().tolist()))
+    return Z.reshape(frequencias.shape)
+
+def impedancias_internas(r_cc, raio_externo, frequencias, raio_interno=0.0, mi_r=1.0):
+    """
+    Impedâncias internas de N condutores em F frequências.
+
+    Parâmetros:
+    r_cc, raio_externo, raio_interno, mi_r (float ou array_like): Dados de cada condutor
+                                            (um valor único ou um por condutor), como em `impedancia_interna`.
+    frequencias (array_like): Vetor de F frequências (Hz).
+
+    Retorna:
+    numpy.ndarray: Array complexo (F, N) com a impedância interna de cada condutor (Ohm/m).
+    """
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    dados = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float))
+                                  for v in (r_cc, raio_externo, raio_interno, mi_r)))
+    return np.stack([impedancia_interna(r, a, frequencias, q, mr) for r, a, q, mr in zip(*dados)], axis=-1)
+
+@functools.lru_cache(maxsize=TAMANHO_CACHE)
+def _impedancia_interna_em_cache(r_cc, a, q, mi_r, frequencias):
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+
+    rho_c = r_cc * math.pi * (a**2 - q**2)              # Resistividade do material (Ohm.m).
+    w = 2 * math.pi * np.array(frequencias)
+    m = np.sqrt(1j * w * mi_0 * mi_r / rho_c)           # Número de onda complexo no condutor (1/m).
+    fator = rho_c * m / (2 * math.pi * a)
+
+    ma = m * a
+    if q == 0:
+        Z = fator * ive(0, ma) / ive(1, ma) # Os fatores de escala de ive se cancelam.
+    else:
+        mq = m * q
+        # Razão entre os fatores de escala dos termos cruzados: |E| = exp(-2 Re(m) (a - q)) <= 1.
+        E = np.exp(-m * (a - q) - m.real * (a - q))
+        numerador = ive(0, ma) * kve(1, mq) + kve(0, ma) * ive(1, mq) * E
+        denominador = ive(1, ma) * kve(1, mq) - ive(1, mq) * kve(1, ma) * E
+        Z = fator * numerador / denominador
+
+    Z.setflags(write=False)
+    return Z
+
+class TestImpedanciaInterna(unittest.TestCase):
+
+    def test_baixa_frequencia_tende_a_resistencia_cc(self):
+        """Em baixa frequência, R -> r_cc e L_int -> mi_0/8pi (sólido)."""
+        r_cc, a = 1e-4, 0.015
+        Z = impedancia_interna(r_cc, a, [0.01])[0]
+        self.assertAlmostEqual(Z.real / r_cc, 1.0, places=9)
+        w = 2 * math.pi * 0.01
+        self.assertAlmostEqual(Z.imag / (w * 4e-7 * math.pi / (8 * math.pi)), 1.0, places=6)
+
+    def test_alta_frequencia_tende_a_profundidade_pelicular(self):
+        """Em alta frequência, R -> rho_c / (2 pi a delta), com delta a profundidade pelicular."""
+        r_cc, a, q = 1e-4, 0.015, 0.005
+        f = 1e7
+        for raio_interno in (0.0, q):
+            rho_c = r_cc * math.pi * (a**2 - raio_interno**2)
+            delta = math.sqrt(2 * rho_c / (2 * math.pi * f * 4e-7 * math.pi))
+            Z = impedancia_interna(r_cc, a, [f], raio_interno)[0]
+            np.testing.assert_allclose(Z.real, rho_c / (2 * math.pi * a * delta), rtol=1e-2)
+
+    def test_tubular_confere_com_formula_sem_escala(self):
+        """A forma escalada coincide com a fórmula direta com iv/kv onde esta não estoura."""
+        from scipy.special import iv, kv
+        r_cc, a, q = 8e-5, 0.0148, 0.0045
+        f = np.array([60.0, 1e3, 1e4])
+        rho_c = r_cc * math.pi * (a**2 - q**2)
+        m = np.sqrt(1j * 2 * math.pi * f * 4e-7 * math.pi / rho_c)
+        esperado = (rho_c * m / (2 * math.pi * a) * (iv(0, m * a) * kv(1, m * q) + kv(0, m * a) * iv(1, m * q))
+                    / (iv(1, m * a) * kv(1, m * q) - iv(1, m * q) * kv(1, m * a)))
+        np.testing.assert_allclose(impedancia_interna(r_cc, a, f, q), esperado, rtol=1e-10)
+
+    def test_cache_e_varios_condutores(self):
+        """Condutores iguais reaproveitam o cache e o resultado tem forma (F, N)."""
+        f = np.array([60.0, 1e3])
+        _impedancia_interna_em_cache.cache_clear()
+        Z = impedancias_internas([1e-4, 1e-4, 3e-4], [0.015, 0.015, 0.005], f)
+        self.assertEqual(Z.shape, (2, 3))
+        np.testing.assert_array_equal(Z[:, 0], Z[:, 1])
+        self.assertEqual(_impedancia_interna_em_cache.cache_info().hits, 1)
+
+    def test_validacoes(self):
+        """Entradas inválidas devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "raio interno deve ser não-negativo e menor"):
+            impedancia_interna(1e-4, 0.01, [60.0], raio_interno=0.02)
+        with self.assertRaisesRegex(ValueError, r"As frequências \(f\) devem ser valores positivos."):
+            impedancia_interna(1e-4, 0.01, [0.0])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,112 @@
+import cmath
+import math
+import numpy as np
+import unittest
+
+from longitudinais.geometria import obter_geometria
+
+def profundidade_complexa(rho, frequencias):
+    """
+    Profundidade complexa de penetração no solo (Deri/Semlyen): p = sqrt(rho / (j * w * mi_0)).
+
+    Parâmetros:
+    rho (float): Resistividade do solo (Ohm.m).
+    frequencias (array_like): Frequências (Hz). Devem ser positivas.
+
+    Retorna:
+    numpy.ndarray: Profundidades complexas (metros), com a forma de `frequencias`.
+    """
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+    w = 2 * math.pi * np.asarray(frequencias, dtype=float)
+    return np.sqrt(rho / (1j * w * mi_0))
+
+def correcao_profundidade_complexa(x, h, rho, frequencias, geometria=None):
+    """
+    Correção de retorno pelo solo pelo modelo da profundidade complexa.
+
+    O solo é substituído por um plano condutor perfeito deslocado de uma profundidade
+    complexa p, de modo que as imagens ficam a 2p abaixo das imagens do método das imagens:
+
+        Z_ii = ri + j*(w*mi_0/2pi) * ln(2*(h_i + p) / RMG_i)
+        Z_ij = j*(w*mi_0/2pi) * ln(sqrt((h_i + h_j + 2p)^2 + (x_i - x_j)^2) / d_ij)
+
+    Esta função retorna apenas a diferença em relação ao método das imagens (solo perfeito),
+    Delta_Z_ij = j*(w*mi_0/2pi) * ln(D_ij(p) / d_ij'), que é uma fórmula fechada (logaritmos
+    complexos sobre a matriz de distâncias) avaliada de uma vez para todos os pares e frequências,
+    muito mais barata que a série de Carson e com precisão próxima em toda a faixa de frequências.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas horizontais e alturas dos N condutores (metros).
+    rho (float): Resistividade do solo (Ohm.m).
+    frequencias (array_like): Vetor de F frequências (Hz).
+    geometria (TowerGeometry, opcional): Geometria já calculada; se fornecida, x e h são ignorados.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (F, N, N) com as correções de retorno pelo solo (Ohm/m).
+    """
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+
+    if rho <= 0:
+        raise ValueError("ERRO! A resistividade do solo (rho) deve ser um valor positivo.")
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    if np.any(frequencias <= 0):
+        raise ValueError("ERRO! As frequências (f) devem ser valores positivos.")
+    if geometria is None:
+        geometria = obter_geometria(x, h)
+
+    H = geometria.h[:, np.newaxis] + geometria.h
+    X = np.abs(geometria.x[:, np.newaxis] - geometria.x)
+    return correcao_profundidade_pares(H, X, rho, frequencias)
+
+def correcao_profundidade_pares(H, X, rho, frequencias):
+    """
+    Correção da profundidade complexa para pares de pontos dados pela soma das alturas
+    H = h_i + h_j e pelo afastamento horizontal X = |x_i - x_j| (ver `correcao_profundidade_complexa`).
+
+    Parâmetros:
+    H, X (array_like): Arrays de mesma forma (...) com somas de alturas (> 0) e afastamentos (metros).
+    rho, frequencias: Como em `correcao_profundidade_complexa` (já validados pelo chamador).
+
+    Retorna:
+    numpy.ndarray: Array complexo (F, ...) com as correções de retorno pelo solo (Ohm/m).
+    """
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+
+    H, X = np.broadcast_arrays(np.asarray(H, dtype=float), np.asarray(X, dtype=float))
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    forma = frequencias.shape + (1,) * H.ndim
+    p = profundidade_complexa(rho, frequencias).reshape(forma) # (F, 1, ...)
+
+    # ln(D(p)) = 0.5 * ln((h_i + h_j + 2p)^2 + (x_i - x_j)^2), no ramo principal.
+    log_D_complexa = 0.5 * np.log((H + 2 * p)**2 + X**2)
+
+    w = 2 * math.pi * frequencias.reshape(forma)
+    return ((1j * w * mi_0) / (2 * math.pi)) * (log_D_complexa - np.log(np.hypot(X, H)))
+
+class TestProfundidadeComplexa(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.array([-5.0, 0.0, 5.0, 0.0])
+        self.h = np.array([15.0, 17.0, 15.0, 24.0])
+        self.rho = 100.0
+
+    def test_elemento_proprio(self):
+        """Confere Delta_Z_ii com a fórmula escalar ln(2(h+p)/2h)."""
+        f = 60.0
+        dZ = correcao_profundidade_complexa(self.x, self.h, self.rho, [f])[0]
+        w = 2 * math.pi * f
+        p = cmath.sqrt(self.rho / (1j * w * 4e-7 * math.pi))
+        esperado = 1j * w * 2e-7 * cmath.log((self.h[3] + p) / self.h[3])
+        np.testing.assert_allclose(dZ[3, 3], esperado, rtol=1e-12)
+        np.testing.assert_allclose(dZ, dZ.T, rtol=1e-14)
+
+    def test_proximo_da_serie_de_carson(self):
+        """Em uma varredura larga, a correção fica a poucos por cento da série completa de Carson."""
+        from longitudinais.Carson_serie import correcao_carson_serie
+        frequencias = np.logspace(1, 6, 11)
+        dZ_p = correcao_profundidade_complexa(self.x, self.h, self.rho, frequencias)
+        dZ_c = correcao_carson_serie(self.x, self.h, self.rho, frequencias)
+        np.testing.assert_allclose(dZ_p, dZ_c, rtol=0.05)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
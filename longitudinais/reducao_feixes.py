@@ -0,0 +1,256 @@
+import math
+import numpy as np
+import unittest
+
+from longitudinais.feixes_de_condutores import raio_circunscrito
+from longitudinais.reducao_kron import LIMITE_CONDICIONAMENTO, matrizes_mal_condicionadas
+
+def expandir_feixes(x, h, n, d, raio, fases=None, angulo=None):
+    """
+    Expande feixes em polígono regular nos seus subcondutores, cada um como um condutor próprio.
+
+    A expansão é vetorizada sobre todos os feixes (inclusive com números de subcondutores
+    diferentes): os subcondutores do feixe b ocupam posições consecutivas, em torno do centro
+    (x_b, h_b), a uma distância igual ao raio circunscrito do polígono de lado d_b.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas do centro de cada um dos B feixes (metros).
+    n (int ou array_like): Número de subcondutores de cada feixe (1 para condutores simples,
+                           como os para-raios).
+    d (float ou array_like): Distância entre subcondutores adjacentes de cada feixe (metros).
+    raio (float ou array_like): Raio (ou RMG) dos subcondutores de cada feixe (metros).
+    fases (array_like, opcional): Fase de cada feixe (0, 1, ...), ou -1 para condutores aterrados.
+                                  Padrão: cada feixe é uma fase (0, 1, ..., B-1).
+    angulo (float, opcional): Rotação dos polígonos (radianos). Padrão: lados horizontais,
+                              como em `posicoes_subcondutores`.
+
+    Retorna:
+    tuple: (x_sub, h_sub, raio_sub, fases_sub), vetores (Ns,) com Ns = soma de n.
+
+    Raises:
+    ValueError: Se algum n não for inteiro maior ou igual a 1 ou se as formas forem incompatíveis.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    h = np.atleast_1d(np.asarray(h, dtype=float))
+    B = x.shape[0]
+    try:
+        n, d, raio = (np.broadcast_to(np.asarray(v), (B,)) for v in (n, d, raio))
+        fases = np.arange(B) if fases is None else np.broadcast_to(np.asarray(fases), (B,))
+    except ValueError:
+        raise ValueError("ERRO! Os parâmetros dos feixes devem ter um valor por feixe.") from None
+    if h.shape != (B,):
+        raise ValueError("ERRO! Os vetores de coordenadas (x) e alturas (h) devem ter o mesmo tamanho.")
+    if np.any(n < 1) or np.any(n != np.round(n)):
+        raise ValueError("ERRO! O número de subcondutores 'n' deve ser um inteiro maior ou igual a 1.")
+    n = n.astype(int)
+
+    # Índice do feixe e posição de cada subcondutor dentro do seu feixe.
+    feixe = np.repeat(np.arange(B), n)
+    k = np.arange(feixe.shape[0]) - np.repeat(np.cumsum(n) - n, n)
+    n_sub = n[feixe]
+    if angulo is None:
+        base = np.where(n_sub > 1, np.pi / n_sub - np.pi / 2, 0.0)
+    else:
+        base = np.full(n_sub.shape, float(angulo))
+    theta = base + 2 * np.pi * k / n_sub
+    A = np.asarray(raio_circunscrito(n, d), dtype=float)[feixe]
+
+    return (x[feixe] + A * np.cos(theta), h[feixe] + A * np.sin(theta),
+            np.asarray(raio, dtype=float)[feixe], np.asarray(fases)[feixe])
+
+def matriz_incidencia(fases, n_fases=None):
+    """
+    Matriz de incidência (Ns, Nf) entre subcondutores e fases.
+
+    K[s, f] = 1 se o subcondutor s pertence à fase f. Subcondutores com fase negativa
+    (condutores aterrados) têm linha nula.
+
+    Parâmetros:
+    fases (array_like): Fase (0, 1, ..., Nf-1) de cada subcondutor, ou -1 se aterrado.
+    n_fases (int, opcional): Número de fases Nf. Padrão: maior fase + 1.
+
+    Retorna:
+    numpy.ndarray: Matriz de incidência (Ns, Nf).
+    """
+    fases = np.asarray(fases, dtype=int)
+    if n_fases is None:
+        n_fases = int(fases.max()) + 1
+    if n_fases < 1 or np.any(fases >= n_fases):
+        raise ValueError("ERRO! Cada subcondutor deve pertencer a uma fase entre 0 e n_fases-1 (ou -1 se aterrado).")
+    return (fases[:, np.newaxis] == np.arange(n_fases)).astype(float)
+
+def capacitancia_feixes(P, fases, n_fases=None, limite_condicionamento=LIMITE_CONDICIONAMENTO):
+    """
+    Matriz de capacitâncias das fases a partir da matriz de potenciais de todos os subcondutores.
+
+    Os subcondutores de uma fase estão no mesmo potencial e a carga da fase é a soma das suas
+    cargas; os aterrados têm potencial nulo. Com a matriz de incidência K, q_sub = P^-1 K V e
+    q_fase = K^T q_sub, isto é, C = K^T P^-1 K. P^-1 K é obtida com `np.linalg.solve` (uma
+    fatoração por matriz), vetorizada sobre pilhas de matrizes.
+
+    Parâmetros:
+    P (array_like): Matriz de potenciais (Ns, Ns) ou pilha (..., Ns, Ns), em m/F.
+    fases (array_like): Fase de cada subcondutor, ou -1 se aterrado (ver `matriz_incidencia`).
+    n_fases (int, opcional): Número de fases. Padrão: maior fase + 1.
+    limite_condicionamento (float ou None, opcional): Maior número de condição aceito para P.
+                                                      Use None para não verificar.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) de capacitâncias das fases (..., Nf, Nf), em F/m.
+
+    Raises:
+    ValueError: Se P for singular ou mal condicionada, ou se as fases forem inválidas.
+    """
+    P = np.asarray(P)
+    K = _incidencia(P, fases, n_fases, limite_condicionamento)
+    return np.swapaxes(K, -1, -2) @ np.linalg.solve(P, np.broadcast_to(K, P.shape[:-2] + K.shape))
+
+def impedancia_feixes(Z, fases, n_fases=None, limite_condicionamento=LIMITE_CONDICIONAMENTO):
+    """
+    Matriz de impedâncias das fases a partir da matriz primitiva de todos os subcondutores.
+
+    Os subcondutores de uma fase estão em paralelo (mesma queda de tensão) e a corrente da fase
+    é a soma das suas correntes; os aterrados têm queda nula. Assim, Z_fase = (K^T Z^-1 K)^-1,
+    com Z^-1 K obtida por `np.linalg.solve` e vetorizada sobre pilhas (frequências, seções).
+
+    Parâmetros:
+    Z (array_like): Matriz primitiva (Ns, Ns) ou pilha (..., Ns, Ns), em Ohm/m.
+    fases (array_like): Fase de cada subcondutor, ou -1 se aterrado (ver `matriz_incidencia`).
+    n_fases (int, opcional): Número de fases. Padrão: maior fase + 1.
+    limite_condicionamento (float ou None, opcional): Maior número de condição aceito para Z.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) de impedâncias das fases (..., Nf, Nf), em Ohm/m.
+
+    Raises:
+    ValueError: Se Z for singular ou mal condicionada, ou se as fases forem inválidas.
+    """
+    return np.linalg.inv(capacitancia_feixes(Z, fases, n_fases, limite_condicionamento))
+
+def cargas_subcondutores(P, fases, V, n_fases=None):
+    """
+    Cargas de cada subcondutor para tensões de fase dadas: q_sub = P^-1 K V.
+
+    Parâmetros:
+    P (array_like): Matriz de potenciais (Ns, Ns) ou pilha (..., Ns, Ns), em m/F.
+    fases (array_like): Fase de cada subcondutor, ou -1 se aterrado.
+    V (array_like): Tensões das fases (..., Nf), reais ou complexas (fasores), em V.
+    n_fases (int, opcional): Número de fases. Padrão: maior fase + 1.
+
+    Retorna:
+    numpy.ndarray: Cargas (..., Ns) dos subcondutores (C/m).
+    """
+    P = np.asarray(P)
+    K = _incidencia(P, fases, n_fases, None)
+    V = np.asarray(V)
+    KV = np.einsum('sf,...f->...s', K, V)
+    forma = np.broadcast_shapes(P.shape[:-2], KV.shape[:-1])
+    P = np.broadcast_to(P, forma + P.shape[-2:])
+    KV = np.broadcast_to(KV, forma + KV.shape[-1:])
+    return np.linalg.solve(P, KV[..., np.newaxis])[..., 0]
+
+def _incidencia(M, fases, n_fases, limite_condicionamento):
+    """Valida a matriz dos subcondutores e retorna a matriz de incidência."""
+    fases = np.asarray(fases)
+    if M.shape[-1] != M.shape[-2] or fases.shape != (M.shape[-1],):
+        raise ValueError("ERRO! A matriz deve ser quadrada, com uma linha por subcondutor do vetor de fases.")
+    if limite_condicionamento is not None and np.any(matrizes_mal_condicionadas(M, limite_condicionamento)):
+        raise ValueError("ERRO! A matriz dos subcondutores é singular ou mal condicionada. "
+                         "Verifique se há subcondutores coincidentes.")
+    return matriz_incidencia(fases, n_fases).astype(M.dtype)
+
+class TestReducaoFeixes(unittest.TestCase):
+
+    def setUp(self):
+        # Três fases com feixes quádruplos e dois para-raios.
+        self.x = [-10.0, 0.0, 10.0, -6.0, 6.0]
+        self.h = [25.0, 25.0, 25.0, 35.0, 35.0]
+        self.n = [4, 4, 4, 1, 1]
+        self.fases = [0, 1, 2, -1, -1]
+
+    def _potenciais(self, x, h, raios):
+        from longitudinais.geometria import PERMISSIVIDADE_VACUO, obter_geometria
+        return obter_geometria(x, h).coeficientes_maxwell(raios) / (2 * math.pi * PERMISSIVIDADE_VACUO)
+
+    def test_expansao(self):
+        """Subcondutores em torno do centro, com espaçamento d e fases repetidas."""
+        xs, hs, rs, fs = expandir_feixes(self.x, self.h, self.n, 0.45, 0.015, fases=self.fases)
+        self.assertEqual(xs.shape, (14,))
+        self.assertEqual(fs.tolist(), [0] * 4 + [1] * 4 + [2] * 4 + [-1, -1])
+        np.testing.assert_allclose(xs[:4].mean(), -10.0, atol=1e-12)
+        np.testing.assert_allclose(hs[:4].mean(), 25.0, atol=1e-12)
+        np.testing.assert_allclose(np.hypot(xs[1] - xs[0], hs[1] - hs[0]), 0.45, rtol=1e-12)
+        self.assertEqual((xs[-1], hs[-1]), (6.0, 35.0))
+
+    def test_sem_feixes_igual_kron(self):
+        """Com condutores simples, a redução coincide com a capacitância por redução de Kron."""
+        from longitudinais.reducao_kron import capacitancia_kron
+        P = self._potenciais(self.x, self.h, [0.015] * 5)
+        np.testing.assert_allclose(capacitancia_feixes(P, self.fases), capacitancia_kron(P, 3), rtol=1e-12)
+
+    def test_feixe_explicito_proximo_do_rmg(self):
+        """A redução explícita fica próxima da aproximação pelo raio equivalente do feixe."""
+        from longitudinais.feixes_de_condutores import rmg_feixes
+        xs, hs, rs, fs = expandir_feixes(self.x, self.h, self.n, 0.45, 0.015, fases=self.fases)
+        C = capacitancia_feixes(self._potenciais(xs, hs, rs), fs)
+        r_eq = rmg_feixes(self.n, 0.45, 0.015)
+        C_rmg = capacitancia_feixes(self._potenciais(self.x, self.h, r_eq), self.fases)
+        np.testing.assert_allclose(C, C_rmg, rtol=2e-3)
+        # Carga da fase é a soma das cargas dos seus subcondutores
+        V = np.array([1.0, -0.5, -0.5])
+        q = cargas_subcondutores(self._potenciais(xs, hs, rs), fs, V)
+        np.testing.assert_allclose(matriz_incidencia(fs).T @ q, C @ V, rtol=1e-10)
+
+    def test_impedancia_feixes(self):
+        """Impedância de Carson com subcondutores explícitos próxima da obtida com o RMG do feixe."""
+        from longitudinais.Carson_n_condutores import metodo_carson_n_condutores_varredura
+        from longitudinais.feixes_de_condutores import rmg_feixes
+        f = [60.0, 1e3]
+        r_sub, rmg_sub = 0.07e-3, 0.0124
+        xs, hs, rmgs, fs = expandir_feixes(self.x, self.h, self.n, 0.45, rmg_sub, fases=self.fases)
+        r = np.where(fs >= 0, r_sub, 0.3e-3)
+        Z_sub = metodo_carson_n_condutores_varredura(r, xs, hs, 100.0, f, Rmg_val=rmgs)
+        Z = impedancia_feixes(Z_sub, fs)
+        self.assertEqual(Z.shape, (2, 3, 3))
+
+        rmg = rmg_feixes(self.n, 0.45, rmg_sub)
+        r_eq = np.array([r_sub / 4] * 3 + [0.3e-3] * 2)
+        from longitudinais.reducao_kron import reducao_kron
+        Z_rmg = reducao_kron(metodo_carson_n_condutores_varredura(r_eq, self.x, self.h, 100.0, f, Rmg_val=rmg), 3)
+        np.testing.assert_allclose(Z, Z_rmg, rtol=5e-3)
+
+    def test_modo_explicito_feixe_condutor_tran(self):
+        """O modo com subcondutores explícitos de metodo_feixe_condutor_tran fica próximo do modo RMG."""
+        from Transversais.feixe_condutor import metodo_feixe_condutor_tran
+        args = (0.015, 0.015, 0.015, 6, 6, 6, 0.457, 0.457, 0.457, -12, 30, 0, 30, 12, 30, 100, 1000)
+        C_rmg = metodo_feixe_condutor_tran(*args)
+        C_exp = metodo_feixe_condutor_tran(*args, subcondutores_explicitos=True)
+        np.testing.assert_allclose(C_exp, C_rmg, rtol=3e-3)
+
+    def test_torre_grande_e_pilha(self):
+        """Circuito duplo com feixes de 6 (38 condutores) e pilha de matrizes."""
+        x = [-12, -8, -4, 4, 8, 12, -6, 6]
+        h = [30, 36, 42, 42, 36, 30, 50, 50]
+        xs, hs, rs, fs = expandir_feixes(x, h, [6] * 6 + [1, 1], 0.457, 0.016, fases=[0, 1, 2, 3, 4, 5, -1, -1])
+        self.assertEqual(xs.shape, (38,))
+        P = self._potenciais(xs, hs, rs)
+        C = capacitancia_feixes(np.stack([P, 1.1 * P]), fs)
+        self.assertEqual(C.shape, (2, 6, 6))
+        np.testing.assert_allclose(C[1], C[0] / 1.1, rtol=1e-12)
+
+    def test_validacoes(self):
+        """Fases fora do intervalo, formas incompatíveis e subcondutores coincidentes."""
+        P = self._potenciais(self.x, self.h, [0.015] * 5)
+        with self.assertRaisesRegex(ValueError, "uma linha por subcondutor"):
+            capacitancia_feixes(P, [0, 1, 2])
+        with self.assertRaisesRegex(ValueError, "entre 0 e n_fases-1"):
+            capacitancia_feixes(P, [0, 1, 2, 3, -1], n_fases=3)
+        with self.assertRaisesRegex(ValueError, "inteiro maior ou igual a 1"):
+            expandir_feixes(self.x, self.h, [4, 4, 0, 1, 1], 0.45, 0.015)
+        P_sing = P.copy()
+        P_sing[4], P_sing[:, 4] = P_sing[3], P_sing[:, 3]
+        with self.assertRaisesRegex(ValueError, "singular ou mal condicionada"):
+            capacitancia_feixes(P_sing, self.fases)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
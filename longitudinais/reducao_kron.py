@@ -0,0 +1,206 @@
+import numpy as np
+import unittest
+
+# Número de condição acima do qual a submatriz dos condutores eliminados é tratada como singular.
+# Com precisão dupla (eps ~ 2.2e-16), um condicionamento de 1e12 ainda deixa cerca de 4 dígitos corretos.
+LIMITE_CONDICIONAMENTO = 1e12
+
+def matrizes_mal_condicionadas(M, limite_condicionamento=LIMITE_CONDICIONAMENTO, M_inv=None):
+    """
+    Indica quais matrizes de uma pilha são singulares ou numericamente mal condicionadas.
+
+    Substitui o teste `np.linalg.det(M) == 0`, que depende da escala da matriz (o determinante
+    de uma matriz de potenciais em m/F é da ordem de (1e10)^N) e quase nunca é exatamente zero
+    em ponto flutuante. Usa o número de condição na norma 1, ||M||_1 * ||M^-1||_1, com a inversa
+    obtida por fatoração LU: bem mais barato que o `np.linalg.cond` (uma SVD completa por matriz)
+    e no máximo N vezes diferente do número de condição na norma 2. Matrizes exatamente
+    singulares, em que a fatoração falha, são sempre marcadas.
+
+    Parâmetros:
+    M (array_like): Matriz quadrada (N, N) ou pilha de matrizes (..., N, N).
+    limite_condicionamento (float, opcional): Maior número de condição aceito.
+    M_inv (array_like, opcional): Inversa de M já calculada (NaN nas matrizes singulares), para
+                                  reaproveitar uma fatoração feita pelo chamador.
+
+    Retorna:
+    numpy.ndarray: Array booleano de forma (...) com True para as matrizes mal condicionadas.
+    """
+    M = np.asarray(M)
+    if M.shape[-1] == 0:
+        return np.zeros(M.shape[:-2], dtype=bool)
+    if M_inv is None:
+        M_inv = _resolver(M, np.broadcast_to(np.eye(M.shape[-1], dtype=M.dtype), M.shape))
+    with np.errstate(invalid='ignore', over='ignore'):
+        cond = np.linalg.norm(M, 1, axis=(-2, -1)) * np.linalg.norm(M_inv, 1, axis=(-2, -1))
+    return ~np.isfinite(cond) | (cond > limite_condicionamento)
+
+def reducao_kron(M, n_manter, limite_condicionamento=LIMITE_CONDICIONAMENTO):
+    """
+    Redução de Kron de uma matriz de impedâncias ou de potenciais, eliminando condutores aterrados.
+
+    Os primeiros `n_manter` condutores (fases) são mantidos e os demais (para-raios aterrados,
+    com tensão nula) são eliminados:
+
+        M_red = M_ff - M_fg @ M_gg^-1 @ M_gf
+
+    O produto M_gg^-1 @ M_gf é obtido com `np.linalg.solve` (fatoração LU), e a operação é
+    vetorizada sobre uma pilha de matrizes (seções, frequências ou casos), para qualquer número
+    de condutores eliminados. Quando o condicionamento é verificado, a inversa de M_gg usada na
+    estimativa sai da mesma fatoração, resolvendo as colunas de M_gf e da identidade juntas.
+
+    Parâmetros:
+    M (array_like): Matriz (N, N) ou pilha (..., N, N), real ou complexa.
+    n_manter (int): Número de condutores mantidos (os primeiros da matriz).
+    limite_condicionamento (float ou None, opcional): Maior número de condição aceito para M_gg.
+                                                      Use None para não verificar.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) reduzida de forma (..., n_manter, n_manter).
+
+    Raises:
+    ValueError: Se n_manter estiver fora do intervalo [1, N] ou se alguma submatriz M_gg for
+                singular ou mal condicionada.
+    """
+    M = np.asarray(M)
+    n = M.shape[-1]
+    if not 1 <= n_manter <= n:
+        raise ValueError(f"ERRO! O número de condutores mantidos deve estar entre 1 e {n}.")
+
+    M_ff = M[..., :n_manter, :n_manter]
+    if n_manter == n: # Nada a eliminar
+        return M_ff.copy()
+
+    M_fg = M[..., :n_manter, n_manter:]
+    M_gf = M[..., n_manter:, :n_manter]
+    M_gg = M[..., n_manter:, n_manter:]
+
+    if limite_condicionamento is None:
+        return M_ff - M_fg @ np.linalg.solve(M_gg, M_gf)
+
+    I = np.broadcast_to(np.eye(n - n_manter, dtype=M.dtype), M_gg.shape)
+    X = _resolver(M_gg, np.concatenate([M_gf, I], axis=-1))
+    _verificar_condicionamento(M_gg, limite_condicionamento, M_inv=X[..., n_manter:])
+
+    return M_ff - M_fg @ X[..., :n_manter]
+
+def capacitancia_kron(P, n_manter, limite_condicionamento=LIMITE_CONDICIONAMENTO):
+    """
+    Matriz de capacitâncias das fases a partir da matriz de potenciais de Maxwell completa.
+
+    Equivale a inverter a matriz de potenciais reduzida por Kron, pois
+    (P_ff - P_fg @ P_gg^-1 @ P_gf)^-1 é exatamente o bloco das fases de P^-1.
+    O bloco é obtido resolvendo P @ X = E, onde E são as colunas da identidade associadas
+    às fases: uma única fatoração por matriz, sem determinante e sem inversa explícita.
+
+    Parâmetros:
+    P (array_like): Matriz de potenciais (N, N) ou pilha (..., N, N), em m/F.
+    n_manter (int): Número de fases (os primeiros condutores da matriz).
+    limite_condicionamento (float ou None, opcional): Maior número de condição aceito para o bloco
+                                                      dos condutores eliminados. Use None para não verificar.
+
+    Retorna:
+    numpy.ndarray: Matriz (ou pilha) de capacitâncias das fases (..., n_manter, n_manter), em F/m.
+
+    Raises:
+    ValueError: Se n_manter estiver fora do intervalo [1, N] ou se o bloco dos condutores
+                eliminados for singular ou mal condicionado.
+    """
+    P = np.asarray(P)
+    n = P.shape[-1]
+    if not 1 <= n_manter <= n:
+        raise ValueError(f"ERRO! O número de condutores mantidos deve estar entre 1 e {n}.")
+
+    _verificar_condicionamento(P[..., n_manter:, n_manter:], limite_condicionamento)
+
+    E = np.eye(n, n_manter, dtype=P.dtype)
+    return np.linalg.solve(P, np.broadcast_to(E, P.shape[:-2] + E.shape))[..., :n_manter, :]
+
+def _resolver(A, B):
+    """Resolve A @ X = B para uma pilha, com X = NaN nas matrizes exatamente singulares."""
+    try:
+        return np.linalg.solve(A, B)
+    except np.linalg.LinAlgError:
+        # Alguma matriz da pilha não pôde ser fatorada: resolve uma a uma, marcando as singulares.
+        X = np.full(np.broadcast_shapes(A.shape[:-2], B.shape[:-2]) + B.shape[-2:], np.nan,
+                    dtype=np.result_type(A.dtype, B.dtype, float))
+        A, B = np.broadcast_to(A, X.shape[:-2] + A.shape[-2:]), np.broadcast_to(B, X.shape)
+        for indice in np.ndindex(X.shape[:-2]):
+            try:
+                X[indice] = np.linalg.solve(A[indice], B[indice])
+            except np.linalg.LinAlgError:
+                pass
+        return X
+
+def _verificar_condicionamento(M_gg, limite_condicionamento, M_inv=None):
+    """Levanta ValueError indicando a primeira matriz da pilha que esteja mal condicionada."""
+    if limite_condicionamento is None:
+        return
+    ruins = matrizes_mal_condicionadas(M_gg, limite_condicionamento, M_inv)
+    if np.any(ruins):
+        indice = tuple(int(i) for i in np.argwhere(ruins)[0])
+        local = f" (índice {indice} da pilha)" if indice else ""
+        raise ValueError(
+            f"ERRO! A submatriz dos condutores eliminados é singular ou mal condicionada{local}. "
+            "Verifique as posições dos condutores aterrados.")
+
+class TestReducaoKron(unittest.TestCase):
+
+    def setUp(self):
+        # Matriz simétrica positiva definida 5x5 (3 fases + 2 para-raios) e uma pilha de 4 variações.
+        rng = np.random.default_rng(1)
+        A = rng.normal(size=(4, 5, 5))
+        self.P = A @ np.swapaxes(A, -1, -2) + 5 * np.eye(5)
+        self.Z = self.P + 1j * (np.swapaxes(self.P, -1, -2) * 0.3)
+
+    def test_confere_com_formula_com_inversa(self):
+        """A redução deve coincidir com M_ff - M_fg inv(M_gg) M_gf, matriz a matriz."""
+        Z_red = reducao_kron(self.Z, 3)
+        self.assertEqual(Z_red.shape, (4, 3, 3))
+        for k in range(4):
+            Z = self.Z[k]
+            esperado = Z[:3, :3] - Z[:3, 3:] @ np.linalg.inv(Z[3:, 3:]) @ Z[3:, :3]
+            np.testing.assert_allclose(Z_red[k], esperado, rtol=1e-12)
+
+    def test_capacitancia_igual_inversa_da_reduzida(self):
+        """O bloco das fases de P^-1 deve ser a inversa da matriz de potenciais reduzida."""
+        C = capacitancia_kron(self.P, 3)
+        esperado = np.linalg.inv(reducao_kron(self.P, 3))
+        np.testing.assert_allclose(C, esperado, rtol=1e-12)
+
+    def test_sem_condutores_eliminados(self):
+        """Com n_manter = N, a matriz é devolvida sem alteração."""
+        np.testing.assert_array_equal(reducao_kron(self.Z[0], 5), self.Z[0])
+
+    def test_submatriz_singular(self):
+        """Para-raios coincidentes tornam M_gg singular e devem levantar ValueError."""
+        P = self.P.copy()
+        P[2, 4, :] = P[2, 3, :]
+        P[2, :, 4] = P[2, :, 3]
+        with self.assertRaisesRegex(ValueError, r"singular ou mal condicionada \(índice \(2,\) da pilha\)"):
+            reducao_kron(P, 3)
+        self.assertEqual(matrizes_mal_condicionadas(P[:, 3:, 3:]).tolist(), [False, False, True, False])
+
+    def test_submatriz_exatamente_singular(self):
+        """Uma matriz em que a fatoração LU falha é marcada sem interromper o restante da pilha."""
+        P = self.P.copy()
+        P[1, 3:, 3:] = 0.0
+        self.assertEqual(matrizes_mal_condicionadas(P[:, 3:, 3:]).tolist(), [False, True, False, False])
+        with self.assertRaisesRegex(ValueError, r"índice \(1,\) da pilha"):
+            capacitancia_kron(P, 3)
+
+    def test_estimativa_norma_1_proxima_da_norma_2(self):
+        """O número de condição na norma 1 difere do da norma 2 no máximo pelo fator N."""
+        for escala in (1e2, 1e8, 1e14):
+            M = self.Z[..., 3:, 3:] @ np.diag([1.0, 1.0 / escala])
+            cond_2 = np.linalg.cond(M)
+            cond_1 = np.linalg.norm(M, 1, axis=(-2, -1)) * np.linalg.norm(np.linalg.inv(M), 1, axis=(-2, -1))
+            self.assertTrue(np.all((cond_1 >= cond_2 / 2) & (cond_1 <= 2 * cond_2)))
+            np.testing.assert_array_equal(matrizes_mal_condicionadas(M), cond_2 > 2 * LIMITE_CONDICIONAMENTO)
+
+    def test_n_manter_invalido(self):
+        """n_manter fora do intervalo deve levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "O número de condutores mantidos deve estar entre 1 e 5."):
+            reducao_kron(self.Z, 0)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,242 @@
+import functools
+import math
+import numpy as np
+import unittest
+
+from longitudinais.geometria import obter_geometria
+
+# Painéis geométricos de Gauss-Legendre por década de lambda (1/m) na integral de Sommerfeld.
+PAINEIS_POR_DECADA = 8
+
+# Pontos de Gauss-Legendre por painel para afastamentos horizontais até 2x a soma das alturas;
+# a quantidade cresce proporcionalmente para afastamentos maiores (integrando mais oscilatório).
+PONTOS_POR_PAINEL = 8
+
+# Fração do menor número de onda do solo usada como início da integração em lambda.
+FRACAO_LAMBDA_MINIMO = 1e-3
+
+# e^(-lambda*H) é desprezível acima de lambda = DECAIMENTO / H.
+DECAIMENTO = 80.0
+
+# Número máximo de conjuntos de nós (solo, frequência, faixa) mantidos no cache LRU.
+TAMANHO_CACHE = 4096
+
+# Número máximo de termos (pares x nós de quadratura) avaliados de uma vez.
+TERMOS_POR_BLOCO = 1_000_000
+
+def correcao_solo_multicamadas(x, h, resistividades, espessuras, frequencias, geometria=None):
+    """
+    Correção de retorno pelo solo para um solo estratificado em camadas horizontais.
+
+    Generaliza a integral de Carson (solo homogêneo) para N camadas de resistividades rho_k e
+    espessuras d_k (a última é semi-infinita), com permeabilidade mi_0 em todas as camadas e
+    sem correntes de deslocamento:
+
+        Delta_Z_ij = (j*w*mi_0/pi) * integral_0^inf e^(-lambda*(h_i + h_j)) cos(lambda*x_ij) / (lambda + Y_1) d lambda,
+
+    com u_k = sqrt(lambda^2 + j*w*mi_0/rho_k) e a admitância de superfície obtida de baixo para
+    cima: Y_N = u_N e Y_k = u_k (Y_(k+1) + u_k tanh(u_k d_k)) / (u_k + Y_(k+1) tanh(u_k d_k)).
+    Para uma única camada, Y_1 = u_1 e o resultado é exatamente a série de Carson.
+
+    A integral é feita por Gauss-Legendre composto em painéis geométricos de lambda. Os nós, os
+    pesos e o núcleo 1/(lambda + Y_1) dependem apenas do solo, da frequência e da faixa de
+    lambda e são guardados em cache, de modo que varreduras repetidas e torres diferentes sobre
+    o mesmo solo reaproveitam os nós; cada par de condutores custa então apenas um produto
+    escalar com os pesos. Os pares são agrupados pela faixa de lambda (pela soma das alturas) e
+    pela densidade de nós (pela razão X/H), de modo que pares próximos não pagam pela grade dos
+    pares mais afastados, e cada grupo é avaliado em blocos de até TERMOS_POR_BLOCO termos.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas horizontais e alturas dos N condutores (metros).
+    resistividades (float ou array_like): Resistividades das camadas, de cima para baixo (Ohm.m).
+    espessuras (array_like): Espessuras das camadas, exceto a última (metros). Vazio para solo homogêneo.
+    frequencias (array_like): Vetor de F frequências (Hz).
+    geometria (TowerGeometry, opcional): Geometria já calculada; se fornecida, x e h são ignorados.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (F, N, N) com as correções do solo (Ohm/m).
+
+    Raises:
+    ValueError: Se alguma resistividade, espessura ou frequência não for positiva, ou se o número
+                de espessuras não for o número de camadas menos um.
+    """
+    if geometria is None:
+        geometria = obter_geometria(x, h)
+    H = geometria.h[:, np.newaxis] + geometria.h
+    X = np.abs(geometria.x[:, np.newaxis] - geometria.x)
+    return integral_solo_multicamadas(H, X, resistividades, espessuras, frequencias)
+
+def integral_solo_multicamadas(H, X, resistividades, espessuras, frequencias):
+    """
+    Correção do solo estratificado para pares de pontos dados pela soma das alturas H = h_i + h_j
+    e pelo afastamento horizontal X = |x_i - x_j| (ver `correcao_solo_multicamadas`).
+
+    Parâmetros:
+    H, X (array_like): Arrays de mesma forma (...) com somas de alturas (> 0) e afastamentos (metros).
+    resistividades, espessuras, frequencias: Como em `correcao_solo_multicamadas`.
+
+    Retorna:
+    numpy.ndarray: Array complexo (F, ...) com as correções do solo (Ohm/m).
+    """
+    mi_0 = 4 * math.pi * (10**(-7)) # Permeabilidade magnética do vácuo (H/m).
+
+    resistividades, espessuras = _validar_camadas(resistividades, espessuras)
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    if np.any(frequencias <= 0):
+        raise ValueError("ERRO! As frequências (f) devem ser valores positivos.")
+    H, X = np.broadcast_arrays(np.asarray(H, dtype=float), np.abs(np.asarray(X, dtype=float)))
+    if np.any(H <= 0):
+        raise ValueError("ERRO! As alturas de todos os condutores (h) devem ser maiores que zero.")
+
+    # Faixa de lambda (pela soma das alturas) e densidade de nós (pela razão X/H) de cada par,
+    # arredondadas para potências de 2: pares parecidos formam um grupo e compartilham os nós do cache.
+    Hv, Xv = H.ravel(), X.ravel()
+    expoente_lambda = np.ceil(np.log2(DECAIMENTO / Hv)).astype(int)
+    expoente_pontos = np.maximum(0, np.ceil(np.log2(np.maximum(Xv / Hv, 1e-300) / 2))).astype(int)
+    grupos, grupo = np.unique(np.stack([expoente_lambda, expoente_pontos], axis=1), axis=0, return_inverse=True)
+    grupo = grupo.ravel()
+
+    Z = np.empty((frequencias.shape[0], Hv.shape[0]), dtype=complex)
+    for g, (e_lambda, e_pontos) in enumerate(grupos):
+        pares = np.flatnonzero(grupo == g)
+        for k, f in enumerate(frequencias):
+            lam, pesos = _nos_em_cache(resistividades, espessuras, float(f), 2.0 ** int(e_lambda),
+                                       PONTOS_POR_PAINEL * 2 ** int(e_pontos))
+            passo = max(1, TERMOS_POR_BLOCO // lam.shape[0])
+            for inicio in range(0, pares.shape[0], passo):
+                bloco = pares[inicio:inicio + passo]
+                # (P, nós) @ (nós,): e^(-lambda H) cos(lambda X) contra os pesos com o núcleo já incluído.
+                fator = np.exp(-np.outer(Hv[bloco], lam)) * np.cos(np.outer(Xv[bloco], lam))
+                Z[k, bloco] = fator @ pesos
+    w = 2 * math.pi * frequencias[:, np.newaxis]
+    Z *= 1j * w * mi_0 / math.pi
+    return Z.reshape(frequencias.shape + H.shape)
+
+@functools.lru_cache(maxsize=TAMANHO_CACHE)
+def _nos_em_cache(resistividades, espessuras, f, lambda_maximo, pontos):
+    """
+    Nós lambda e pesos (pesos de Gauss * núcleo 1/(lambda + Y_1)) para um solo e uma frequência.
+    Os arrays são somente leitura, pois são compartilhados pelo cache.
+    """
+    mi_0 = 4 * math.pi * (10**(-7))
+    w = 2 * math.pi * f
+    k2 = 1j * w * mi_0 / np.asarray(resistividades)          # Número de onda ao quadrado de cada camada.
+
+    lambda_minimo = FRACAO_LAMBDA_MINIMO * float(np.sqrt(np.abs(k2)).min())
+    if espessuras:
+        lambda_minimo = min(lambda_minimo, FRACAO_LAMBDA_MINIMO / max(espessuras))
+    decadas = math.log10(lambda_maximo / lambda_minimo)
+    bordas = np.concatenate([[0.0], np.geomspace(lambda_minimo, lambda_maximo,
+                                                 max(1, math.ceil(decadas * PAINEIS_POR_DECADA)) + 1)])
+    t, pg = np.polynomial.legendre.leggauss(pontos)
+    meio = (bordas[1:] + bordas[:-1]) / 2
+    semi = (bordas[1:] - bordas[:-1]) / 2
+    lam = (meio[:, np.newaxis] + semi[:, np.newaxis] * t).ravel()
+    pesos = (semi[:, np.newaxis] * pg).ravel() * _nucleo(lam, k2, espessuras)
+
+    lam.setflags(write=False)
+    pesos.setflags(write=False)
+    return lam, pesos
+
+def _nucleo(lam, k2, espessuras):
+    """Núcleo 1/(lambda + Y_1(lambda)) da integral de Sommerfeld para o solo em camadas."""
+    u = np.sqrt(lam[:, np.newaxis]**2 + k2)                    # (nós, camadas)
+    Y = u[:, -1]
+    for camada in range(len(espessuras) - 1, -1, -1):
+        uk = u[:, camada]
+        t = np.tanh(uk * espessuras[camada])
+        Y = uk * (Y + uk * t) / (uk + Y * t)
+    return 1 / (lam + Y)
+
+def _validar_camadas(resistividades, espessuras):
+    """Converte as camadas em tuplas (chave do cache) e valida os valores."""
+    resistividades = tuple(float(r) for r in np.atleast_1d(resistividades))
+    espessuras = tuple(float(d) for d in np.atleast_1d(espessuras if espessuras is not None else []))
+    if len(resistividades) == 0 or any(r <= 0 for r in resistividades):
+        raise ValueError("ERRO! As resistividades das camadas do solo devem ser valores positivos.")
+    if len(espessuras) != len(resistividades) - 1:
+        raise ValueError("ERRO! Devem ser fornecidas as espessuras de todas as camadas, exceto a última.")
+    if any(d <= 0 for d in espessuras):
+        raise ValueError("ERRO! As espessuras das camadas do solo devem ser valores positivos.")
+    return resistividades, espessuras
+
+class TestSoloMulticamadas(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.array([-8.0, 0.0, 8.0, -5.0, 5.0])
+        self.h = np.array([18.0, 18.0, 18.0, 28.0, 28.0])
+        self.f = np.array([1.0, 60.0, 1e3, 1e5, 1e6])
+
+    def test_homogeneo_igual_integral_de_carson(self):
+        """Com uma camada, coincide com a integral de Carson (quad) e com a série de Carson."""
+        from scipy.integrate import quad
+        from longitudinais.Carson_serie import correcao_carson_serie
+        mi_0 = 4 * math.pi * (10**(-7))
+        for rho in (10.0, 1000.0):
+            Z = correcao_solo_multicamadas(self.x, self.h, rho, [], self.f)
+            for k, f in enumerate(self.f):
+                w = 2 * math.pi * f
+                k2 = 1j * w * mi_0 / rho
+                for i, j in ((0, 0), (0, 2), (1, 4)):
+                    H, X = self.h[i] + self.h[j], abs(self.x[i] - self.x[j])
+                    g = lambda lam: np.exp(-lam * H) * np.cos(lam * X) / (lam + np.sqrt(lam**2 + k2))
+                    re = quad(lambda lam: g(lam).real, 0, np.inf, epsabs=0, epsrel=1e-12, limit=200)[0]
+                    im = quad(lambda lam: g(lam).imag, 0, np.inf, epsabs=0, epsrel=1e-12, limit=200)[0]
+                    np.testing.assert_allclose(Z[k, i, j], 1j * w * mi_0 / math.pi * (re + 1j * im), rtol=1e-8)
+            # A série usa constantes arredondadas (-0.0386), que limitam Q a ~2e-5 em unidades de Carson.
+            Z_serie = correcao_carson_serie(self.x, self.h, rho, self.f, ordem=60)
+            escala = (2 * math.pi * self.f * mi_0 / math.pi)[:, np.newaxis, np.newaxis]
+            np.testing.assert_allclose(Z / escala, Z_serie / escala, atol=1e-4)
+
+    def test_limites_de_duas_camadas(self):
+        """Camada superior muito espessa equivale ao solo rho1; muito fina, ao solo rho2."""
+        f = [60.0]
+        Z1 = correcao_solo_multicamadas(self.x, self.h, 100.0, [], f)
+        Z2 = correcao_solo_multicamadas(self.x, self.h, 2000.0, [], f)
+        np.testing.assert_allclose(correcao_solo_multicamadas(self.x, self.h, [100.0, 2000.0], [1e6], f), Z1, rtol=1e-6)
+        np.testing.assert_allclose(correcao_solo_multicamadas(self.x, self.h, [100.0, 2000.0], [1e-3], f), Z2, rtol=1e-4)
+        # Camada intermediária: entre os dois extremos, e diferente deles em dezenas de por cento.
+        Z = correcao_solo_multicamadas(self.x, self.h, [100.0, 2000.0], [200.0], f)
+        self.assertTrue(np.all((Z.imag > Z1.imag) & (Z.imag < Z2.imag)))
+
+    def test_tres_camadas_com_camada_central_igual(self):
+        """Três camadas com duas resistividades iguais equivalem a duas camadas."""
+        Z3 = correcao_solo_multicamadas(self.x, self.h, [100.0, 100.0, 1000.0], [20.0, 30.0], self.f[:3])
+        Z2 = correcao_solo_multicamadas(self.x, self.h, [100.0, 1000.0], [50.0], self.f[:3])
+        np.testing.assert_allclose(Z3, Z2, rtol=1e-9)
+
+    def test_cache_por_solo_e_frequencia(self):
+        """Repetir o mesmo solo e frequência reaproveita os nós do cache."""
+        _nos_em_cache.cache_clear()
+        correcao_solo_multicamadas(self.x, self.h, [100.0, 500.0], [10.0], self.f)
+        faltas = _nos_em_cache.cache_info().misses
+        correcao_solo_multicamadas(self.x, self.h + 1.0, [100.0, 500.0], [10.0], self.f)
+        self.assertEqual(_nos_em_cache.cache_info().misses, faltas)
+        self.assertGreaterEqual(_nos_em_cache.cache_info().hits, len(self.f))
+
+    def test_blocos_e_grupos(self):
+        """Blocos pequenos e a mistura com pares muito afastados não alteram o resultado de cada par."""
+        global TERMOS_POR_BLOCO
+        H = np.array([36.0, 46.0, 56.0, 40.0])
+        X = np.array([0.0, 5.0, 16.0, 2000.0])       # O último par usa uma grade bem mais densa
+        solo = ([100.0, 1000.0], [30.0], [60.0, 1e3])
+        Z = integral_solo_multicamadas(H, X, *solo)
+        np.testing.assert_allclose(Z[:, :3], integral_solo_multicamadas(H[:3], X[:3], *solo), rtol=1e-10)
+        original = TERMOS_POR_BLOCO
+        try:
+            TERMOS_POR_BLOCO = 1
+            np.testing.assert_allclose(integral_solo_multicamadas(H, X, *solo), Z, rtol=1e-14)
+        finally:
+            TERMOS_POR_BLOCO = original
+
+    def test_validacoes(self):
+        """Camadas inválidas devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "exceto a última"):
+            correcao_solo_multicamadas(self.x, self.h, [100.0, 500.0], [], [60.0])
+        with self.assertRaisesRegex(ValueError, "resistividades das camadas"):
+            correcao_solo_multicamadas(self.x, self.h, [100.0, -5.0], [10.0], [60.0])
+        with self.assertRaisesRegex(ValueError, "espessuras das camadas"):
+            correcao_solo_multicamadas(self.x, self.h, [100.0, 500.0], [0.0], [60.0])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
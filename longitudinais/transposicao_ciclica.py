@@ -0,0 +1,136 @@
+import numpy as np
+import unittest
+
+def esquema_transposicao_ciclico(n_secoes=3, n_fases=3, sentido=1):
+    """
+    Gera o esquema de posições de uma transposição cíclica (rotação das fases a cada seção).
+
+    Parâmetros:
+    n_secoes (int, opcional): Número de seções da transposição. Padrão: 3.
+    n_fases (int, opcional): Número de fases que trocam de posição. Padrão: 3.
+    sentido (int, opcional): +1 para avançar uma posição por seção (A na pos1, depois pos2, depois pos3)
+                             ou -1 para recuar (A na pos1, depois pos3, depois pos2).
+
+    Retorna:
+    numpy.ndarray: Array de inteiros (n_secoes, n_fases), em que esquema[k, i] é o índice da posição
+                   física ocupada pela fase i na seção k.
+    """
+    if n_secoes < 1 or n_fases < 1:
+        raise ValueError("ERRO! O número de seções e de fases deve ser pelo menos 1.")
+    if sentido not in (1, -1):
+        raise ValueError("ERRO! O sentido da transposição deve ser +1 ou -1.")
+    return (np.arange(n_fases) + sentido * np.arange(n_secoes)[:, np.newaxis]) % n_fases
+
+def permutar_secoes(M, esquema):
+    """
+    Aplica o operador de permutação de cada seção a uma matriz escrita por posição física.
+
+    Para a seção k, o elemento (i, j) da matriz por fase é M[esquema[k, i], esquema[k, j]].
+    Condutores além das fases do esquema (por exemplo, para-raios) permanecem na mesma posição.
+    Todas as seções são geradas de uma vez por indexação vetorizada, sem recalcular a matriz.
+
+    Parâmetros:
+    M (array_like): Matriz por posição física (N, N) ou pilha (..., N, N) (por exemplo, por frequência).
+    esquema (array_like): Array de inteiros (S, n_fases) com a posição de cada fase em cada seção,
+                          como gerado por `esquema_transposicao_ciclico`.
+
+    Retorna:
+    numpy.ndarray: Pilha (..., S, N, N) com a matriz de cada seção, ordenada por fase.
+
+    Raises:
+    ValueError: Se alguma linha do esquema não for uma permutação das posições das fases.
+    """
+    M = np.asarray(M)
+    indices = _indices_completos(esquema, M.shape[-1])
+    return M[..., indices[:, :, np.newaxis], indices[:, np.newaxis, :]]
+
+def transpor_matriz(M, comprimentos, esquema=None):
+    """
+    Matriz total de uma linha transposta: soma das matrizes das seções ponderada pelos comprimentos.
+
+        M_transp = sum_k l_k * Pi_k^T M Pi_k
+
+    A matriz por posição física é calculada uma única vez; cada seção é apenas uma permutação
+    dela, e a soma ponderada é feita em uma única contração vetorizada. Aceita qualquer número
+    de seções e qualquer esquema de permutação, não apenas a rotação de 3 seções.
+
+    Parâmetros:
+    M (array_like): Matriz por unidade de comprimento, por posição física, (N, N) ou (..., N, N).
+    comprimentos (array_like): Comprimentos das S seções (mesma unidade usada para o total).
+    esquema (array_like, opcional): Array (S, n_fases) com a posição de cada fase em cada seção.
+                                    Padrão: rotação cíclica das 3 primeiras posições.
+
+    Retorna:
+    numpy.ndarray: Matriz total da linha transposta, de forma (N, N) ou (..., N, N).
+
+    Raises:
+    ValueError: Se o número de comprimentos não coincidir com o número de seções do esquema,
+                ou se algum comprimento for negativo.
+    """
+    comprimentos = np.atleast_1d(np.asarray(comprimentos, dtype=float))
+    if esquema is None:
+        esquema = esquema_transposicao_ciclico(len(comprimentos), min(3, np.shape(M)[-1]))
+    esquema = np.atleast_2d(esquema)
+    if esquema.shape[0] != comprimentos.shape[0]:
+        raise ValueError("ERRO! Deve haver um comprimento para cada seção do esquema de transposição.")
+    if np.any(comprimentos < 0):
+        raise ValueError("ERRO! Os comprimentos das seções devem ser não-negativos.")
+
+    M_secoes = permutar_secoes(M, esquema)
+    return np.einsum('s,...sij->...ij', comprimentos, M_secoes)
+
+def _indices_completos(esquema, n):
+    """Completa o esquema das fases com os índices fixos dos demais condutores (S, N)."""
+    esquema = np.atleast_2d(np.asarray(esquema, dtype=int))
+    n_fases = esquema.shape[1]
+    if n_fases > n:
+        raise ValueError("ERRO! O esquema de transposição tem mais fases que condutores na matriz.")
+    if not np.all(np.sort(esquema, axis=1) == np.arange(n_fases)):
+        raise ValueError("ERRO! Cada seção do esquema deve ser uma permutação das posições das fases.")
+    fixos = np.broadcast_to(np.arange(n_fases, n), (esquema.shape[0], n - n_fases))
+    return np.concatenate([esquema, fixos], axis=1)
+
+class TestTransposicaoCiclica(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        A = rng.normal(size=(4, 4)) + 1j * rng.normal(size=(4, 4))
+        self.M = A + A.T # Matriz simétrica 4x4 (3 fases + 1 para-raios)
+
+    def test_esquema_ciclico(self):
+        """Rotação cíclica nos dois sentidos."""
+        np.testing.assert_array_equal(esquema_transposicao_ciclico(3, 3, 1), [[0, 1, 2], [1, 2, 0], [2, 0, 1]])
+        np.testing.assert_array_equal(esquema_transposicao_ciclico(3, 3, -1), [[0, 1, 2], [2, 0, 1], [1, 2, 0]])
+
+    def test_confere_com_permutacao_explicita(self):
+        """A soma vetorizada deve coincidir com a soma das matrizes permutadas uma a uma."""
+        esquema = np.array([[0, 1, 2], [2, 0, 1], [1, 2, 0], [0, 2, 1]])
+        comprimentos = np.array([1.0, 2.0, 3.0, 0.5])
+        esperado = np.zeros((4, 4), dtype=complex)
+        for l, perm in zip(comprimentos, esquema):
+            Pi = np.eye(4)[:, list(perm) + [3]] # Coluna i de Pi é a posição ocupada pela fase i
+            esperado += l * (Pi.T @ self.M @ Pi)
+        np.testing.assert_allclose(transpor_matriz(self.M, comprimentos, esquema), esperado, rtol=1e-14)
+
+    def test_transposicao_completa_equilibra_fases(self):
+        """Com seções iguais de um ciclo completo, as fases ficam com próprias e mútuas iguais."""
+        Z = transpor_matriz(self.M[:3, :3], [1.0, 1.0, 1.0])
+        np.testing.assert_allclose(np.diag(Z), Z[0, 0], rtol=1e-14)
+        np.testing.assert_allclose(Z[[0, 0, 1], [1, 2, 2]], Z[0, 1], rtol=1e-14)
+
+    def test_pilha_de_frequencias(self):
+        """Aceita uma pilha (F, N, N) e trata cada matriz de forma independente."""
+        M = np.stack([self.M, 2 * self.M])
+        Z = transpor_matriz(M, [1.0, 2.0, 3.0])
+        self.assertEqual(Z.shape, (2, 4, 4))
+        np.testing.assert_allclose(Z[1], 2 * Z[0], rtol=1e-14)
+
+    def test_validacoes(self):
+        """Esquemas inválidos e comprimentos inconsistentes devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "deve ser uma permutação"):
+            permutar_secoes(self.M, [[0, 0, 1]])
+        with self.assertRaisesRegex(ValueError, "um comprimento para cada seção"):
+            transpor_matriz(self.M, [1.0, 2.0], esquema_transposicao_ciclico(3))
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
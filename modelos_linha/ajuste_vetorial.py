@@ -0,0 +1,333 @@
+import csv
+import math
+import numpy as np
+import unittest
+
+# Número padrão de iterações de realocação de polos.
+ITERACOES = 10
+
+# Parte imaginária relativa abaixo da qual um polo realocado é considerado real.
+TOLERANCIA_POLO_REAL = 1e-10
+
+class ModeloRacional:
+    """
+    Aproximação racional (polos e resíduos) de uma resposta em frequência matricial:
+
+        H(s) = sum_p R_p / (s - a_p) + D + s E
+
+    Todos os elementos da matriz compartilham os mesmos polos, de modo que um modelo com
+    algumas dezenas de polos substitui os milhares de amostras da varredura em frequência.
+    Polos complexos aparecem em pares conjugados consecutivos (a, a*), com resíduos conjugados.
+
+    Atributos:
+    polos (numpy.ndarray): Polos complexos (P,), todos com parte real negativa (estáveis).
+    residuos (numpy.ndarray): Resíduos complexos (P, ...), com a forma dos elementos ajustados.
+    D (numpy.ndarray): Termo constante real (...).
+    E (numpy.ndarray): Termo proporcional a s real (...), nulo se não foi ajustado.
+    rms (float): Erro RMS do ajuste nas amostras usadas.
+    """
+
+    def __init__(self, polos, residuos, D, E, rms=float('nan')):
+        self.polos = polos
+        self.residuos = residuos
+        self.D = D
+        self.E = E
+        self.rms = rms
+
+    def __repr__(self):
+        return f"ModeloRacional(polos={len(self.polos)}, forma={self.D.shape}, rms={self.rms:.3e})"
+
+    def avaliar(self, frequencias):
+        """
+        Avalia o modelo racional em um vetor de frequências.
+
+        Parâmetros:
+        frequencias (array_like): Vetor de F frequências (Hz).
+
+        Retorna:
+        numpy.ndarray: Array complexo (F, ...) com a resposta do modelo.
+        """
+        s = 2j * math.pi * np.atleast_1d(np.asarray(frequencias, dtype=float))
+        forma = self.D.shape
+        R = self.residuos.reshape(len(self.polos), -1)
+        H = (1 / (s[:, np.newaxis] - self.polos)) @ R + self.D.ravel() + s[:, np.newaxis] * self.E.ravel()
+        return H.reshape((len(s),) + forma)
+
+    def tabela(self):
+        """
+        Tabela compacta de polos e resíduos: uma linha por polo, com os resíduos de cada elemento.
+
+        Pares conjugados aparecem uma única vez (polo com parte imaginária positiva), pois o
+        conjugado é implícito. As linhas 'D' e 'E' trazem os termos constante e proporcional.
+
+        Retorna:
+        list: Lista de dicionários com as colunas 'termo', 'polo_real', 'polo_imag' e, para cada
+              elemento (índices separados por '_'), 'r<indice>_real' e 'r<indice>_imag'.
+        """
+        indices = ['_'.join(str(i) for i in indice) for indice in np.ndindex(self.D.shape)] or ['0']
+        R = self.residuos.reshape(len(self.polos), -1)
+        linhas = []
+        for p, polo in enumerate(self.polos):
+            if polo.imag < 0:
+                continue
+            linha = {'termo': 'polo', 'polo_real': polo.real, 'polo_imag': polo.imag}
+            for indice, r in zip(indices, R[p]):
+                linha[f'r{indice}_real'] = r.real
+                linha[f'r{indice}_imag'] = r.imag
+            linhas.append(linha)
+        for termo, valores in (('D', self.D), ('E', self.E)):
+            linha = {'termo': termo, 'polo_real': '', 'polo_imag': ''}
+            for indice, v in zip(indices, np.ravel(valores)):
+                linha[f'r{indice}_real'] = v
+                linha[f'r{indice}_imag'] = 0.0
+            linhas.append(linha)
+        return linhas
+
+    def gravar_csv(self, caminho):
+        """Grava a tabela de polos e resíduos (ver `tabela`) em um arquivo CSV."""
+        linhas = self.tabela()
+        with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=list(linhas[0]))
+            escritor.writeheader()
+            escritor.writerows(linhas)
+
+def ajuste_vetorial(frequencias, H, n_polos=12, iteracoes=ITERACOES, termo_proporcional=False,
+                    polos_iniciais=None, peso=None):
+    """
+    Ajuste vetorial (vector fitting, Gustavsen e Semlyen) de uma resposta em frequência matricial.
+
+    Em cada iteração, os polos são realocados como os zeros da função de ponderação sigma(s),
+    obtida por mínimos quadrados com todos os elementos da matriz ao mesmo tempo (formulação
+    rápida: uma fatoração QR em lote por elemento e um único sistema para sigma). Polos instáveis
+    são refletidos para o semiplano esquerdo. Por fim, os resíduos de todos os elementos são
+    obtidos por um único mínimos quadrados com os polos fixos.
+
+    Pode ser aplicado, por exemplo, às pilhas (F, 3, 3) de `Metodo_Carson_long_varredura` e de
+    `metodo_carson_para_raio_varredura` (fases com os para-raios eliminados por Kron em cada
+    frequência), às pilhas (F, N, N) de `metodo_carson_n_condutores_varredura` (ou à sua redução
+    por `reducao_kron`) ou à admitância característica.
+    Funções de propagação devem ter o atraso de propagação removido antes do ajuste.
+
+    Parâmetros:
+    frequencias (array_like): Vetor de F frequências (Hz), positivas.
+    H (array_like): Amostras complexas (F, ...) da resposta (por exemplo (F, N, N)).
+    n_polos (int, opcional): Número de polos do modelo. Padrão: 12.
+    iteracoes (int, opcional): Número de iterações de realocação de polos.
+    termo_proporcional (bool, opcional): Se True, ajusta também o termo s*E (por exemplo, a
+                                         parte indutiva de Z). Padrão: False.
+    polos_iniciais (array_like, opcional): Polos iniciais (pares conjugados consecutivos). Se omitidos,
+                                           são usados pares complexos com partes imaginárias
+                                           distribuídas logaritmicamente na faixa de frequências.
+    peso (array_like ou str, opcional): Peso (F,) de cada frequência no mínimos quadrados, ou
+                                        'relativo' para 1/||H(f)|| (erro relativo uniforme na faixa,
+                                        recomendado para impedâncias de Carson). Padrão: uniforme.
+
+    Retorna:
+    ModeloRacional: Modelo com os polos, resíduos, D, E e o erro RMS do ajuste.
+
+    Raises:
+    ValueError: Se as frequências ou o número de polos forem inválidos.
+    """
+    frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+    H = np.asarray(H, dtype=complex)
+    if frequencias.ndim != 1 or H.shape[0] != frequencias.shape[0]:
+        raise ValueError("ERRO! A primeira dimensão de H deve corresponder ao vetor de frequências.")
+    if np.any(frequencias <= 0):
+        raise ValueError("ERRO! As frequências (f) devem ser valores positivos.")
+    if n_polos < 1:
+        raise ValueError("ERRO! O número de polos deve ser pelo menos 1.")
+
+    s = 2j * math.pi * frequencias
+    forma = H.shape[1:]
+    Hm = H.reshape(len(s), -1) # (F, M)
+    if peso is None:
+        peso = np.ones(len(s))
+    elif isinstance(peso, str) and peso == 'relativo':
+        peso = 1 / np.maximum(np.linalg.norm(Hm, axis=1), np.finfo(float).tiny)
+    else:
+        peso = np.asarray(peso, dtype=float)
+
+    polos = _polos_iniciais(frequencias, n_polos) if polos_iniciais is None else _ordenar_polos(polos_iniciais)
+    for _ in range(iteracoes):
+        polos = _realocar_polos(s, Hm, polos, termo_proporcional, peso)
+
+    residuos, D, E = _identificar_residuos(s, Hm, polos, termo_proporcional, peso)
+    modelo = ModeloRacional(polos, residuos.reshape((len(polos),) + forma), D.reshape(forma), E.reshape(forma))
+    modelo.rms = float(np.sqrt(np.mean(np.abs(modelo.avaliar(frequencias) - H)**2)))
+    return modelo
+
+def verificar_passividade(modelo, frequencias):
+    """
+    Verifica a passividade de um modelo racional matricial (admitância ou impedância).
+
+    O modelo é passivo na frequência f se a parte hermitiana G = (H + H^H)/2 for semidefinida
+    positiva, isto é, se o menor autovalor de G for não negativo. Violações indicam que o modelo
+    pode gerar energia numa simulação no domínio do tempo e deve ser corrigido (mais polos,
+    outra ponderação ou imposição de passividade).
+
+    Parâmetros:
+    modelo (ModeloRacional): Modelo com elementos (N, N).
+    frequencias (array_like): Frequências (Hz) onde a passividade é verificada, de preferência
+                              uma grade mais densa que a usada no ajuste.
+
+    Retorna:
+    tuple: (passivo, autovalor_minimo), com passivo (bool) e autovalor_minimo (F,) o menor
+           autovalor de G em cada frequência.
+    """
+    H = modelo.avaliar(frequencias)
+    if H.ndim != 3 or H.shape[-1] != H.shape[-2]:
+        raise ValueError("ERRO! A verificação de passividade exige um modelo matricial quadrado (N, N).")
+    G = (H + np.conj(np.swapaxes(H, -1, -2))) / 2
+    autovalor_minimo = np.linalg.eigvalsh(G)[..., 0]
+    estavel = np.all(modelo.polos.real < 0)
+    return bool(estavel and np.all(autovalor_minimo >= 0)), autovalor_minimo
+
+def _polos_iniciais(frequencias, n_polos):
+    """Pares complexos com beta log-espaçado na faixa e alfa = beta/100 (mais um polo real se ímpar)."""
+    w_min, w_max = 2 * math.pi * frequencias.min(), 2 * math.pi * frequencias.max()
+    beta = np.logspace(math.log10(w_min), math.log10(w_max), n_polos // 2)
+    polos = np.ravel(np.column_stack([-beta / 100 + 1j * beta, -beta / 100 - 1j * beta]))
+    if n_polos % 2:
+        polos = np.append(polos, -w_min)
+    return polos
+
+def _ordenar_polos(polos):
+    """Organiza os polos como reais e pares conjugados consecutivos (parte imaginária positiva primeiro)."""
+    polos = np.asarray(polos, dtype=complex)
+    escala = np.maximum(np.abs(polos), np.finfo(float).tiny)
+    reais = polos[np.abs(polos.imag) <= TOLERANCIA_POLO_REAL * escala].real
+    complexos = polos[polos.imag > TOLERANCIA_POLO_REAL * escala]
+    pares = np.ravel(np.column_stack([complexos, complexos.conj()]))
+    return np.concatenate([reais.astype(complex), pares])
+
+def _base(s, polos):
+    """
+    Funções de base (F, P) com coeficientes reais: 1/(s-a) para polos reais e, para cada par
+    (a, a*), 1/(s-a) + 1/(s-a*) e j/(s-a) - j/(s-a*).
+    """
+    Phi = 1 / (s[:, np.newaxis] - polos)
+    complexo = polos.imag > 0
+    p = np.flatnonzero(complexo)
+    Phi_par = Phi[:, p] + Phi[:, p + 1], 1j * (Phi[:, p] - Phi[:, p + 1])
+    Phi[:, p], Phi[:, p + 1] = Phi_par
+    return Phi
+
+def _real(M):
+    """Empilha partes real e imaginária das linhas: (F, ...) complexo -> (2F, ...) real."""
+    return np.concatenate([M.real, M.imag], axis=0)
+
+def _termos_fixos(s, termo_proporcional):
+    return np.column_stack([np.ones_like(s), s]) if termo_proporcional else np.ones_like(s)[:, np.newaxis]
+
+def _realocar_polos(s, Hm, polos, termo_proporcional, peso):
+    """Uma iteração de realocação de polos (zeros de sigma), com a formulação rápida por QR."""
+    P = len(polos)
+    Phi = _base(s, polos)
+    A_comum = np.column_stack([Phi, _termos_fixos(s, termo_proporcional)]) # (F, K)
+    K = A_comum.shape[1]
+
+    # Sistema de cada elemento m: [Phi, 1, s | -H_m Phi] [c_m; d_m; e_m; c_sigma] = H_m
+    A = np.concatenate([np.broadcast_to(A_comum, (Hm.shape[1],) + A_comum.shape),
+                        -Hm.T[:, :, np.newaxis] * Phi], axis=-1)       # (M, F, K + P)
+    A = _real(np.moveaxis(A, 0, 1) * peso[:, np.newaxis, np.newaxis])  # (2F, M, K + P)
+    b = _real(Hm * peso[:, np.newaxis])                                 # (2F, M)
+    A = np.moveaxis(A, 1, 0)                                            # (M, 2F, K + P)
+
+    # Escala das colunas: as de cada elemento (c_m, d_m, e_m) por elemento; as de sigma, comuns a
+    # todos os elementos, por uma escala única, pois a incógnita c_sigma é compartilhada.
+    escala = np.linalg.norm(A, axis=1, keepdims=True)
+    escala[..., K:] = np.linalg.norm(A[..., K:], axis=(0, 1))
+    escala[escala == 0] = 1.0
+    Q, R = np.linalg.qr(A / escala)
+    Qb = np.einsum('mfk,fm->mk', Q, b)
+    R22 = R[:, K:, K:].reshape(-1, P)
+    c_sigma = np.linalg.lstsq(R22, Qb[:, K:].ravel(), rcond=None)[0] / escala[0, 0, K:]
+
+    # Zeros de sigma(s) = 1 + Phi c_sigma: autovalores de (Lambda - b c_sigma^T), em forma real.
+    Lambda = np.diag(polos.real)
+    b_vetor = np.ones(P)
+    for p in np.flatnonzero(polos.imag > 0):
+        Lambda[p, p + 1], Lambda[p + 1, p] = polos[p].imag, -polos[p].imag
+        b_vetor[p], b_vetor[p + 1] = 2.0, 0.0
+    novos = np.linalg.eigvals(Lambda - np.outer(b_vetor, c_sigma))
+    novos = np.where(novos.real > 0, -novos.real + 1j * novos.imag, novos) # Reflete polos instáveis.
+    return _ordenar_polos(novos)
+
+def _identificar_residuos(s, Hm, polos, termo_proporcional, peso):
+    """Resíduos (P, M) complexos, D (M,) e E (M,) por um único mínimos quadrados com os polos fixos."""
+    P = len(polos)
+    A = _real(np.column_stack([_base(s, polos), _termos_fixos(s, termo_proporcional)]) * peso[:, np.newaxis])
+    escala = np.linalg.norm(A, axis=0)
+    x = np.linalg.lstsq(A / escala, _real(Hm * peso[:, np.newaxis]), rcond=None)[0] / escala[:, np.newaxis]
+
+    residuos = x[:P].astype(complex)
+    p = np.flatnonzero(polos.imag > 0)
+    residuos[p], residuos[p + 1] = x[p] + 1j * x[p + 1], x[p] - 1j * x[p + 1]
+    D = x[P]
+    E = x[P + 1] if termo_proporcional else np.zeros_like(D)
+    return residuos, D, E
+
+class TestAjusteVetorial(unittest.TestCase):
+
+    def setUp(self):
+        self.frequencias = np.logspace(0, 6, 200)
+        s = 2j * math.pi * self.frequencias[:, np.newaxis, np.newaxis]
+        # Resposta racional conhecida (2x2): um polo real e um par complexo, com D e E.
+        self.polos = np.array([-2e3, -5e2 + 3e4j, -5e2 - 3e4j])
+        R = np.array([[[1e3, 2e2], [2e2, 8e2]],
+                      [[5e3 + 1e3j, 1e3], [1e3, 4e3 - 2e3j]],
+                      [[5e3 - 1e3j, 1e3], [1e3, 4e3 + 2e3j]]])
+        self.H = sum(R[p] / (s - self.polos[p]) for p in range(3)) + np.array([[2.0, 0.5], [0.5, 3.0]]) \
+            + s * np.array([[1e-4, 2e-5], [2e-5, 1e-4]])
+
+    def test_recupera_funcao_racional(self):
+        """Com o número exato de polos, o ajuste recupera os polos e reproduz a resposta."""
+        modelo = ajuste_vetorial(self.frequencias, self.H, n_polos=3, termo_proporcional=True)
+        np.testing.assert_allclose(np.sort_complex(modelo.polos), np.sort_complex(self.polos), rtol=1e-8)
+        np.testing.assert_allclose(modelo.avaliar(self.frequencias), self.H, rtol=1e-8)
+        self.assertLess(modelo.rms, 1e-8)
+        self.assertTrue(np.all(modelo.polos.real < 0))
+
+    def test_impedancia_de_carson(self):
+        """Uma varredura de Carson (modelo 'serie') é reproduzida com poucas dezenas de polos."""
+        from longitudinais.Carson_n_condutores import metodo_carson_n_condutores_varredura
+        Z = metodo_carson_n_condutores_varredura([5e-5] * 3, [-8.0, 0.0, 8.0], [20.0, 20.0, 20.0], 100.0,
+                                                 self.frequencias, R=0.015, modelo_solo='serie')
+        modelo = ajuste_vetorial(self.frequencias, Z, n_polos=16, termo_proporcional=True, peso='relativo')
+        erro = np.abs(modelo.avaliar(self.frequencias) - Z) / np.abs(Z)
+        self.assertLess(erro.max(), 1e-3)
+        passivo, autovalor_minimo = verificar_passividade(modelo, np.logspace(0, 6, 1000))
+        self.assertEqual(autovalor_minimo.shape, (1000,))
+        self.assertTrue(passivo)
+
+    def test_impedancia_reduzida_por_kron(self):
+        """A impedância de fase com para-raios eliminados por Kron também é ajustada com poucos polos."""
+        from longitudinais.Carson_pr import metodo_carson_para_raio_varredura
+        Z = metodo_carson_para_raio_varredura(5e-5, 5e-5, 5e-5, 3e-4, -8.0, 0.0, 8.0, 0.0, 20.0, 20.0, 20.0, 30.0,
+                                              100.0, self.frequencias, R=0.015, modelo_solo='serie')
+        self.assertEqual(Z.shape, (200, 3, 3))
+        modelo = ajuste_vetorial(self.frequencias, Z, n_polos=16, termo_proporcional=True, peso='relativo')
+        erro = np.abs(modelo.avaliar(self.frequencias) - Z) / np.abs(Z)
+        self.assertLess(erro.max(), 2e-3)
+        self.assertTrue(verificar_passividade(modelo, np.logspace(0, 6, 1000))[0])
+
+    def test_tabela_e_passividade(self):
+        """A tabela traz um polo por par conjugado e as linhas D e E; detecta modelo não passivo."""
+        modelo = ajuste_vetorial(self.frequencias, self.H, n_polos=3, termo_proporcional=True)
+        tabela = modelo.tabela()
+        self.assertEqual([linha['termo'] for linha in tabela], ['polo', 'polo', 'D', 'E'])
+        self.assertIn('r1_0_imag', tabela[0])
+        passivo, _ = verificar_passividade(modelo, self.frequencias)
+        self.assertTrue(passivo)
+        modelo.D = -10 * np.eye(2)
+        self.assertFalse(verificar_passividade(modelo, self.frequencias)[0])
+
+    def test_validacoes(self):
+        """Entradas inválidas devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "corresponder ao vetor de frequências"):
+            ajuste_vetorial(self.frequencias[:-1], self.H)
+        with self.assertRaisesRegex(ValueError, "pelo menos 1"):
+            ajuste_vetorial(self.frequencias, self.H, n_polos=0)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,195 @@
+import math
+import numpy as np
+import unittest
+
+from longitudinais.geometria import PERMISSIVIDADE_VACUO
+from longitudinais.profundidade_complexa import profundidade_complexa
+
+E_0 = PERMISSIVIDADE_VACUO  # Permissividade do vácuo (F/m)
+MI_0 = 4 * math.pi * 10**(-7)  # Permeabilidade magnética do vácuo (H/m)
+
+# Altura padrão dos pontos de observação (metros), usada nos limites de exposição.
+ALTURA_OBSERVACAO = 1.0
+
+def campo_eletrico(x, h, q, px, py=ALTURA_OBSERVACAO):
+    """
+    Campo elétrico (fasores Ex, Ey) produzido pelas cargas dos condutores e suas imagens no solo.
+
+    Cada condutor i, com carga de linha q_i em (x_i, h_i), e sua imagem -q_i em (x_i, -h_i)
+    contribuem com
+
+        E = q_i / (2 pi E_0) * [(r - r_i)/|r - r_i|^2 - (r - r_i')/|r - r_i'|^2].
+
+    Todos os pontos de observação e condutores (e vários projetos, nos eixos iniciais) são
+    combinados em uma única operação de broadcast, sem laço em Python por ponto.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas (..., N) dos condutores (metros).
+    q (array_like): Cargas (..., N) dos condutores (C/m), por exemplo C @ V com a matriz de
+                    `metodo_imagem_tran`. Fasores eficazes resultam em campos eficazes.
+    px (array_like): Posições horizontais dos pontos de observação, grade (M,) ou (M, K) (metros).
+    py (float ou array_like, opcional): Alturas dos pontos de observação, com broadcast contra px.
+                                        Padrão: ALTURA_OBSERVACAO.
+
+    Retorna:
+    tuple: (Ex, Ey), arrays complexos (..., *forma_da_grade) em V/m.
+    """
+    dx, dy, dy_imagem, fonte = _diferencas(x, h, q, px, py)
+    Ex = (fonte * (dx / (dx**2 + dy**2) - dx / (dx**2 + dy_imagem**2))).sum(axis=-1)
+    Ey = (fonte * (dy / (dx**2 + dy**2) - dy_imagem / (dx**2 + dy_imagem**2))).sum(axis=-1)
+    return Ex / (2 * math.pi * E_0), Ey / (2 * math.pi * E_0)
+
+def campo_magnetico(x, h, I, px, py=ALTURA_OBSERVACAO, rho=None, f=60.0):
+    """
+    Densidade de fluxo magnético (fasores Bx, By) produzida pelas correntes dos condutores.
+
+    Uma corrente I_i no sentido +z em (x_i, h_i) produz B = mi_0 I_i / (2 pi) * (-dy, dx)/d^2.
+    Sem resistividade do solo, a corrente de retorno é desprezada (correntes equilibradas). Com
+    'rho', o retorno pelo solo é representado por uma imagem -I_i à profundidade complexa
+    h_i + 2p, p = sqrt(rho / (j w mi_0)), como em `correcao_profundidade_complexa`.
+
+    Parâmetros:
+    x, h (array_like): Coordenadas (..., N) dos condutores (metros).
+    I (array_like): Correntes (..., N) dos condutores (A), fasores (eficazes) ou valores reais.
+    px (array_like): Posições horizontais dos pontos de observação, grade (M,) ou (M, K) (metros).
+    py (float ou array_like, opcional): Alturas dos pontos de observação. Padrão: ALTURA_OBSERVACAO.
+    rho (float, opcional): Resistividade do solo (Ohm.m) para o retorno pelo solo. Padrão: None.
+    f (float, opcional): Frequência (Hz), usada com 'rho'. Padrão: 60 Hz.
+
+    Retorna:
+    tuple: (Bx, By), arrays complexos (..., *forma_da_grade) em T.
+
+    Raises:
+    ValueError: Se rho ou f não forem positivos.
+    """
+    dx, dy, _, fonte = _diferencas(x, h, I, px, py)
+    Bx = (fonte * -dy / (dx**2 + dy**2)).sum(axis=-1)
+    By = (fonte * dx / (dx**2 + dy**2)).sum(axis=-1)
+    if rho is not None:
+        if rho <= 0 or f <= 0:
+            raise ValueError("ERRO! A resistividade do solo (rho) e a frequência (f) devem ser positivas.")
+        p = profundidade_complexa(rho, f)
+        dx, _, dy_imagem, fonte = _diferencas(x, np.asarray(h) + 2 * p, I, px, py)
+        Bx = Bx + (fonte * dy_imagem / (dx**2 + dy_imagem**2)).sum(axis=-1)
+        By = By - (fonte * dx / (dx**2 + dy_imagem**2)).sum(axis=-1)
+    return MI_0 / (2 * math.pi) * Bx, MI_0 / (2 * math.pi) * By
+
+def valor_resultante(Fx, Fy):
+    """
+    Valor resultante de um campo com componentes fasoriais: sqrt(|Fx|^2 + |Fy|^2).
+
+    Com fasores eficazes, é o valor eficaz resultante usado nos limites de exposição (o campo de
+    uma linha trifásica é elipticamente polarizado).
+    """
+    return np.sqrt(np.abs(Fx)**2 + np.abs(Fy)**2)
+
+def perfis_campos(x, h, C, V, I, px, py=ALTURA_OBSERVACAO, rho=None, f=60.0):
+    """
+    Perfis de campo elétrico e magnético resultantes sob a linha.
+
+    As cargas vêm da matriz de capacitâncias e das tensões aplicadas (q = C V) e as correntes
+    são as dos condutores (fases e, se houver, correntes induzidas nos para-raios).
+
+    Parâmetros:
+    x, h (array_like): Coordenadas (..., N) dos condutores (metros).
+    C (array_like): Matriz de capacitâncias (..., N, N) em F/m (por exemplo, de `metodo_imagem_tran`).
+    V (array_like): Tensões (..., N) fase-terra dos condutores (V).
+    I (array_like): Correntes (..., N) dos condutores (A).
+    px, py: Grade de observação, como em `campo_eletrico`.
+    rho, f: Retorno pelo solo para o campo magnético, como em `campo_magnetico`.
+
+    Retorna:
+    tuple: (E, B), valores resultantes (..., *forma_da_grade) em kV/m e em uT.
+    """
+    q = np.einsum('...ij,...j->...i', np.asarray(C), np.asarray(V))
+    E = valor_resultante(*campo_eletrico(x, h, q, px, py))
+    B = valor_resultante(*campo_magnetico(x, h, I, px, py, rho=rho, f=f))
+    return E * 1e-3, B * 1e6
+
+def _diferencas(x, h, fonte, px, py):
+    """
+    Diferenças (..., *grade, N) entre os pontos de observação e os condutores, a diferença
+    vertical para as imagens (py + h) e a fonte (carga ou corrente) com a mesma forma.
+    """
+    px, py = np.broadcast_arrays(np.asarray(px, dtype=float), np.asarray(py, dtype=float))
+    x, h, fonte = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(h), np.asarray(fonte))
+    eixos = (np.newaxis,) * px.ndim
+    lead = (Ellipsis,) + eixos + (slice(None),)
+    dx = px[..., np.newaxis] - x[lead]
+    dy = py[..., np.newaxis] - h[lead]
+    dy_imagem = py[..., np.newaxis] + h[lead]
+    if np.any((dx == 0) & (dy == 0)):
+        raise ValueError("ERRO! Um ponto de observação coincide com um condutor.")
+    return dx, dy, dy_imagem, fonte[lead]
+
+class TestCampos(unittest.TestCase):
+
+    def setUp(self):
+        # Linha trifásica horizontal de 500 kV, 2 kA por fase.
+        self.x = np.array([-10.0, 0.0, 10.0])
+        self.h = np.array([15.0, 15.0, 15.0])
+        a = np.exp(2j * np.pi / 3)
+        self.seq = np.array([1, a**2, a])
+        self.V = 500e3 / np.sqrt(3) * self.seq
+        self.I = 2000 * self.seq
+        self.px = np.linspace(-60, 60, 2001)
+
+    def test_condutor_unico_no_solo(self):
+        """No solo, sob um condutor, Ey = -q / (pi E_0 h) e Ex = 0."""
+        q = 1e-6
+        Ex, Ey = campo_eletrico([0.0], [10.0], [q], [0.0], 0.0)
+        np.testing.assert_allclose(Ex, 0.0, atol=1e-12)
+        np.testing.assert_allclose(Ey, -q / (math.pi * E_0 * 10.0), rtol=1e-12)
+
+    def test_lei_de_ampere(self):
+        """Sem retorno pelo solo, |B| = mi_0 I / (2 pi d) em torno de um condutor."""
+        theta = np.linspace(0, 2 * np.pi, 7)
+        Bx, By = campo_magnetico([0.0], [20.0], [100.0], 3 * np.cos(theta), 20 + 3 * np.sin(theta))
+        np.testing.assert_allclose(valor_resultante(Bx, By), MI_0 * 100 / (2 * math.pi * 3), rtol=1e-12)
+        # B perpendicular ao raio
+        np.testing.assert_allclose((Bx * np.cos(theta) + By * np.sin(theta)).real, 0.0, atol=1e-18)
+
+    def test_perfis_trifasicos(self):
+        """Perfis simétricos, máximos próximos à linha e decaimento de B com 1/d^2 longe dela."""
+        from Transversais.imagem import metodo_imagem_tran
+        C = metodo_imagem_tran(*self.x, *self.h, 0.0254)
+        E, B = perfis_campos(self.x, self.h, C, self.V, self.I, self.px)
+        self.assertEqual(E.shape, (2001,))
+        np.testing.assert_allclose(E, E[::-1], rtol=1e-9)
+        np.testing.assert_allclose(B, B[::-1], rtol=1e-9)
+        self.assertTrue(2 < E.max() < 15)             # kV/m
+        self.assertTrue(20 < B.max() < 100)           # uT
+        razao = B[np.searchsorted(self.px, 30.0)] / B[np.searchsorted(self.px, 60.0)]
+        self.assertAlmostEqual(razao, 4.0, delta=0.6)
+
+    def test_grade_e_projetos(self):
+        """Grade (M, K) e vários projetos em uma única chamada coincidem com chamadas isoladas."""
+        px, py = np.meshgrid(np.linspace(-40, 40, 50), [0.0, 1.0, 2.0], indexing='ij')
+        alturas = np.array([12.0, 15.0, 20.0])[:, None] * np.ones(3)
+        q = 1e-6 * self.seq
+        Ex, Ey = campo_eletrico(self.x, alturas, q, px, py)
+        self.assertEqual(Ex.shape, (3, 50, 3))
+        for k in range(3):
+            Ex_k, Ey_k = campo_eletrico(self.x, alturas[k], q, px, py)
+            np.testing.assert_allclose(Ex[k], Ex_k, rtol=1e-12)
+            np.testing.assert_allclose(Ey[k], Ey_k, rtol=1e-12)
+
+    def test_retorno_pelo_solo(self):
+        """O retorno pelo solo reduz o campo a distâncias maiores que |p| e some com solo muito resistivo."""
+        I = [100.0]  # Corrente de sequência zero, que retorna pelo solo
+        longe = np.array([3000.0, 10000.0])  # |p| ~ 460 m para 100 Ohm.m e 60 Hz
+        B_ar = valor_resultante(*campo_magnetico([0.0], [15.0], I, self.px))
+        B_solo = valor_resultante(*campo_magnetico([0.0], [15.0], I, longe, rho=100.0))
+        self.assertTrue(np.all(B_solo < 0.5 * MI_0 * 100 / (2 * math.pi * longe)))
+        B_resistivo = valor_resultante(*campo_magnetico([0.0], [15.0], I, [0.0], rho=1e12))
+        np.testing.assert_allclose(B_resistivo, B_ar[1000], rtol=1e-3)
+        with self.assertRaisesRegex(ValueError, "devem ser positivas"):
+            campo_magnetico([0.0], [15.0], I, self.px, rho=-1.0)
+
+    def test_ponto_sobre_condutor(self):
+        """Ponto de observação sobre um condutor deve levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "coincide com um condutor"):
+            campo_eletrico(self.x, self.h, self.seq, [0.0], 15.0)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
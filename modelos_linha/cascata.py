@@ -0,0 +1,195 @@
+import math
+import numpy as np
+import unittest
+
+from modelos_linha.linha_longa import LinhaLonga
+
+def produto_cascata(M):
+    """
+    Produto ordenado M[0] @ M[1] @ ... @ M[S-1] de uma pilha de matrizes, por redução em árvore.
+
+    Em cada nível, os pares vizinhos (0, 1), (2, 3), ... são multiplicados de uma só vez por um
+    único `matmul` sobre a pilha, e uma matriz ímpar no fim passa para o nível seguinte sem
+    alteração. São ceil(log2(S)) níveis vetorizados, em vez de S - 1 multiplicações em um laço
+    Python, e os eixos finais (frequências, casos) são multiplicados juntos em cada nível.
+
+    Parâmetros:
+    M (array_like): Pilha (S, ..., K, K) de matrizes (por exemplo, ABCD 2N x 2N por segmento e
+                    por frequência), na ordem do envio para a recepção.
+
+    Retorna:
+    numpy.ndarray: Produto (..., K, K).
+
+    Raises:
+    ValueError: Se a pilha estiver vazia ou as matrizes não forem quadradas.
+    """
+    M = np.asarray(M)
+    _validar_pilha(M)
+    while M.shape[0] > 1:
+        pares = M.shape[0] // 2 * 2
+        produto = M[0:pares:2] @ M[1:pares:2]
+        M = produto if pares == M.shape[0] else np.concatenate([produto, M[pares:]])
+    return M[0]
+
+def prefixos_cascata(M):
+    """
+    Todos os produtos parciais P[k] = M[0] @ ... @ M[k] de uma pilha, por varredura paralela de prefixos.
+
+    Varredura de Hillis-Steele: no passo d = 1, 2, 4, ..., P[k] <- P[k - d] @ P[k] para todo
+    k >= d, em um único `matmul` sobre a pilha. São ceil(log2(S)) passos. Com matrizes ABCD,
+    P[k] relaciona o envio ao fim do segmento k: [V_0; I_0] = P[k] @ [V_(k+1); I_(k+1)], o que
+    permite obter os perfis de tensão e corrente ao longo da rota.
+
+    Parâmetros:
+    M (array_like): Pilha (S, ..., K, K) de matrizes, na ordem do envio para a recepção.
+
+    Retorna:
+    numpy.ndarray: Pilha (S, ..., K, K) com os produtos parciais; P[-1] é `produto_cascata(M)`.
+
+    Raises:
+    ValueError: Se a pilha estiver vazia ou as matrizes não forem quadradas.
+    """
+    P = np.array(M)
+    _validar_pilha(P)
+    d = 1
+    while d < P.shape[0]:
+        P[d:] = P[:-d] @ P[d:]
+        d *= 2
+    return P
+
+def abcd_segmentos(Z, Y, comprimentos, modos=None):
+    """
+    Matrizes ABCD (2N x 2N) exatas de cada segmento de uma linha não uniforme.
+
+    Parâmetros:
+    Z, Y (array_like): Pilhas (S, ..., N, N) de impedâncias e admitâncias por unidade de comprimento
+                       de cada segmento (por exemplo, (S, F, N, N) de uma varredura em frequência).
+    comprimentos (array_like): Comprimentos (S,) dos segmentos, na unidade de Z e Y.
+    modos (tuple, opcional): Decomposição (T, gamma) de ZY já calculada, como em `LinhaLonga`.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (S, ..., 2N, 2N) com as matrizes [[A, B], [C, D]].
+
+    Raises:
+    ValueError: Se o número de comprimentos não for o número de segmentos, ou se algum
+                comprimento não for positivo.
+    """
+    linha = LinhaLonga(Z, Y, modos)
+    comprimentos = np.atleast_1d(np.asarray(comprimentos, dtype=float))
+    if linha.Z.ndim < 3 or comprimentos.shape != linha.Z.shape[:1]:
+        raise ValueError("ERRO! É necessário um comprimento para cada segmento da linha.")
+    return linha.abcd(comprimentos.reshape(comprimentos.shape + (1,) * (linha.Z.ndim - 3)))
+
+def abcd_linha_segmentada(linha, G=None, prefixos=False):
+    """
+    Matriz ABCD da linha inteira (ou de cada trecho desde o envio) de uma `LinhaSegmentada`.
+
+    A decomposição modal (autovalores de ZY) é feita apenas para as assinaturas distintas
+    (estrutura, rho, transposição) e reaproveitada em todos os segmentos com a mesma assinatura;
+    as ABCD dos S segmentos e de todas as frequências são então montadas de uma vez e
+    encadeadas por `produto_cascata` (ou `prefixos_cascata`). Diferente da soma das matrizes
+    ponderada pelos comprimentos (`LinhaSegmentada.totais`), o encadeamento é exato para
+    segmentos com parâmetros distintos, inclusive em altas frequências.
+
+    A pilha intermediária tem S x F matrizes 2N x 2N complexas (cerca de 290 MB para 5000
+    segmentos, 100 frequências e N = 3); para varreduras maiores, divida as frequências em blocos.
+
+    Parâmetros:
+    linha (LinhaSegmentada): Linha com a tabela de segmentos e as frequências.
+    G (array_like, opcional): Condutância transversal (n, n) por unidade de comprimento (S/m). Padrão: nula.
+    prefixos (bool, opcional): Se True, retorna os produtos desde o envio até o fim de cada segmento.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (F, 2n, 2n) da linha inteira ou, com prefixos, (S, F, 2n, 2n).
+    """
+    Z_u, C_u = linha.parametros_assinaturas()
+    w = 2 * math.pi * linha.frequencias[:, np.newaxis, np.newaxis]
+    Y_u = 1j * w * C_u[:, np.newaxis]                          # (U, F, n, n)
+    if G is not None:
+        Y_u = Y_u + np.asarray(G, dtype=float)
+    unicas = LinhaLonga(Z_u, Y_u)
+    i = linha.indices
+    M = abcd_segmentos(Z_u[i], Y_u[i], linha.comprimentos, modos=(unicas.T[i], unicas.gamma[i]))
+    return prefixos_cascata(M) if prefixos else produto_cascata(M)
+
+def _validar_pilha(M):
+    if M.ndim < 3 or M.shape[0] == 0 or M.shape[-1] != M.shape[-2]:
+        raise ValueError("ERRO! É necessária uma pilha não vazia (S, ..., K, K) de matrizes quadradas.")
+
+class TestCascata(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.M = rng.standard_normal((37, 4, 6, 6)) + 1j * rng.standard_normal((37, 4, 6, 6))
+        self.M /= np.linalg.norm(self.M, axis=(-2, -1), keepdims=True)
+
+    def test_arvore_igual_laco_sequencial(self):
+        """A redução em árvore preserva a ordem do produto para qualquer S (par ou ímpar)."""
+        for S in (1, 2, 3, 8, 37):
+            esperado = self.M[0]
+            for k in range(1, S):
+                esperado = esperado @ self.M[k]
+            np.testing.assert_allclose(produto_cascata(self.M[:S]), esperado, rtol=1e-10, atol=1e-14)
+
+    def test_prefixos(self):
+        """Cada prefixo é o produto ordenado dos segmentos até ele."""
+        P = prefixos_cascata(self.M)
+        for k in (0, 1, 5, 36):
+            np.testing.assert_allclose(P[k], produto_cascata(self.M[:k + 1]), rtol=1e-10, atol=1e-14)
+        self.assertFalse(np.shares_memory(P, self.M))
+
+    def test_linha_uniforme(self):
+        """S segmentos iguais encadeados equivalem à ABCD da linha com o comprimento total."""
+        from modelos_linha.linha_longa import admitancia_transversal
+        frequencias = np.array([60.0, 1e3, 1e4])
+        Z = np.array([[0.08 + 0.60j, 0.05 + 0.25j, 0.05 + 0.20j],
+                      [0.05 + 0.25j, 0.08 + 0.60j, 0.05 + 0.25j],
+                      [0.05 + 0.20j, 0.05 + 0.25j, 0.08 + 0.60j]]) * 1e-3 * (frequencias[:, None, None] / 60.0)
+        C = np.array([[12.0, -2.0, -1.0], [-2.0, 12.5, -2.0], [-1.0, -2.0, 12.0]]) * 1e-12
+        Y = admitancia_transversal(C, frequencias)
+        S = 300
+        M = abcd_segmentos(np.broadcast_to(Z, (S,) + Z.shape), np.broadcast_to(Y, (S,) + Y.shape), np.full(S, 500.0))
+        self.assertEqual(M.shape, (S, 3, 6, 6))
+        np.testing.assert_allclose(produto_cascata(M), LinhaLonga(Z, Y).abcd(S * 500.0), rtol=1e-8, atol=1e-10)
+
+    def test_linha_segmentada(self):
+        """Milhares de segmentos de uma LinhaSegmentada: árvore, prefixos e laço sequencial coincidem."""
+        from modelos_linha.linha_segmentada import Estrutura, LinhaSegmentada
+        estruturas = {
+            'S1': Estrutura([-8.0, 0.0, 8.0, -5.0, 5.0], [18.0, 18.0, 18.0, 28.0, 28.0],
+                            [0.06e-3] * 3 + [0.4e-3] * 2, [0.0159] * 3 + [0.0046] * 2),
+            'A1': Estrutura([-9.0, 0.0, 9.0, 0.0], [22.0, 24.0, 22.0, 33.0],
+                            [0.06e-3] * 3 + [0.4e-3], [0.0159] * 3 + [0.0046]),
+        }
+        rng = np.random.default_rng(3)
+        S = 2000
+        segmentos = [(rng.choice(['S1', 'A1']), 350.0 + 200 * rng.random(), rng.choice([100.0, 2000.0]),
+                      k * 3 // S) for k in range(S)]
+        linha = LinhaSegmentada(estruturas, segmentos, [60.0, 5e3])
+        M = abcd_linha_segmentada(linha)
+        self.assertEqual(M.shape, (2, 6, 6))
+
+        Z_s, C_s = linha.parametros_segmentos()
+        Y_s = 1j * 2 * math.pi * linha.frequencias[:, None, None] * C_s[:, None]
+        M_seg = abcd_segmentos(Z_s, Y_s, linha.comprimentos)
+        esperado = M_seg[0]
+        for k in range(1, S):
+            esperado = esperado @ M_seg[k]
+        np.testing.assert_allclose(M, esperado, rtol=1e-8, atol=1e-8 * np.abs(esperado).max())
+        P = abcd_linha_segmentada(linha, prefixos=True)
+        self.assertEqual(P.shape, (S, 2, 6, 6))
+        np.testing.assert_allclose(P[-1], M, rtol=1e-8, atol=1e-8 * np.abs(M).max())
+        # Trecho curto (~10 km) em 60 Hz: B do conjunto próximo da impedância série total.
+        curta = LinhaSegmentada(estruturas, segmentos[:20], [60.0])
+        Z_total, _ = curta.totais()
+        np.testing.assert_allclose(abcd_linha_segmentada(curta)[0, :3, 3:], Z_total[0], rtol=1e-3)
+
+    def test_validacoes(self):
+        """Pilhas vazias e comprimentos incompatíveis devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "pilha não vazia"):
+            produto_cascata(np.zeros((0, 2, 2)))
+        with self.assertRaisesRegex(ValueError, "um comprimento para cada segmento"):
+            abcd_segmentos(np.ones((3, 2, 2)), np.ones((3, 2, 2)), [1.0, 2.0])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,244 @@
+import functools
+import math
+import numpy as np
+import unittest
+
+class LinhaLonga:
+    """
+    Modelo de linha longa multicondutora (equações hiperbólicas) por decomposição modal.
+
+    As equações do telegrafista dV/dx = -Z I e dI/dx = -Y V são desacopladas pela decomposição
+    ZY = T diag(gamma^2) T^-1. As matrizes de transmissão (ABCD) e o pi-equivalente exato são
+    funções de gamma*l aplicadas nos modos:
+
+        A = T cosh(Gamma l) T^-1
+        B = T [sinh(Gamma l) / Gamma] T^-1 Z
+        C = Y T [sinh(Gamma l) / Gamma] T^-1
+        D = Y A Y^-1
+
+    com [V_s; I_s] = [[A, B], [C, D]] @ [V_r; I_r]. A decomposição (T, T^-1 e gamma) é calculada
+    uma única vez, na primeira vez em que é pedida, e reaproveitada para qualquer comprimento.
+    Z e Y podem ser matrizes (N, N) ou pilhas (..., N, N), por exemplo (F, N, N) de uma varredura
+    em frequência ou (K, F, N, N) de K linhas, e todas as operações são vetorizadas sobre a pilha.
+
+    Atributos:
+    Z (numpy.ndarray): Impedâncias longitudinais (..., N, N) por unidade de comprimento (Ohm/m).
+    Y (numpy.ndarray): Admitâncias transversais (..., N, N) por unidade de comprimento (S/m).
+    n (int): Número de condutores.
+
+    As unidades de comprimento de Z, Y e do comprimento da linha devem ser as mesmas
+    (por exemplo, Ohm/km, S/km e km).
+    """
+
+    def __init__(self, Z, Y, modos=None):
+        """
+        Parâmetros:
+        Z (array_like): Matriz (N, N) ou pilha (..., N, N) de impedâncias longitudinais.
+        Y (array_like): Matriz (N, N) ou pilha (..., N, N) de admitâncias transversais (j*w*C).
+        modos (tuple, opcional): Decomposição (T, gamma) de ZY já calculada (por exemplo, com
+                                 acompanhamento dos autovetores em frequência). Se omitida,
+                                 é obtida com `np.linalg.eig`.
+
+        Raises:
+        ValueError: Se Z e Y não forem matrizes quadradas de mesma forma.
+        """
+        Z = np.asarray(Z, dtype=complex)
+        Y = np.asarray(Y, dtype=complex)
+        if Z.ndim < 2 or Z.shape[-1] != Z.shape[-2] or Z.shape != Y.shape:
+            raise ValueError("ERRO! As matrizes Z e Y devem ser quadradas e ter a mesma forma (..., N, N).")
+        self.Z = Z
+        self.Y = Y
+        self.n = Z.shape[-1]
+        if modos is not None:
+            T, gamma = modos
+            self.__dict__['_modos'] = (np.asarray(T, dtype=complex), np.asarray(gamma, dtype=complex))
+
+    @functools.cached_property
+    def _modos(self):
+        autovalores, T = np.linalg.eig(self.Z @ self.Y)
+        return T, constantes_propagacao(autovalores)
+
+    @property
+    def T(self):
+        """Matriz (..., N, N) de transformação modal das tensões (autovetores de ZY)."""
+        return self._modos[0]
+
+    @property
+    def gamma(self):
+        """Constantes de propagação modais (..., N), gamma = alfa + j*beta (1/unidade de comprimento)."""
+        return self._modos[1]
+
+    @functools.cached_property
+    def T_inv(self):
+        """Inversa de T (..., N, N)."""
+        return np.linalg.inv(self.T)
+
+    @functools.cached_property
+    def impedancia_caracteristica(self):
+        """Matriz de impedância característica Zc = (ZY)^(-1/2) Z = T Gamma^-1 T^-1 Z (Ohm)."""
+        return self._funcao_modal(1 / self.gamma) @ self.Z
+
+    def abcd(self, comprimento):
+        """
+        Matriz de transmissão ABCD exata da linha.
+
+        Parâmetros:
+        comprimento (float ou array_like): Comprimento da linha. Um array é combinado por broadcast
+                                           com as dimensões da pilha (por exemplo, l[:, None] com
+                                           uma pilha (F, N, N) resulta em (L, F, 2N, 2N)).
+
+        Retorna:
+        numpy.ndarray: Pilha complexa (..., 2N, 2N) com os blocos [[A, B], [C, D]].
+        """
+        A, B, C, D = self.blocos_abcd(comprimento)
+        return np.concatenate([np.concatenate([A, B], axis=-1), np.concatenate([C, D], axis=-1)], axis=-2)
+
+    def blocos_abcd(self, comprimento):
+        """
+        Blocos A, B, C e D (..., N, N) da matriz de transmissão, como em `abcd`.
+
+        Retorna:
+        tuple: (A, B, C, D).
+        """
+        gl = self._gamma_l(comprimento)
+        A = self._funcao_modal(np.cosh(gl))
+        sinh_sobre_gamma = self._funcao_modal(np.sinh(gl) / self.gamma)
+        B = sinh_sobre_gamma @ self.Z
+        C = self.Y @ sinh_sobre_gamma
+        # D = Y A Y^-1, obtido por solve: Y^T D^T = (Y A)^T.
+        Y = np.broadcast_to(self.Y, A.shape)
+        D = np.swapaxes(np.linalg.solve(np.swapaxes(Y, -1, -2), np.swapaxes(Y @ A, -1, -2)), -1, -2)
+        return A, B, C, D
+
+    def pi_equivalente(self, comprimento):
+        """
+        Pi-equivalente exato da linha.
+
+            Z_pi = B = T [sinh(Gamma l) / Gamma] T^-1 Z
+            Y_pi/2 = Y T [tanh(Gamma l / 2) / Gamma] T^-1   (em cada extremidade)
+
+        Parâmetros:
+        comprimento (float ou array_like): Comprimento da linha, como em `abcd`.
+
+        Retorna:
+        tuple: (Z_pi, Y_pi_2), pilhas complexas (..., N, N) com a impedância série total (Ohm)
+               e a admitância em derivação de cada extremidade (S).
+        """
+        gl = self._gamma_l(comprimento)
+        Z_pi = self._funcao_modal(np.sinh(gl) / self.gamma) @ self.Z
+        Y_pi_2 = self.Y @ self._funcao_modal(np.tanh(gl / 2) / self.gamma)
+        return Z_pi, Y_pi_2
+
+    def _gamma_l(self, comprimento):
+        comprimento = np.asarray(comprimento, dtype=float)
+        if np.any(comprimento <= 0):
+            raise ValueError("ERRO! O comprimento da linha deve ser um valor positivo.")
+        return self.gamma * comprimento[..., np.newaxis]
+
+    def _funcao_modal(self, valores):
+        """T diag(valores) T^-1, com valores (..., N) combinados por broadcast com a pilha."""
+        return (self.T * valores[..., np.newaxis, :]) @ self.T_inv
+
+def constantes_propagacao(autovalores):
+    """
+    Constantes de propagação modais gamma = sqrt(lambda) a partir dos autovalores de ZY.
+
+    O ramo da raiz é escolhido com beta = Im(gamma) >= 0 (onda progressiva no sentido +x), o que
+    para linhas passivas também dá alfa = Re(gamma) >= 0. A raiz principal sozinha não basta:
+    em modos sem perdas, lambda = -w^2 LC é real negativo e o sinal de um zero imaginário
+    (+0j ou -0j) decidiria entre +j*beta e -j*beta.
+
+    Parâmetros:
+    autovalores (array_like): Autovalores complexos de ZY.
+
+    Retorna:
+    numpy.ndarray: Constantes de propagação, com a forma de `autovalores`.
+    """
+    gamma = np.sqrt(np.asarray(autovalores, dtype=complex))
+    return np.where(gamma.imag < 0, -gamma, gamma)
+
+def admitancia_transversal(C, frequencias, G=None):
+    """
+    Pilha de admitâncias transversais Y = G + j*w*C para uma varredura em frequência.
+
+    Parâmetros:
+    C (array_like): Matriz de capacitâncias (N, N) por unidade de comprimento (F/m).
+    frequencias (array_like): Vetor de F frequências (Hz).
+    G (array_like, opcional): Matriz de condutâncias (N, N) (S/m). Padrão: nula.
+
+    Retorna:
+    numpy.ndarray: Pilha complexa (F, N, N) de admitâncias (S/m).
+    """
+    w = 2 * math.pi * np.atleast_1d(np.asarray(frequencias, dtype=float))[:, np.newaxis, np.newaxis]
+    Y = 1j * w * np.asarray(C, dtype=float)
+    return Y if G is None else Y + np.asarray(G, dtype=float)
+
+def matriz_abcd(Z, Y, comprimento):
+    """Atalho para `LinhaLonga(Z, Y).abcd(comprimento)`."""
+    return LinhaLonga(Z, Y).abcd(comprimento)
+
+def pi_equivalente(Z, Y, comprimento):
+    """Atalho para `LinhaLonga(Z, Y).pi_equivalente(comprimento)`."""
+    return LinhaLonga(Z, Y).pi_equivalente(comprimento)
+
+class TestLinhaLonga(unittest.TestCase):
+
+    def setUp(self):
+        # Linha trifásica não transposta: Z (Ohm/km) e C (F/km) típicos de 500 kV.
+        self.Z = np.array([[0.08 + 0.60j, 0.05 + 0.25j, 0.05 + 0.20j],
+                           [0.05 + 0.25j, 0.08 + 0.60j, 0.05 + 0.25j],
+                           [0.05 + 0.20j, 0.05 + 0.25j, 0.08 + 0.60j]])
+        C = np.array([[12.0, -2.0, -1.0], [-2.0, 12.5, -2.0], [-1.0, -2.0, 12.0]]) * 1e-9
+        self.Y = admitancia_transversal(C, [60.0])[0]
+
+    def test_monofasico_confere_com_formulas_hiperbolicas(self):
+        """Para N = 1, A = cosh(gl), B = Zc sinh(gl), C = sinh(gl)/Zc e Y_pi/2 = tanh(gl/2)/Zc."""
+        z, y, l = 0.03 + 0.4j, 4e-6j, 300.0
+        g = np.sqrt(z * y)
+        Zc = np.sqrt(z / y)
+        linha = LinhaLonga([[z]], [[y]])
+        M = linha.abcd(l)
+        np.testing.assert_allclose(M, [[np.cosh(g * l), Zc * np.sinh(g * l)],
+                                       [np.sinh(g * l) / Zc, np.cosh(g * l)]], rtol=1e-12)
+        Z_pi, Y_pi_2 = linha.pi_equivalente(l)
+        np.testing.assert_allclose(Y_pi_2[0, 0], np.tanh(g * l / 2) / Zc, rtol=1e-12)
+        np.testing.assert_allclose(linha.impedancia_caracteristica[0, 0], Zc, rtol=1e-12)
+
+    def test_cascata_de_dois_trechos(self):
+        """A ABCD de 2l deve ser o produto das ABCD de dois trechos de comprimento l."""
+        linha = LinhaLonga(self.Z, self.Y)
+        M_l = linha.abcd(200.0)
+        np.testing.assert_allclose(linha.abcd(400.0), M_l @ M_l, rtol=1e-10, atol=1e-12)
+
+    def test_pi_equivalente_reproduz_abcd(self):
+        """A = I + Z_pi Y_pi/2 e B = Z_pi; D = A^T para Z e Y simétricas."""
+        linha = LinhaLonga(self.Z, self.Y)
+        A, B, C, D = linha.blocos_abcd(300.0)
+        Z_pi, Y_pi_2 = linha.pi_equivalente(300.0)
+        np.testing.assert_allclose(A, np.eye(3) + Z_pi @ Y_pi_2, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(B, Z_pi, rtol=1e-12)
+        np.testing.assert_allclose(D, A.T, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(C, 2 * Y_pi_2 + Y_pi_2 @ Z_pi @ Y_pi_2, rtol=1e-9, atol=1e-12)
+
+    def test_pilha_de_frequencias_e_comprimentos(self):
+        """Pilhas (F, N, N) e vetores de comprimentos (L, 1) resultam em (L, F, 2N, 2N)."""
+        frequencias = np.array([50.0, 60.0, 1e3, 1e4])
+        C = np.linalg.inv(np.array([[8.0, 2.0, 1.0], [2.0, 8.0, 2.0], [1.0, 2.0, 8.0]])) * 1e-8
+        Z = np.broadcast_to(self.Z, (4, 3, 3)) * (frequencias[:, None, None] / 60.0)
+        linha = LinhaLonga(Z, admitancia_transversal(C, frequencias))
+        comprimentos = np.array([10.0, 100.0])
+        M = linha.abcd(comprimentos[:, np.newaxis])
+        self.assertEqual(M.shape, (2, 4, 6, 6))
+        for i, l in enumerate(comprimentos):
+            for k in range(4):
+                np.testing.assert_allclose(M[i, k], LinhaLonga(Z[k], linha.Y[k]).abcd(l), rtol=1e-9, atol=1e-12)
+
+    def test_validacoes(self):
+        """Formas incompatíveis e comprimentos não positivos devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "devem ser quadradas e ter a mesma forma"):
+            LinhaLonga(self.Z, self.Y[:2, :2])
+        with self.assertRaisesRegex(ValueError, "O comprimento da linha deve ser um valor positivo."):
+            LinhaLonga(self.Z, self.Y).abcd(0.0)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,296 @@
+import math
+import numpy as np
+import unittest
+
+from longitudinais.Carson_n_condutores import metodo_carson_n_condutores_varredura
+from longitudinais.geometria import PERMISSIVIDADE_VACUO, obter_geometria
+from longitudinais.reducao_kron import capacitancia_kron, reducao_kron
+from longitudinais.transposicao_ciclica import esquema_transposicao_ciclico, permutar_secoes
+
+E = PERMISSIVIDADE_VACUO  # Permissividade do vácuo (F/m)
+
+class Estrutura:
+    """
+    Tipo de estrutura (silhueta de torre) de uma linha segmentada.
+
+    Os primeiros `n_fases` condutores são as fases, na ordem das posições físicas; os demais são
+    para-raios aterrados em todas as estruturas, eliminados por redução de Kron.
+
+    Atributos:
+    x, h (numpy.ndarray): Coordenadas horizontais e alturas dos N condutores (metros).
+    r (numpy.ndarray): Resistências CA dos condutores (Ohm/m).
+    raio (numpy.ndarray): Raios físicos dos condutores (metros), usados na capacitância.
+    Rmg_val (numpy.ndarray ou None): RMGs dos condutores (metros); se None, calculados a partir de 'raio'.
+    n_fases (int): Número de fases.
+    """
+
+    def __init__(self, x, h, r, raio, Rmg_val=None, n_fases=3):
+        """
+        Parâmetros:
+        x, h (array_like): Coordenadas dos N condutores (metros), fases primeiro.
+        r (float ou array_like): Resistências CA (Ohm/m), única ou uma por condutor.
+        raio (float ou array_like): Raios físicos (metros), único ou um por condutor.
+        Rmg_val (float ou array_like, opcional): RMGs (metros). Padrão: raio * e^(-1/4).
+        n_fases (int, opcional): Número de fases (os primeiros condutores). Padrão: 3.
+
+        Raises:
+        ValueError: Se n_fases estiver fora do intervalo [1, N] ou se algum raio não for positivo.
+        """
+        self.geometria = obter_geometria(x, h)
+        self.x, self.h = self.geometria.x, self.geometria.h
+        n = self.geometria.n
+        if not 1 <= n_fases <= n:
+            raise ValueError(f"ERRO! O número de fases deve estar entre 1 e {n}.")
+        self.r = np.broadcast_to(np.asarray(r, dtype=float), (n,))
+        self.raio = np.broadcast_to(np.asarray(raio, dtype=float), (n,))
+        if np.any(self.raio <= 0):
+            raise ValueError("ERRO! Os raios dos condutores devem ser positivos.")
+        self.Rmg_val = None if Rmg_val is None else np.broadcast_to(np.asarray(Rmg_val, dtype=float), (n,))
+        self.n_fases = n_fases
+
+    def __repr__(self):
+        return f"Estrutura(x={self.x.tolist()}, h={self.h.tolist()}, n_fases={self.n_fases})"
+
+class LinhaSegmentada:
+    """
+    Linha de transmissão descrita por uma tabela de segmentos (vãos ou trechos) ao longo da rota.
+
+    Cada segmento tem um tipo de estrutura, um comprimento, a resistividade do solo local e um
+    estado de transposição (posição de cada fase nas posições físicas da estrutura). As matrizes
+    por unidade de comprimento dependem apenas de (estrutura, rho): cada combinação distinta é
+    calculada uma única vez, para toda a varredura de frequências, e guardada no cache da linha.
+    A transposição é só uma permutação da matriz já calculada (ver `permutar_secoes`), e os
+    totais são somas ponderadas pelos comprimentos agrupadas por assinatura
+    (estrutura, rho, transposição), de modo que centenas de vãos com poucas combinações distintas
+    custam poucas avaliações de Carson.
+
+    As matrizes são das fases, com os para-raios eliminados por Kron em cada segmento (para-raios
+    aterrados em todas as estruturas) e ordenadas por fase (A, B, C, ...), não por posição.
+
+    Atributos:
+    estruturas (dict): Tipos de estrutura {identificador: Estrutura}.
+    frequencias (numpy.ndarray): Vetor de F frequências (Hz).
+    identificadores, comprimentos, rho, transposicoes: Colunas da tabela de segmentos.
+    n_fases (int): Número de fases, comum a todas as estruturas.
+    """
+
+    def __init__(self, estruturas, segmentos, frequencias=(60.0,), modelo_solo='aproximado', espessuras=None):
+        """
+        Parâmetros:
+        estruturas (dict): {identificador: Estrutura} com os tipos de estrutura da linha.
+        segmentos (iterable): Tabela de S segmentos, cada um uma tupla
+                              (identificador, comprimento, rho) ou (identificador, comprimento, rho, transposicao).
+                              'comprimento' em metros; 'rho' em Ohm.m (um vetor por camada com o modelo
+                              'multicamadas'); 'transposicao' é um inteiro k (rotação cíclica de k posições,
+                              como em `esquema_transposicao_ciclico`) ou a permutação explícita
+                              (posição física de cada fase). Padrão: 0 (sem transposição).
+        frequencias (array_like, opcional): Frequências (Hz). Padrão: (60,).
+        modelo_solo (str, opcional): Modelo de retorno pelo solo, um de MODELOS_SOLO. Padrão: 'aproximado'.
+        espessuras (array_like, opcional): Espessuras das camadas do solo (modelo 'multicamadas'), usadas
+                                           nos segmentos com rho por camada.
+
+        Raises:
+        ValueError: Se a tabela estiver vazia, se um segmento usar uma estrutura desconhecida, se algum
+                    comprimento não for positivo, se as estruturas tiverem números de fases diferentes
+                    ou se uma transposição não for uma permutação das fases.
+        """
+        self.estruturas = dict(estruturas)
+        self.frequencias = np.atleast_1d(np.asarray(frequencias, dtype=float))
+        self.modelo_solo = modelo_solo
+        self.espessuras = espessuras
+
+        segmentos = [tuple(s) for s in segmentos]
+        if not segmentos:
+            raise ValueError("ERRO! A tabela de segmentos deve ter pelo menos um segmento.")
+        if any(len(s) not in (3, 4) for s in segmentos):
+            raise ValueError("ERRO! Cada segmento deve ser (estrutura, comprimento, rho[, transposicao]).")
+        desconhecidas = {s[0] for s in segmentos} - self.estruturas.keys()
+        if desconhecidas:
+            raise ValueError(f"ERRO! Estruturas não definidas na tabela de segmentos: {sorted(map(str, desconhecidas))}.")
+        fases = {self.estruturas[s[0]].n_fases for s in segmentos}
+        if len(fases) != 1:
+            raise ValueError("ERRO! Todas as estruturas da linha devem ter o mesmo número de fases.")
+        self.n_fases = fases.pop()
+
+        self.identificadores = [s[0] for s in segmentos]
+        self.comprimentos = np.array([s[1] for s in segmentos], dtype=float)
+        if np.any(self.comprimentos <= 0):
+            raise ValueError("ERRO! Os comprimentos dos segmentos devem ser positivos.")
+        self.rho = [tuple(float(r) for r in np.atleast_1d(s[2])) for s in segmentos]
+        self.transposicoes = [self._permutacao(s[3] if len(s) == 4 else 0) for s in segmentos]
+
+        # Assinatura de cada segmento e índice da assinatura distinta correspondente.
+        assinaturas = list(zip(self.identificadores, self.rho, self.transposicoes))
+        self.assinaturas = list(dict.fromkeys(assinaturas))
+        posicao = {a: k for k, a in enumerate(self.assinaturas)}
+        self.indices = np.array([posicao[a] for a in assinaturas])
+
+        self._cache = {}
+
+    @property
+    def comprimento_total(self):
+        """Comprimento total da linha (metros)."""
+        return float(self.comprimentos.sum())
+
+    @property
+    def avaliacoes(self):
+        """Número de combinações (estrutura, rho) já calculadas e guardadas no cache."""
+        return len(self._cache)
+
+    def parametros_por_posicao(self, identificador, rho):
+        """
+        Matrizes das fases por unidade de comprimento, por posição física, de uma estrutura sobre um solo.
+
+        O resultado é calculado na primeira chamada com a mesma assinatura (estrutura, rho) e
+        reaproveitado nas seguintes.
+
+        Parâmetros:
+        identificador: Identificador da estrutura.
+        rho (float ou tuple): Resistividade do solo (Ohm.m), ou uma por camada.
+
+        Retorna:
+        tuple: (Z, C), pilha complexa (F, n_fases, n_fases) de impedâncias (Ohm/m) e matriz
+               (n_fases, n_fases) de capacitâncias (F/m).
+        """
+        chave = (identificador, tuple(float(r) for r in np.atleast_1d(rho)))
+        if chave not in self._cache:
+            est = self.estruturas[identificador]
+            # Segmentos com um único valor de rho são de solo homogêneo, mesmo no modelo 'multicamadas'.
+            homogeneo = len(chave[1]) == 1
+            Z = metodo_carson_n_condutores_varredura(est.r, None, None, chave[1][0] if homogeneo else np.array(chave[1]),
+                                                     self.frequencias, R=est.raio, Rmg_val=est.Rmg_val,
+                                                     geometria=est.geometria, modelo_solo=self.modelo_solo,
+                                                     espessuras=None if homogeneo else self.espessuras)
+            P = est.geometria.coeficientes_maxwell(est.raio) / (2 * math.pi * E)
+            self._cache[chave] = (reducao_kron(Z, est.n_fases), capacitancia_kron(P, est.n_fases))
+        return self._cache[chave]
+
+    def parametros_assinaturas(self):
+        """
+        Matrizes das fases por unidade de comprimento de cada assinatura distinta
+        (estrutura, rho, transposição), já permutadas para a ordem das fases.
+
+        Retorna:
+        tuple: (Z, C), pilhas (U, F, n, n) e (U, n, n), na ordem de `assinaturas`.
+        """
+        Z_u, C_u = [], []
+        for identificador, rho, permutacao in self.assinaturas:
+            Z, C = self.parametros_por_posicao(identificador, rho)
+            esquema = np.array([permutacao])
+            Z_u.append(permutar_secoes(Z, esquema)[:, 0])
+            C_u.append(permutar_secoes(C, esquema)[0])
+        return np.stack(Z_u), np.stack(C_u)
+
+    def parametros_segmentos(self):
+        """
+        Matrizes das fases por unidade de comprimento de cada segmento, na ordem da tabela.
+
+        Retorna:
+        tuple: (Z, C), pilhas (S, F, n, n) em Ohm/m e (S, n, n) em F/m.
+        """
+        Z_u, C_u = self.parametros_assinaturas()
+        return Z_u[self.indices], C_u[self.indices]
+
+    def totais(self):
+        """
+        Impedância série e capacitância totais da linha (soma dos segmentos ponderada pelos comprimentos).
+
+        Os comprimentos são somados por assinatura antes do produto com as matrizes, de modo que o
+        custo depende do número de assinaturas distintas, e não do número de segmentos.
+
+        Retorna:
+        tuple: (Z_total, C_total), pilha complexa (F, n, n) em Ohm e matriz (n, n) em F.
+        """
+        Z_u, C_u = self.parametros_assinaturas()
+        l_u = np.bincount(self.indices, weights=self.comprimentos, minlength=len(self.assinaturas))
+        return np.einsum('u,ufij->fij', l_u, Z_u), np.einsum('u,uij->ij', l_u, C_u)
+
+    def _permutacao(self, transposicao):
+        """Converte o estado de transposição em uma tupla com a posição física de cada fase."""
+        if np.ndim(transposicao) == 0:
+            return tuple(int(p) for p in esquema_transposicao_ciclico(self.n_fases, self.n_fases)[int(transposicao) % self.n_fases])
+        permutacao = tuple(int(p) for p in transposicao)
+        if sorted(permutacao) != list(range(self.n_fases)):
+            raise ValueError("ERRO! A transposição de cada segmento deve ser uma permutação das posições das fases.")
+        return permutacao
+
+class TestLinhaSegmentada(unittest.TestCase):
+
+    def setUp(self):
+        # Torre de suspensão (com dois para-raios) e torre de ancoragem mais alta (com um).
+        self.estruturas = {
+            'S1': Estrutura([-8.0, 0.0, 8.0, -5.0, 5.0], [18.0, 18.0, 18.0, 28.0, 28.0],
+                            [0.06e-3] * 3 + [0.4e-3] * 2, [0.0159] * 3 + [0.0046] * 2,
+                            Rmg_val=[0.0124] * 3 + [0.004] * 2),
+            'A1': Estrutura([-9.0, 0.0, 9.0, 0.0], [22.0, 24.0, 22.0, 33.0],
+                            [0.06e-3] * 3 + [0.4e-3], [0.0159] * 3 + [0.0046],
+                            Rmg_val=[0.0124] * 3 + [0.004]),
+        }
+        self.frequencias = [60.0, 1e3]
+
+    def test_cache_por_estrutura_e_solo(self):
+        """Centenas de segmentos com poucas combinações (estrutura, rho) avaliam cada uma só uma vez."""
+        rng = np.random.default_rng(1)
+        segmentos = [(rng.choice(['S1', 'A1']), 400.0 + 100 * rng.random(), rng.choice([100.0, 1000.0]),
+                      int(rng.integers(3))) for _ in range(600)]
+        linha = LinhaSegmentada(self.estruturas, segmentos, self.frequencias)
+        Z, C = linha.totais()
+        self.assertEqual(linha.avaliacoes, 4)
+        self.assertEqual(Z.shape, (2, 3, 3))
+
+        Z_s, C_s = linha.parametros_segmentos()
+        self.assertEqual(Z_s.shape, (600, 2, 3, 3))
+        np.testing.assert_allclose(Z, np.einsum('s,sfij->fij', linha.comprimentos, Z_s), rtol=1e-12)
+        np.testing.assert_allclose(C, np.einsum('s,sij->ij', linha.comprimentos, C_s), rtol=1e-12)
+        self.assertEqual(linha.avaliacoes, 4)
+
+    def test_confere_com_transposicao_de_tres_secoes(self):
+        """Uma estrutura, um solo e três seções reproduzem `transpor_matriz` com a rotação cíclica."""
+        from longitudinais.transposicao_ciclica import transpor_matriz
+        l = [30e3, 35e3, 32e3]
+        linha = LinhaSegmentada(self.estruturas, [('S1', l[k], 100.0, k) for k in range(3)], self.frequencias)
+        Z, C = linha.totais()
+        Z_pos, C_pos = linha.parametros_por_posicao('S1', 100.0)
+        np.testing.assert_allclose(Z, transpor_matriz(Z_pos, l), rtol=1e-12)
+        np.testing.assert_allclose(C, transpor_matriz(C_pos, l), rtol=1e-12)
+        # Seções de mesmo comprimento: matriz de fases equilibrada (elementos mútuos iguais).
+        Z_eq, _ = LinhaSegmentada(self.estruturas, [('S1', 1e3, 100.0, k) for k in range(3)]).totais()
+        self.assertAlmostEqual(Z_eq[0, 0, 1], Z_eq[0, 1, 2], delta=1e-12)
+        self.assertAlmostEqual(Z_eq[0, 0, 1], Z_eq[0, 0, 2], delta=1e-12)
+
+    def test_confere_com_calculo_direto(self):
+        """As matrizes por posição coincidem com Carson + Kron e com a capacitância de Maxwell."""
+        est = self.estruturas['A1']
+        linha = LinhaSegmentada(self.estruturas, [('A1', 1e3, 250.0), ('A1', 2e3, 250.0, (2, 0, 1))],
+                                self.frequencias, modelo_solo='serie')
+        Z_pos, C_pos = linha.parametros_por_posicao('A1', 250.0)
+        Z_ref = metodo_carson_n_condutores_varredura(est.r, est.x, est.h, 250.0, self.frequencias,
+                                                     Rmg_val=est.Rmg_val, modelo_solo='serie')
+        np.testing.assert_allclose(Z_pos, reducao_kron(Z_ref, 3), rtol=1e-12)
+        P = np.linalg.inv(capacitancia_kron(est.geometria.coeficientes_maxwell(est.raio) / (2 * math.pi * E), 3))
+        np.testing.assert_allclose(np.linalg.inv(C_pos), P, rtol=1e-12)
+        # Fase A na posição 2, B na 0 e C na 1
+        Z_s, _ = linha.parametros_segmentos()
+        np.testing.assert_allclose(Z_s[1, :, 0, 1], Z_pos[:, 2, 0], rtol=1e-12)
+
+    def test_solo_em_camadas(self):
+        """Com o modelo 'multicamadas', rho de cada segmento pode ser um vetor por camada."""
+        linha = LinhaSegmentada(self.estruturas, [('S1', 1e3, (100.0, 1000.0)), ('S1', 1e3, 100.0)],
+                                self.frequencias, modelo_solo='multicamadas', espessuras=[20.0])
+        self.assertEqual(len(linha.assinaturas), 2)
+        Z_s, _ = linha.parametros_segmentos()
+        self.assertTrue(np.all(Z_s[0, 0].imag > Z_s[1, 0].imag))
+
+    def test_validacoes(self):
+        """Tabelas inválidas devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, "não definidas"):
+            LinhaSegmentada(self.estruturas, [('X9', 1e3, 100.0)])
+        with self.assertRaisesRegex(ValueError, "devem ser positivos"):
+            LinhaSegmentada(self.estruturas, [('S1', 0.0, 100.0)])
+        with self.assertRaisesRegex(ValueError, "permutação"):
+            LinhaSegmentada(self.estruturas, [('S1', 1e3, 100.0, (0, 0, 1))])
+        with self.assertRaisesRegex(ValueError, "pelo menos um segmento"):
+            LinhaSegmentada(self.estruturas, [])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
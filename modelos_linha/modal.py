@@ -0,0 +1,205 @@
+import numpy as np
+import unittest
+
+from scipy.optimize import linear_sum_assignment
+
+from modelos_linha.linha_longa import constantes_propagacao
+
+# Menor correlação |t_prev^H t| aceita para associar diretamente um autovetor de eig ao modo da
+# frequência anterior. Abaixo dela (modos quase degenerados ou passo de frequência grande demais),
+# o modo é refinado por Newton-Raphson a partir da frequência anterior.
+CORRELACAO_MINIMA = 0.99
+
+# Tolerância relativa do passo de Newton-Raphson (autovalores normalizados pela norma de ZY).
+TOLERANCIA = 1e-12
+
+# Número máximo de iterações de Newton-Raphson por frequência.
+MAX_ITERACOES = 20
+
+# Resíduo relativo máximo ||S t - lambda t|| / ||S|| aceito para um modo refinado por Newton-Raphson.
+# Acima dele (ou se dois modos convergirem para o mesmo autovalor), os modos são associados aos
+# anteriores pela máxima correlação global (problema de atribuição).
+RESIDUO_MAXIMO = 1e-9
+
+def acompanhar_autovetores(S, tolerancia=TOLERANCIA, max_iteracoes=MAX_ITERACOES):
+    """
+    Autovalores e autovetores de uma pilha de matrizes ao longo da frequência, com continuidade.
+
+    A decomposição `np.linalg.eig` de cada frequência isoladamente devolve os modos em ordem
+    arbitrária e com fase (sinal) arbitrária, o que troca modos entre frequências vizinhas e
+    produz descontinuidades nas matrizes de transformação. Aqui, todas as frequências são
+    decompostas com uma única chamada de eig em lote e, percorrendo a varredura, cada autovetor
+    é associado ao modo da frequência anterior com o qual tem correlação |t_prev^H t| próxima
+    de 1, e sua fase é alinhada (t_prev^H t real e positivo).
+
+    Onde a associação é ambígua (modos quase degenerados ou cruzamentos com passo grande), os
+    autopares são refinados por Newton-Raphson a partir da solução da frequência anterior,
+    resolvendo para cada modo m o sistema aumentado
+
+        (S - lambda_m I) t_m = 0,    t_prev_m^H t_m = 1
+
+    para todos os modos de uma vez (um `np.linalg.solve` em lote por iteração). Se Newton-Raphson
+    não convergir, ou se dois modos convergirem para o mesmo autovalor (modos degenerados, como
+    os modos aéreos de uma linha idealmente transposta), os modos de eig são associados aos
+    anteriores pela máxima correlação global.
+
+    Parâmetros:
+    S (array_like): Pilha (F, N, N) de matrizes (tipicamente ZY), com as frequências em ordem.
+    tolerancia (float, opcional): Tolerância relativa do passo de Newton-Raphson.
+    max_iteracoes (int, opcional): Número máximo de iterações de Newton-Raphson por frequência.
+
+    Retorna:
+    tuple: (autovalores, T), com autovalores (F, N) complexos e T (F, N, N) com os autovetores
+           nas colunas, de norma unitária e fase contínua ao longo da frequência. Na primeira
+           frequência, os modos são ordenados pelo módulo do autovalor, em ordem decrescente.
+
+    Raises:
+    ValueError: Se S não for uma pilha (F, N, N).
+    """
+    S = np.asarray(S, dtype=complex)
+    if S.ndim != 3 or S.shape[-1] != S.shape[-2]:
+        raise ValueError("ERRO! As matrizes devem formar uma pilha de forma (F, N, N).")
+    F, n, _ = S.shape
+    modos = np.arange(n)
+
+    lam_eig, t_eig = np.linalg.eig(S) # Uma única chamada para toda a varredura.
+    t_eig = t_eig / np.linalg.norm(t_eig, axis=-2, keepdims=True)
+
+    autovalores = np.empty((F, n), dtype=complex)
+    T = np.empty((F, n, n), dtype=complex)
+    ordem = np.argsort(-np.abs(lam_eig[0]))
+    autovalores[0], T[0] = lam_eig[0, ordem], t_eig[0][:, ordem]
+
+    for k in range(1, F):
+        correlacao = T[k - 1].conj().T @ t_eig[k] # (anterior, novo)
+        modulo = np.abs(correlacao)
+        ordem = np.argmax(modulo, axis=1)
+        if np.array_equal(np.sort(ordem), modos) and modulo[modos, ordem].min() >= CORRELACAO_MINIMA:
+            fase = correlacao[modos, ordem]
+            autovalores[k] = lam_eig[k, ordem]
+            T[k] = t_eig[k][:, ordem] * (np.conj(fase) / np.abs(fase))
+            continue
+
+        escala = np.max(np.abs(S[k]))
+        lam, t, ok = _newton_raphson(S[k] / escala, T[k - 1], autovalores[k - 1] / escala, tolerancia, max_iteracoes)
+        if ok:
+            autovalores[k], T[k] = lam * escala, t
+        else:
+            autovalores[k], T[k] = _associar(lam_eig[k], t_eig[k], correlacao)
+    return autovalores, T
+
+def decomposicao_modal(Z, Y, tolerancia=TOLERANCIA, max_iteracoes=MAX_ITERACOES):
+    """
+    Decomposição modal de uma linha ao longo da frequência: ZY = T diag(gamma^2) T^-1.
+
+    Parâmetros:
+    Z (array_like): Pilha (F, N, N) de impedâncias longitudinais (por unidade de comprimento).
+    Y (array_like): Pilha (F, N, N) de admitâncias transversais (por unidade de comprimento).
+    tolerancia, max_iteracoes: Como em `acompanhar_autovetores`.
+
+    Retorna:
+    tuple: (T, gamma), com T (F, N, N) as matrizes de transformação modal das tensões e
+           gamma (F, N) as constantes de propagação modais, no formato aceito por
+           `LinhaLonga(Z, Y, modos=...)`.
+    """
+    Z = np.asarray(Z, dtype=complex)
+    Y = np.asarray(Y, dtype=complex)
+    if Z.shape != Y.shape:
+        raise ValueError("ERRO! As matrizes Z e Y devem ter a mesma forma (F, N, N).")
+    autovalores, T = acompanhar_autovetores(Z @ Y, tolerancia, max_iteracoes)
+    return T, constantes_propagacao(autovalores)
+
+def _newton_raphson(S, T_ant, lam_ant, tolerancia, max_iteracoes):
+    """Refina todos os modos de uma vez a partir dos autopares da frequência anterior."""
+    n = S.shape[0]
+    t = T_ant.T.copy()          # (modo, componente)
+    lam = lam_ant.copy()
+    c = T_ant.conj().T          # Linha m: t_prev_m^H, para a restrição de normalização.
+
+    M = np.zeros((n, n + 1, n + 1), dtype=complex)
+    M[:, n, :n] = c
+    residuo = np.empty((n, n + 1), dtype=complex)
+    identidade = np.eye(n)
+    for _ in range(max_iteracoes):
+        M[:, :n, :n] = S - lam[:, np.newaxis, np.newaxis] * identidade
+        M[:, :n, n] = -t
+        residuo[:, :n] = lam[:, np.newaxis] * t - t @ S.T
+        residuo[:, n] = 1 - np.einsum('mi,mi->m', c, t)
+        try:
+            passo = np.linalg.solve(M, residuo[..., np.newaxis])[..., 0]
+        except np.linalg.LinAlgError: # Modos degenerados: o sistema aumentado é singular.
+            return lam, t.T, False
+        t += passo[:, :n]
+        lam += passo[:, n]
+        if np.max(np.abs(passo)) <= tolerancia:
+            break
+
+    t = t.T / np.linalg.norm(t, axis=1)
+    valido = np.all(np.isfinite(lam)) and np.linalg.norm(S @ t - t * lam, axis=0).max() <= RESIDUO_MAXIMO
+    distancias = np.abs(lam[:, np.newaxis] - lam) + np.eye(n)
+    return lam, t, bool(valido and distancias.min() > RESIDUO_MAXIMO)
+
+def _associar(lam, t, correlacao):
+    """Associa os modos de eig aos anteriores pela máxima correlação global e alinha as fases."""
+    _, ordem = linear_sum_assignment(-np.abs(correlacao))
+    fase = correlacao[np.arange(len(ordem)), ordem]
+    return lam[ordem], t[:, ordem] * (np.conj(fase) / np.maximum(np.abs(fase), np.finfo(float).tiny))
+
+class TestModal(unittest.TestCase):
+
+    def setUp(self):
+        # Matrizes com autovetores fixos (Q) e autovalores que se cruzam ao longo da frequência.
+        rng = np.random.default_rng(5)
+        self.Q = rng.normal(size=(3, 3)) + 1j * rng.normal(size=(3, 3))
+        self.x = np.linspace(0.0, 1.0, 40) # O cruzamento em x = 0.5 fica entre duas amostras.
+        self.lam = np.stack([1.0 + 2.0 * self.x, 2.5 - 1.0 * self.x, 1.7 + 0.3j * self.x], axis=-1)
+        self.S = (self.Q * self.lam[:, np.newaxis, :]) @ np.linalg.inv(self.Q)
+
+    def test_acompanha_cruzamento_de_autovalores(self):
+        """Os autovalores devem seguir cada curva através dos cruzamentos, sem troca de modos."""
+        autovalores, T = acompanhar_autovetores(self.S)
+        ordem = np.argsort(-np.abs(self.lam[0]))
+        np.testing.assert_allclose(autovalores, self.lam[:, ordem], rtol=1e-9)
+        # Cada coluna deve permanecer paralela à coluna correspondente de Q.
+        Q = self.Q[:, ordem] / np.linalg.norm(self.Q[:, ordem], axis=0)
+        np.testing.assert_allclose(np.abs(np.einsum('ij,fij->fj', Q.conj(), T)), 1.0, rtol=1e-9)
+
+    def test_newton_raphson_a_partir_da_frequencia_anterior(self):
+        """O refinamento por Newton-Raphson converge para os autopares seguintes, com a fase alinhada."""
+        autovalores, T = acompanhar_autovetores(self.S)
+        lam, t, ok = _newton_raphson(self.S[5], T[4], autovalores[4], TOLERANCIA, MAX_ITERACOES)
+        self.assertTrue(ok)
+        np.testing.assert_allclose(lam, autovalores[5], rtol=1e-10)
+        np.testing.assert_allclose(t, T[5], atol=1e-10)
+
+    def test_fase_continua(self):
+        """Autovetores de frequências vizinhas devem ter produto interno real e positivo (sem inversão)."""
+        _, T = acompanhar_autovetores(self.S * np.exp(1j * self.x)[:, np.newaxis, np.newaxis])
+        produto = np.einsum('fij,fij->fj', T[:-1].conj(), T[1:])
+        self.assertTrue(np.all(produto.real > 0.99))
+        np.testing.assert_allclose(produto.imag, 0.0, atol=1e-9)
+
+    def test_linha_real_e_recurso_para_eig(self):
+        """Para uma linha em varredura, ZY = T diag(gamma^2) T^-1; modos degenerados usam eig."""
+        frequencias = np.logspace(1, 5, 30)
+        w = 2 * np.pi * frequencias[:, np.newaxis, np.newaxis]
+        R = np.array([[0.05, 0.04, 0.04], [0.04, 0.05, 0.04], [0.04, 0.04, 0.05]]) * 1e-3
+        L = np.array([[2.0, 0.9, 0.7], [0.9, 2.0, 0.9], [0.7, 0.9, 2.0]]) * 1e-6
+        C = np.linalg.inv(np.array([[9.0, 2.0, 1.0], [2.0, 9.0, 2.0], [1.0, 2.0, 9.0]])) * 1e-10
+        Z = R + 1j * w * L
+        Y = 1j * w * C
+        T, gamma = decomposicao_modal(Z, Y)
+        np.testing.assert_allclose(T @ (gamma[..., np.newaxis]**2 * np.linalg.inv(T)), Z @ Y, rtol=1e-8)
+        # Linha idealmente transposta: dois modos aéreos iguais (o sistema de Newton é singular).
+        Z_t = np.broadcast_to(np.full((3, 3), 0.01 + 0.3j) + np.eye(3) * 0.5j, (4, 3, 3))
+        T_t, gamma_t = decomposicao_modal(Z_t, np.broadcast_to(np.eye(3) * 3e-6j, (4, 3, 3)))
+        self.assertTrue(np.all(np.isfinite(T_t)))
+        np.testing.assert_allclose(gamma_t[1:], gamma_t[:-1], rtol=1e-9)
+
+    def test_forma_invalida(self):
+        """Entradas que não são pilhas (F, N, N) devem levantar ValueError."""
+        with self.assertRaisesRegex(ValueError, r"pilha de forma \(F, N, N\)"):
+            acompanhar_autovetores(np.eye(3))
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
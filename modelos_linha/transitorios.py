@@ -0,0 +1,405 @@
+import math
+import numpy as np
+import unittest
+
+from scipy.signal import lfilter
+
+from modelos_linha.ajuste_vetorial import ajuste_vetorial
+from modelos_linha.linha_longa import constantes_propagacao
+
+# Maior erro RMS aceito no ajuste da função de propagação de cada modo (adimensional, |A| <= 1).
+RMS_MAXIMO_PROPAGACAO = 5e-2
+
+class ModeloModal:
+    """
+    Parâmetros modais de uma linha multicondutora para simulação de transitórios no tempo.
+
+    A linha é desacoplada por uma matriz de transformação real e constante T_v (tensões), com
+    T_i = T_v^-T (correntes): v = T_v v_modo e i = T_i i_modo. Cada modo é uma linha monofásica
+    com impedância característica Zc, tempo de trânsito tau e, conforme o modelo:
+
+    - Bergeron: resistência total R concentrada em três pontos (R/4, R/2, R/4);
+    - dependente da frequência: função de propagação A(s) = exp(-gamma l) * exp(s tau),
+      aproximada por polos e resíduos (ver `ajuste_vetorial`) e aplicada por convolução recursiva.
+
+    Use `modelo_bergeron` ou `modelo_dependente_frequencia` para construir o modelo.
+
+    Atributos:
+    T_v, T_i (numpy.ndarray): Matrizes (N, N) reais de transformação modal.
+    Zc (numpy.ndarray): Impedâncias características modais (N,) (Ohm).
+    tau (numpy.ndarray): Tempos de trânsito modais (N,) (s).
+    R (numpy.ndarray): Resistências totais modais (N,) (Ohm), nulas no modelo dependente da frequência.
+    propagacao (list ou None): Para cada modo, o ModeloRacional de A(s) sem o atraso (modelo
+                               dependente da frequência) ou None (Bergeron).
+    """
+
+    def __init__(self, T_v, Zc, tau, R=None, propagacao=None):
+        self.T_v = np.asarray(T_v, dtype=float)
+        self.T_i = np.linalg.inv(self.T_v).T
+        self.Zc = np.asarray(Zc, dtype=float)
+        self.tau = np.asarray(tau, dtype=float)
+        self.R = np.zeros_like(self.Zc) if R is None else np.asarray(R, dtype=float)
+        self.propagacao = propagacao
+
+    def __repr__(self):
+        tipo = 'Bergeron' if self.propagacao is None else 'dependente da frequência'
+        return f"ModeloModal({tipo}, modos={len(self.Zc)}, tau={self.tau.tolist()})"
+
+def modelo_bergeron(Z, Y, comprimento, frequencia=60.0):
+    """
+    Modelo de Bergeron (parâmetros constantes) de uma linha a partir de Z e Y em uma frequência.
+
+    Parâmetros:
+    Z (array_like): Matriz (N, N) de impedâncias longitudinais na frequência (Ohm/m).
+    Y (array_like): Matriz (N, N) de admitâncias transversais j*w*C na frequência (S/m).
+    comprimento (float): Comprimento da linha (m).
+    frequencia (float, opcional): Frequência (Hz) em que Z e Y foram calculadas. Padrão: 60 Hz.
+
+    Retorna:
+    ModeloModal: Modelo com L, C e R modais constantes.
+    """
+    Z, Y = _validar_matrizes(Z, Y, comprimento)
+    T_v = _transformacao_real(Z @ Y)
+    z, y = _parametros_modais(T_v, Z, Y)
+    w = 2 * math.pi * frequencia
+    L, C = z.imag / w, y.imag / w
+    return ModeloModal(T_v, np.sqrt(L / C), comprimento * np.sqrt(L * C), R=z.real * comprimento)
+
+def modelo_dependente_frequencia(Z, Y, frequencias, comprimento, n_polos=10, frequencia_transformacao=None,
+                                 peso=None, rms_maximo=RMS_MAXIMO_PROPAGACAO):
+    """
+    Modelo de linha dependente da frequência, com a função de propagação de cada modo ajustada
+    por polos e resíduos a partir de uma varredura de Z e Y.
+
+    A matriz de transformação é real e constante (calculada em `frequencia_transformacao`) e a
+    impedância característica de cada modo é a da frequência mais alta da varredura; a
+    dependência da frequência (atenuação e distorção) está na função de propagação.
+
+    O ajuste usa por padrão peso uniforme: |A| decai até ~1e-15 no modo terra em altas
+    frequências, e o peso 'relativo' faria o ajuste perseguir essa cauda desprezível à custa da
+    faixa em que a onda de fato se propaga.
+
+    Parâmetros:
+    Z (array_like): Pilha (F, N, N) de impedâncias longitudinais (Ohm/m), por exemplo de
+                    `metodo_carson_n_condutores_varredura`.
+    Y (array_like): Pilha (F, N, N) de admitâncias transversais (S/m).
+    frequencias (array_like): Vetor de F frequências (Hz), em ordem crescente.
+    comprimento (float): Comprimento da linha (m).
+    n_polos (int, opcional): Número de polos de cada função de propagação. Padrão: 10.
+    frequencia_transformacao (float, opcional): Frequência da matriz de transformação real.
+                                                Padrão: a maior frequência da varredura.
+    peso (array_like ou str, opcional): Peso das frequências no ajuste, como em `ajuste_vetorial`.
+                                        Padrão: uniforme.
+    rms_maximo (float ou None, opcional): Maior erro RMS aceito no ajuste de cada modo. Use None
+                                          para não verificar. Padrão: RMS_MAXIMO_PROPAGACAO.
+
+    Retorna:
+    ModeloModal: Modelo com as funções de propagação ajustadas.
+
+    Raises:
+    ValueError: Se Z e Y não corresponderem às frequências ou se o ajuste de algum modo tiver
+                erro RMS acima de rms_maximo.
+    """
+    frequencias = np.asarray(frequencias, dtype=float)
+    Z, Y = _validar_matrizes(Z, Y, comprimento)
+    if Z.ndim != 3 or Z.shape[0] != frequencias.shape[0]:
+        raise ValueError("ERRO! Z e Y devem ser pilhas (F, N, N) correspondentes ao vetor de frequências.")
+
+    if frequencia_transformacao is None:
+        k = len(frequencias) - 1
+    else:
+        k = int(np.argmin(np.abs(frequencias - frequencia_transformacao)))
+    T_v = _transformacao_real(Z[k] @ Y[k])
+    z, y = _parametros_modais(T_v, Z, Y)  # (F, N)
+    gamma = constantes_propagacao(z * y)
+
+    w = 2 * math.pi * frequencias[:, np.newaxis]
+    tau = comprimento * gamma[-1].imag / w[-1]   # Atraso de propagação na frequência mais alta.
+    Zc = np.sqrt(z[-1] / y[-1]).real
+    A = np.exp(-gamma * comprimento + 1j * w * tau)
+    propagacao = [ajuste_vetorial(frequencias, A[:, m], n_polos=n_polos, peso=peso) for m in range(len(Zc))]
+    for m, modelo in enumerate(propagacao):
+        if rms_maximo is not None and not modelo.rms <= rms_maximo:
+            raise ValueError(f"ERRO! O ajuste da função de propagação do modo {m} tem erro RMS {modelo.rms:.3e}, "
+                             f"acima de {rms_maximo:.1e}. Aumente n_polos ou revise a faixa de frequências.")
+    return ModeloModal(T_v, Zc, tau, propagacao=propagacao)
+
+def simular_transitorio(modelo, dt, n_passos, fonte_envio, G_envio, G_recepcao, fonte_recepcao=None):
+    """
+    Simula a linha no tempo com passo fixo, com fontes de Thévenin/Norton nas extremidades.
+
+    Em cada extremidade k, a rede externa é uma fonte de tensão v_fonte (N,) atrás de uma matriz
+    de condutâncias G (N, N): a corrente injetada na linha é G (v_fonte - v_k). Uma extremidade
+    em aberto tem G nula; uma carga resistiva é G = diag(1/R) sem fonte.
+
+    Como uma onda leva pelo menos tau_min para atravessar a linha, as correntes históricas de
+    qualquer instante dependem apenas de valores anteriores a tau_min. O tempo é então avançado
+    em blocos de até floor(tau_min/dt) passos, cada bloco calculado com operações vetorizadas: as
+    grandezas modais de cada extremidade ficam em buffers circulares pré-alocados, de tamanho
+    proporcional ao maior atraso, e a convolução recursiva das funções de propagação é feita por
+    `scipy.signal.lfilter`, com o estado de cada polo levado de um bloco para o seguinte.
+
+    Parâmetros:
+    modelo (ModeloModal): Modelo da linha (`modelo_bergeron` ou `modelo_dependente_frequencia`).
+    dt (float): Passo de tempo (s). Deve ser menor que o menor tempo de trânsito modal.
+    n_passos (int): Número de passos de tempo.
+    fonte_envio (callable ou array_like): Tensões (n_passos, N) da fonte do terminal emissor,
+                                          ou função f(t) que recebe o vetor de tempos (n_passos,).
+    G_envio (array_like): Condutâncias (N, N) da fonte do terminal emissor (S).
+    G_recepcao (array_like): Condutâncias (N, N) da carga/fonte do terminal receptor (S).
+    fonte_recepcao (callable ou array_like, opcional): Tensões da fonte do terminal receptor. Padrão: nula.
+
+    Retorna:
+    tuple: (t, V_envio, V_recepcao, I_envio, I_recepcao), com t (n_passos,) e arrays
+           (n_passos, N) de tensões (V) e de correntes que entram na linha por cada terminal (A).
+
+    Raises:
+    ValueError: Se dt não for positivo e menor que o menor tempo de trânsito.
+    """
+    n = len(modelo.Zc)
+    t = np.arange(n_passos) * dt
+    if dt <= 0 or dt > modelo.tau.min():
+        raise ValueError("ERRO! O passo de tempo (dt) deve ser positivo e menor que o menor tempo de trânsito da linha.")
+
+    fontes = [_amostrar_fonte(fonte_envio, t, n), _amostrar_fonte(fonte_recepcao, t, n)]
+    G = [np.asarray(G_envio, dtype=float), np.asarray(G_recepcao, dtype=float)]
+
+    # Atrasos em passos inteiros mais fração (interpolação linear entre amostras).
+    atraso = np.floor(modelo.tau / dt).astype(int)
+    fracao = modelo.tau / dt - atraso
+    bloco = int(atraso.min())
+    tamanho_buffer = 2 * (int(atraso.max()) + 2) + bloco
+    modos = np.arange(n)
+
+    # Impedância vista em cada modo: Zc + R/4 (Bergeron) ou Zc (dependente da frequência).
+    Z_modo = modelo.Zc + modelo.R / 4
+    fator_h = (modelo.Zc - modelo.R / 4) / Z_modo
+    Y_linha = (modelo.T_i / Z_modo) @ np.linalg.inv(modelo.T_v)
+    M = [np.linalg.inv(G[k] + Y_linha) for k in range(2)]
+    T_v_inv = np.linalg.inv(modelo.T_v)
+    filtros = None if modelo.propagacao is None else _FiltrosPropagacao(modelo.propagacao, dt)
+
+    # Buffers circulares das tensões e correntes modais em cada extremidade: (extremidade, posição, modo).
+    buffer_v = np.zeros((2, tamanho_buffer, n))
+    buffer_i = np.zeros((2, tamanho_buffer, n))
+    V = np.empty((2, n_passos, n))
+    I = np.empty((2, n_passos, n))
+
+    for inicio in range(0, n_passos, bloco):
+        passos = np.arange(inicio, min(inicio + bloco, n_passos))
+        indice = passos[:, np.newaxis] - atraso
+        pos0, pos1 = indice % tamanho_buffer, (indice - 1) % tamanho_buffer
+
+        def atrasado(buffer):
+            return (1 - fracao) * buffer[pos0, modos] + fracao * buffer[pos1, modos]
+
+        v_atr = [atrasado(buffer_v[k]) for k in range(2)]
+        i_atr = [atrasado(buffer_i[k]) for k in range(2)]
+        for k in range(2):
+            j = 1 - k
+            if filtros is None:
+                historico = ((1 + fator_h) / 2 * (v_atr[j] / Z_modo + fator_h * i_atr[j])
+                             + (1 - fator_h) / 2 * (v_atr[k] / Z_modo + fator_h * i_atr[k]))
+            else:
+                historico = filtros.aplicar(k, v_atr[j] / Z_modo + i_atr[j])
+
+            v = (fontes[k][passos] @ G[k].T + historico @ modelo.T_i.T) @ M[k].T
+            v_modo = v @ T_v_inv.T
+            i_modo = v_modo / Z_modo - historico
+            posicao = passos % tamanho_buffer
+            buffer_v[k][posicao] = v_modo
+            buffer_i[k][posicao] = i_modo
+            V[k, passos] = v
+            I[k, passos] = i_modo @ modelo.T_i.T
+
+    return t, V[0], V[1], I[0], I[1]
+
+class _FiltrosPropagacao:
+    """
+    Convolução recursiva das funções de propagação modais, para as duas extremidades.
+
+    Para cada polo p com resíduo r, y_n = alfa y_(n-1) + b0 u_n + b1 u_(n-1), com alfa = e^(p dt) e
+    b0, b1 exatos para entrada linear por partes entre amostras. O estado de cada filtro é
+    guardado entre blocos.
+    """
+
+    def __init__(self, propagacao, dt):
+        self.termos = []
+        for modelo in propagacao:
+            p = modelo.polos
+            r = modelo.residuos.ravel()
+            alfa = np.exp(p * dt)
+            I0 = (alfa - 1) / p
+            I1 = dt * alfa / p - (alfa - 1) / p**2
+            b0, b1 = r * (I0 - I1 / dt), r * I1 / dt
+            estado = np.zeros((len(p), 1, 2), dtype=complex)
+            self.termos.append((float(modelo.D.ravel()[0]), alfa, b0, b1, estado))
+
+    def aplicar(self, extremidade, u):
+        """Aplica, para uma extremidade, a convolução a um bloco (B, N) de ondas incidentes atrasadas."""
+        y = np.empty_like(u)
+        for m, (D, alfa, b0, b1, estado) in enumerate(self.termos):
+            soma = D * u[:, m]
+            for p in range(len(alfa)):
+                saida, estado[p, :, extremidade] = lfilter([b0[p], b1[p]], [1, -alfa[p]], u[:, m],
+                                                           zi=estado[p, :, extremidade])
+                soma = soma + saida.real
+            y[:, m] = soma
+        return y
+
+def _validar_matrizes(Z, Y, comprimento):
+    Z = np.asarray(Z, dtype=complex)
+    Y = np.asarray(Y, dtype=complex)
+    if Z.shape != Y.shape or Z.shape[-1] != Z.shape[-2]:
+        raise ValueError("ERRO! As matrizes Z e Y devem ser quadradas e ter a mesma forma.")
+    if comprimento <= 0:
+        raise ValueError("ERRO! O comprimento da linha deve ser um valor positivo.")
+    return Z, Y
+
+def _transformacao_real(S):
+    """Autovetores de S girados para que a maior componente de cada um seja real, e parte real."""
+    _, T = np.linalg.eig(S)
+    maior = T[np.argmax(np.abs(T), axis=0), np.arange(T.shape[1])]
+    T = (T * (np.abs(maior) / maior)).real
+    return T / np.linalg.norm(T, axis=0)
+
+def _parametros_modais(T_v, Z, Y):
+    """Diagonais de T_v^-1 Z T_i e de T_i^-1 Y T_v (impedâncias e admitâncias modais)."""
+    T_v_inv = np.linalg.inv(T_v)
+    T_i = T_v_inv.T
+    z = np.diagonal(T_v_inv @ Z @ T_i, axis1=-2, axis2=-1)
+    y = np.diagonal(T_v.T @ Y @ T_v, axis1=-2, axis2=-1)
+    return z, y
+
+def _amostrar_fonte(fonte, t, n):
+    if fonte is None:
+        return np.zeros((len(t), n))
+    valores = fonte(t) if callable(fonte) else fonte
+    return np.broadcast_to(np.asarray(valores, dtype=float).reshape(len(t), -1), (len(t), n))
+
+class TestTransitorios(unittest.TestCase):
+
+    def setUp(self):
+        # Linha monofásica sem perdas: L = 1 uH/m e C = 11.1 pF/m (Zc ~ 300 Ohm, v ~ 3e8 m/s).
+        self.L, self.C, self.l = 1e-6, 11.1e-12, 30e3
+        w = 2 * math.pi * 60
+        self.Z1 = np.array([[1j * w * self.L]])
+        self.Y1 = np.array([[1j * w * self.C]])
+
+    def test_degrau_com_carga_casada(self):
+        """Com fonte e carga casadas (Zc), o receptor vê V/2 exatamente após um tempo de trânsito."""
+        modelo = modelo_bergeron(self.Z1, self.Y1, self.l)
+        Zc, tau = modelo.Zc[0], modelo.tau[0]
+        dt = tau / 50
+        t, _, V_r, I_s, _ = simular_transitorio(modelo, dt, 200, np.ones((200, 1)), [[1 / Zc]], [[1 / Zc]])
+        np.testing.assert_allclose(V_r[t < tau * 0.99], 0.0, atol=1e-12)
+        np.testing.assert_allclose(V_r[t > tau * 1.01], 0.5, rtol=1e-9)
+        np.testing.assert_allclose(I_s[:, 0], 0.5 / Zc, rtol=1e-9)
+
+    def test_resistencia_em_regime_permanente(self):
+        """Com perdas, o regime permanente em corrente contínua é o divisor de tensão resistivo."""
+        Z = self.Z1 + 1e-4  # 0.1 Ohm/km
+        modelo = modelo_bergeron(Z, self.Y1, self.l)
+        Zc = modelo.Zc[0]
+        R_linha, R_carga = 1e-4 * self.l, 500.0
+        dt = modelo.tau[0] / 20
+        _, _, V_r, _, _ = simular_transitorio(modelo, dt, 40000, lambda t: np.ones_like(t), [[1 / Zc]], [[1 / R_carga]])
+        np.testing.assert_allclose(V_r[-1, 0], R_carga / (Zc + R_linha + R_carga), rtol=1e-6)
+
+    def test_regime_senoidal_trifasico(self):
+        """O regime senoidal de uma linha trifásica sem perdas confere com o modelo ABCD exato."""
+        from modelos_linha.linha_longa import LinhaLonga
+        w = 2 * math.pi * 60
+        L = np.array([[1.2, 0.5, 0.4], [0.5, 1.2, 0.5], [0.4, 0.5, 1.2]]) * 1e-6
+        C = np.linalg.inv(np.array([[9.0, 2.5, 1.8], [2.5, 9.0, 2.5], [1.8, 2.5, 9.0]])) * 1e-10
+        Z, Y, l = 1j * w * L, 1j * w * C, 100e3
+        modelo = modelo_bergeron(Z, Y, l)
+        G_s, G_r = np.eye(3) / 10.0, np.eye(3) / 400.0
+        fase = np.array([0.0, -2 * np.pi / 3, 2 * np.pi / 3])
+        dt = 1e-6
+        n_passos = int(0.5 / dt)
+        t, _, V_r, _, _ = simular_transitorio(modelo, dt, n_passos, lambda t: np.cos(w * t[:, None] + fase), G_s, G_r)
+
+        # Solução fasorial: V_s = A V_r + B I_r, I_s = C V_r + D I_r, I_r = G_r V_r, I_s = G_s (E - V_s).
+        A, B, C_, D = LinhaLonga(Z, Y).blocos_abcd(l)
+        E = np.exp(1j * fase)
+        V_r_fasor = np.linalg.solve(G_s @ (A + B @ G_r) + C_ + D @ G_r, G_s @ E)
+        ultimo_ciclo = t > t[-1] - 1 / 60
+        esperado = (V_r_fasor * np.exp(1j * w * t[ultimo_ciclo, None])).real
+        np.testing.assert_allclose(V_r[ultimo_ciclo], esperado, atol=2e-3 * np.abs(V_r_fasor).max())
+
+    def test_dependente_frequencia_sem_perdas_igual_bergeron(self):
+        """Sem perdas, a função de propagação é unitária e o modelo coincide com o de Bergeron."""
+        frequencias = np.logspace(1, 6, 60)
+        w = 2 * math.pi * frequencias[:, None, None]
+        modelo_fd = modelo_dependente_frequencia(1j * w * self.L, 1j * w * self.C, frequencias, self.l, n_polos=2)
+        modelo_b = modelo_bergeron(self.Z1, self.Y1, self.l)
+        np.testing.assert_allclose(modelo_fd.tau, modelo_b.tau, rtol=1e-9)
+        dt = modelo_b.tau[0] / 30
+        G = [[1 / 100.0]]
+        r_fd = simular_transitorio(modelo_fd, dt, 300, np.ones((300, 1)), G, [[1e-6]])
+        r_b = simular_transitorio(modelo_b, dt, 300, np.ones((300, 1)), G, [[1e-6]])
+        np.testing.assert_allclose(r_fd[2], r_b[2], atol=1e-6)
+
+    def test_dependente_frequencia_com_perdas_atenua(self):
+        """Com a resistência crescente com a frequência, a frente de onda chega atenuada e suavizada."""
+        frequencias = np.logspace(1, 6, 80)
+        w = 2 * math.pi * frequencias[:, None, None]
+        R = 5e-5 * np.sqrt(1 + frequencias[:, None, None] / 1e3) # Efeito pelicular aproximado.
+        Z = R + 1j * w * self.L
+        modelo = modelo_dependente_frequencia(Z, 1j * w * self.C, frequencias, self.l, n_polos=8)
+        dt = modelo.tau[0] / 40
+        Zc = modelo.Zc[0]
+        _, _, V_r, _, _ = simular_transitorio(modelo, dt, 400, np.ones((400, 1)), [[1 / Zc]], [[1 / Zc]])
+        self.assertTrue(np.all(np.isfinite(V_r)))
+        self.assertLess(V_r[45, 0], 0.5)          # Logo após a chegada, abaixo do valor sem perdas.
+        self.assertGreater(V_r[-1, 0], 0.4)
+
+    def test_dependente_frequencia_com_perdas_confere_com_solucao_analitica(self):
+        """
+        Com R, L e C constantes e terminais casados com Zc, a tensão no receptor é metade da resposta
+        ao degrau de exp(-gamma l), que tem forma fechada (Bessel I1): e^(-a tau) no instante da
+        chegada e a cauda a tau e^(-a t) I1(a sqrt(t^2 - tau^2)) / sqrt(t^2 - tau^2), com a = R/2L.
+        """
+        from scipy.integrate import quad
+        from scipy.special import i1e
+        R, l = 1e-3, 300e3                                  # 1 Ohm/km em 300 km: a*tau = 0.5.
+        frequencias = np.logspace(0, 6, 120)
+        w = 2 * math.pi * frequencias[:, None, None]
+        modelo = modelo_dependente_frequencia(R + 1j * w * self.L, 1j * w * self.C, frequencias, l)
+        tau, Zc = modelo.tau[0], modelo.Zc[0]
+        dt = tau / 100
+        t, _, V_r, _, _ = simular_transitorio(modelo, dt, 1000, np.ones((1000, 1)), [[1 / Zc]], [[1 / Zc]])
+
+        a = R / (2 * self.L)
+        def cauda(s):
+            u = math.sqrt(s * s - tau * tau)
+            return a * tau * i1e(a * u) * math.exp(a * u - a * s) / u
+        depois = t > 1.05 * tau
+        esperado = [0.5 * (math.exp(-a * tau) + quad(cauda, tau, tk, limit=200)[0]) for tk in t[depois]]
+        np.testing.assert_allclose(V_r[depois, 0], esperado, atol=1e-3)
+        np.testing.assert_allclose(V_r[t < 0.95 * tau, 0], 0.0, atol=1e-9)
+
+    def test_peso_uniforme_no_modo_terra(self):
+        """Linha trifásica sobre solo de Carson: o modo terra é bem ajustado com peso uniforme."""
+        from longitudinais.Carson_n_condutores import metodo_carson_n_condutores_varredura
+        from longitudinais.geometria import PERMISSIVIDADE_VACUO, obter_geometria
+        frequencias = np.logspace(0, 6, 200)
+        x, h = [-8.0, 0.0, 8.0], [20.0, 20.0, 20.0]
+        Z = metodo_carson_n_condutores_varredura([5e-5] * 3, x, h, 100.0, frequencias, R=0.015, modelo_solo='serie')
+        C = 2 * math.pi * PERMISSIVIDADE_VACUO * np.linalg.inv(obter_geometria(x, h).coeficientes_maxwell(0.015))
+        Y = 2j * math.pi * frequencias[:, None, None] * C
+        modelo = modelo_dependente_frequencia(Z, Y, frequencias, 100e3)
+        terra = int(np.argmax(modelo.tau))                 # O modo terra é o mais lento.
+        self.assertLess(modelo.propagacao[terra].rms, 1e-3)
+        with self.assertRaisesRegex(ValueError, "erro RMS"):
+            modelo_dependente_frequencia(Z, Y, frequencias, 100e3, peso='relativo')
+
+    def test_passo_maior_que_tempo_de_transito(self):
+        """Um passo de tempo maior que o tempo de trânsito deve levantar ValueError."""
+        modelo = modelo_bergeron(self.Z1, self.Y1, self.l)
+        with self.assertRaisesRegex(ValueError, "menor que o menor tempo de trânsito"):
+            simular_transitorio(modelo, 2 * modelo.tau[0], 10, None, [[1.0]], [[1.0]])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)